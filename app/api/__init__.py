@@ -1,14 +1,23 @@
 """
 API 路由
 """
-from fastapi import APIRouter, Query, Request
+from fastapi import APIRouter, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
 from datetime import datetime
+import asyncio
+import json
 import logging
+import os
 
 from app.models import *
 from app.repositories import FDRepository, SportteryRepository, LogRepository
+from app.repositories.pagination import decode_cursor
 from app.config import settings
+from app.services.data_versions import data_versions
+from app.services.live_hub import CLOSE, live_hub
+from app.services.response_cache import api_cache, cache_key
+from app.services.team_dictionary import normalize_lang
 
 logger = logging.getLogger(__name__)
 
@@ -22,97 +31,254 @@ fd_repo = FDRepository()
 sporttery_repo = SportteryRepository()
 log_repo = LogRepository()
 
+# 队名翻译/队徽来自球队字典，球队或翻译变化时也要失效
+TEAM_TAGS = [('fd_teams', None), ('fd_teams_i18n', None)]
+
+
+def _cache_control(shared: bool) -> str:
+    """shared=False 用于有来源校验的接口：不允许 CDN 缓存，浏览器每次带 ETag 重新验证"""
+    if not shared:
+        return "private, no-cache"
+    return (f"public, max-age=0, s-maxage={settings.API_CDN_MAX_AGE}, "
+            f"stale-while-revalidate={settings.API_CDN_STALE_WHILE_REVALIDATE}")
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in ("*", etag):
+            return True
+    return False
+
+
+async def _serve(request: Request, response: Response, key: str, load, tags, tables=None, shared: bool = False):
+    """条件请求 + 响应缓存
+
+    ETag 由相关表的数据版本计算，If-None-Match 命中时直接返回 304，不查询数据库；
+    响应缓存的 key 带上 ETag，其他进程写入导致版本变化后不会再命中旧条目。
+    失败或空结果不下发校验值（Repository 出错时返回空列表），避免一次临时错误被浏览器/CDN
+    以 304 的形式一直沿用到下次版本变化。
+    """
+    etag = await data_versions.etag(key, tables or [table for table, _ in tags])
+    headers = {"ETag": etag, "Cache-Control": _cache_control(shared)}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    result = await api_cache.get_or_load(f"{key}#{etag}", load, tags)
+    if getattr(result, "success", True) and getattr(result, "data", result):
+        response.headers.update(headers)
+    else:
+        response.headers["Cache-Control"] = "no-store"
+    return result
+
 
 # ============== Football-Data API ==============
 
 @fd_router.get("/matches", response_model=ApiResponse[List[FDMatch]])
 async def get_fd_matches(
+    request: Request,
+    response: Response,
     date: Optional[str] = Query(None, description="日期 YYYY-MM-DD"),
     league: Optional[str] = Query(None, description="联赛代码"),
     status: Optional[str] = Query(None, description="状态 SCHEDULED/LIVE/FINISHED"),
     limit: int = Query(100, ge=1, le=500),
-    lang: Optional[str] = Query('en', description="语言: en=英文, zh=中文")
+    lang: Optional[str] = Query('en', description="语言: en=英文, zh=中文"),
+    cursor: Optional[str] = Query(None, description="分页游标，取自上一页的 next_cursor")
 ):
     """获取比赛列表 (支持多语言)"""
-    matches = await fd_repo.get_matches(date=date, league=league, status=status, limit=limit, lang=lang)
-    return ApiResponse(data=matches, total=len(matches))
+    lang = normalize_lang(lang)
+    try:
+        after = decode_cursor('fd', cursor, 2)
+    except ValueError as e:
+        return ApiResponse(success=False, error=str(e))
+
+    async def load():
+        matches = await fd_repo.get_matches(date=date, league=league, status=status, limit=limit,
+                                            lang=lang, after=after)
+        next_cursor = fd_repo.match_cursor(matches[-1]) if len(matches) == limit else None
+        return ApiResponse(data=matches, total=len(matches), next_cursor=next_cursor)
+
+    key = cache_key("fd.matches", date=date, league=league, status=status, limit=limit, lang=lang, cursor=cursor)
+    return await _serve(request, response, key, load, [('fd_matches', league)] + TEAM_TAGS)
 
 
 @fd_router.get("/matches/{match_id}", response_model=ApiResponse[FDMatch])
-async def get_fd_match(match_id: int):
+async def get_fd_match(match_id: int, request: Request, response: Response):
     """获取单场比赛"""
-    match = await fd_repo.get_match_by_id(match_id)
-    if not match:
-        return ApiResponse(success=False, error="比赛不存在")
-    return ApiResponse(data=match)
+    async def load():
+        match = await fd_repo.get_match_by_id(match_id)
+        if not match:
+            return ApiResponse(success=False, error="比赛不存在")
+        return ApiResponse(data=match)
+
+    def tags(result):
+        return [('fd_matches', result.data['league_code'] if result.data else None)]
+
+    return await _serve(request, response, cache_key("fd.match", match_id=match_id), load, tags, tables=['fd_matches'])
 
 @fd_router.get("/matches/{match_id}/details", response_model=ApiResponse[FDMatchDetail])
-async def get_fd_match_details(match_id: int):
+async def get_fd_match_details(match_id: int, request: Request, response: Response):
     """获取单场比赛详情（阵容+进球）"""
-    detail = await fd_repo.get_match_details(match_id)
-    if not detail:
-        return ApiResponse(success=False, error="详情不存在（比赛可能未开始）")
-    return ApiResponse(data=detail)
+    async def load():
+        detail = await fd_repo.get_match_details(match_id)
+        if not detail:
+            return ApiResponse(success=False, error="详情不存在（比赛可能未开始）")
+        return ApiResponse(data=detail)
+
+    # 裁判取自 fd_matches：ETag 包含其版本，fd_matches 变化后缓存 key 随之变化
+    tags = [('fd_match_details', match_id), ('fd_match_goals', match_id)]
+    tables = ['fd_match_details', 'fd_match_goals', 'fd_matches']
+    return await _serve(request, response, cache_key("fd.match_details", match_id=match_id), load, tags,
+                        tables=tables)
 
 
 @fd_router.get("/leagues", response_model=ApiResponse[List[FDLeague]])
-async def get_fd_leagues():
+async def get_fd_leagues(request: Request, response: Response):
     """获取联赛列表"""
-    leagues = await fd_repo.get_leagues()
-    return ApiResponse(data=leagues, total=len(leagues))
+    async def load():
+        leagues = await fd_repo.get_leagues()
+        return ApiResponse(data=leagues, total=len(leagues))
+
+    return await _serve(request, response, cache_key("fd.leagues"), load, [('fd_leagues', None)])
 
 
 @fd_router.get("/leagues/{code}/standings", response_model=ApiResponse[List[FDStanding]])
 async def get_fd_standings(
     code: str,
+    request: Request,
+    response: Response,
     season: Optional[int] = None,
     lang: Optional[str] = Query('en', description="语言: en=英文, zh=中文")
 ):
     """获取积分榜 (支持多语言)"""
-    standings = await fd_repo.get_standings(code, season, lang=lang)
-    return ApiResponse(data=standings, total=len(standings))
+    lang = normalize_lang(lang)
+
+    async def load():
+        standings = await fd_repo.get_standings(code, season, lang=lang)
+        return ApiResponse(data=standings, total=len(standings))
+
+    key = cache_key("fd.standings", code=code, season=season, lang=lang)
+    return await _serve(request, response, key, load, [('fd_standings', code)] + TEAM_TAGS)
 
 
 @fd_router.get("/leagues/{code}/scorers", response_model=ApiResponse[List[FDScorer]])
 async def get_fd_scorers(
     code: str,
+    request: Request,
+    response: Response,
     season: Optional[int] = None,
     order_by: str = Query('goals', pattern='^(goals|assists)$'),
     lang: Optional[str] = Query('en', description="语言: en=英文, zh=中文")
 ):
     """获取射手榜/助攻榜 (支持多语言)"""
-    logger.info(f"Fetching scorers for {code}, order_by={order_by}, lang={lang}")
-    scorers = await fd_repo.get_scorers(code, season, order_by=order_by, lang=lang)
-    return ApiResponse(data=scorers, total=len(scorers))
+    lang = normalize_lang(lang)
+
+    async def load():
+        logger.info(f"Fetching scorers for {code}, order_by={order_by}, lang={lang}")
+        scorers = await fd_repo.get_scorers(code, season, order_by=order_by, lang=lang)
+        return ApiResponse(data=scorers, total=len(scorers))
+
+    key = cache_key("fd.scorers", code=code, season=season, order_by=order_by, lang=lang)
+    return await _serve(request, response, key, load, [('fd_scorers', code)] + TEAM_TAGS)
 
 
 @fd_router.get("/teams", response_model=ApiResponse[List[FDTeam]])
-async def get_fd_teams(league: Optional[str] = None):
+async def get_fd_teams(request: Request, response: Response, league: Optional[str] = None):
     """获取球队列表"""
-    teams = await fd_repo.get_teams(league)
-    return ApiResponse(data=teams, total=len(teams))
+    async def load():
+        teams = await fd_repo.get_teams(league)
+        return ApiResponse(data=teams, total=len(teams))
+
+    # 按联赛筛选时球队集合来自联赛成员表（未填充时来自该联赛的比赛）
+    tags = [('fd_teams', None)] + ([('fd_league_teams', league), ('fd_matches', league)] if league else [])
+    return await _serve(request, response, cache_key("fd.teams", league=league), load, tags)
+
+
+def _sse(event: dict) -> str:
+    lines = []
+    if event.get('id') is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@fd_router.get("/live/stream")
+async def stream_live_scores(request: Request):
+    """实时比分推送 (Server-Sent Events)
+
+    连接建立后先发送 snapshot（当前进行中比赛的比分），之后每个同步周期推送变化的比赛。
+    本进程没有运行调度器（如 Vercel）时返回 204，EventSource 收到后停止重连，前端回退到轮询。
+    """
+    from app.scheduler import scheduler
+
+    if not settings.LIVE_STREAM_ENABLED or os.environ.get("VERCEL") or not scheduler.scheduler.running:
+        return Response(status_code=204)
+    queue = live_hub.subscribe()
+    if queue is None:
+        return Response(status_code=204)
+
+    async def events():
+        try:
+            yield _sse({'type': 'snapshot', 'matches': live_hub.snapshot()})
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.LIVE_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if event is CLOSE:
+                    break
+                yield _sse(event)
+        finally:
+            live_hub.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # ============== 竞彩 API ==============
 
 @sporttery_router.get("/matches", response_model=ApiResponse[List[SportteryMatch]])
 async def get_sporttery_matches(
+    request: Request,
+    response: Response,
     date: Optional[str] = Query(None, description="日期 YYYY-MM-DD"),
     status: Optional[str] = Query(None, description="状态 pending/finished"),
-    limit: int = Query(100, ge=1, le=500)
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="分页游标，取自上一页的 next_cursor")
 ):
     """获取竞彩比赛列表"""
-    matches = await sporttery_repo.get_matches(date=date, status=status, limit=limit)
-    return ApiResponse(data=matches, total=len(matches))
+    try:
+        after = decode_cursor('sp', cursor, 3)
+    except ValueError as e:
+        return ApiResponse(success=False, error=str(e))
+
+    async def load():
+        matches = await sporttery_repo.get_matches(date=date, status=status, limit=limit, after=after)
+        next_cursor = sporttery_repo.match_cursor(matches[-1]) if len(matches) == limit else None
+        return ApiResponse(data=matches, total=len(matches), next_cursor=next_cursor)
+
+    key = cache_key("sporttery.matches", date=date, status=status, limit=limit, cursor=cursor)
+    return await _serve(request, response, key, load, [('sporttery_matches', None)], shared=True)
 
 
 @sporttery_router.get("/matches/{match_code}", response_model=ApiResponse[SportteryMatch])
-async def get_sporttery_match(match_code: str):
+async def get_sporttery_match(match_code: str, request: Request, response: Response):
     """获取单场竞彩比赛"""
-    match = await sporttery_repo.get_match_by_code(match_code)
-    if not match:
-        return ApiResponse(success=False, error="比赛不存在")
-    return ApiResponse(data=match)
+    async def load():
+        match = await sporttery_repo.get_match_by_code(match_code)
+        if not match:
+            return ApiResponse(success=False, error="比赛不存在")
+        return ApiResponse(data=match)
+
+    key = cache_key("sporttery.match", match_code=match_code)
+    return await _serve(request, response, key, load, [('sporttery_matches', None)], shared=True)
 
 
 # ============== 系统 API ==============
@@ -161,7 +327,8 @@ async def sync_live_cron(request: Request):
     [内部接口] 外部定时器触发实时比分同步
     必须在 Header 中携带 'X-API-KEY'
     """
-    from app.scheduler import SyncScheduler
+    # 复用全局调度器实例，共享其抓取器连接池
+    from app.scheduler import scheduler
     
     # 鉴权：复用 INTERNAL_API_KEY
     api_key = request.headers.get("X-API-KEY")
@@ -169,15 +336,48 @@ async def sync_live_cron(request: Request):
         return {"status": "error", "message": "Unauthorized"}
         
     try:
-        scheduler = SyncScheduler()
         # 执行实时同步
         count = await scheduler.sync_fd_live_scores()
+        # Serverless 环境没有后台刷新协程，请求结束前写入本次的比分和日志
+        await scheduler.match_writes.flush()
+        await scheduler.sync_logs.flush()
         return {"status": "success", "synced_count": count, "timestamp": datetime.now().isoformat()}
     except Exception as e:
         logger.error(f"Cron sync failed: {str(e)}")
         return {"status": "error", "message": str(e)}
 
 
+@system_router.get("/metrics")
+async def get_metrics():
+    """运行时指标：抓取请求合并、响应缓存命中、写后队列合并等"""
+    from app.scheduler import scheduler
+    from app.scrapers import FootballDataScraper, SportteryScraper
+    from app.scrapers.cache import get_response_cache
+    from app.services.team_dictionary import team_dictionary
+
+    cache = get_response_cache()
+    return {
+        "scrapers": {
+            "football_data": {
+                "inflight": FootballDataScraper.inflight.stats(),
+                "response_cache": cache.stats() if cache else None,
+            },
+            "sporttery": {
+                "inflight": SportteryScraper.inflight.stats(),
+            },
+        },
+        "writes": {
+            "fd_matches": scheduler.match_writes.stats(),
+            "journal_replayed": scheduler.journal_replayer.replayed if scheduler.journal_replayer else None,
+        },
+        "team_dictionary": team_dictionary.stats(),
+        "api_cache": api_cache.stats(),
+        "data_versions": data_versions.stats(),
+        "live_stream": live_hub.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @system_router.get("/logs", response_model=ApiResponse[List[SyncLog]])
 async def get_logs(
     source: Optional[str] = Query(None, description="数据源 fd/sporttery"),
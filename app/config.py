@@ -19,6 +19,12 @@ class Settings(BaseSettings):
     # API Token
     FD_API_TOKEN: str = ""
 
+    # 上游接口地址（可指向本地回放服务 scripts/replay_server.py）
+    FD_API_BASE_URL: str = "https://api.football-data.org/v4"
+    SPORTTERY_API_BASE_URL: str = "https://webapi.sporttery.cn"
+    # 非空时抓取器把每个响应录制为回放夹具
+    HTTP_RECORD_DIR: str = ""
+
     # Supabase (Cloud Database)
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
@@ -26,7 +32,42 @@ class Settings(BaseSettings):
     INTERNAL_API_KEY: str = os.getenv("INTERNAL_API_KEY", "SET_YOUR_KEY_IN_ENV_VARS")
 
     # 数据库
+    # 存储后端: supabase=云数据库, sqlite=本地 SQLite 文件 (DB_PATH)，适合单机部署
+    STORAGE_BACKEND: str = "supabase"
     DB_PATH: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "matchstats.db")
+    DB_BATCH_SIZE: int = 200  # 批量 upsert 每个请求的行数上限
+    DB_MAX_WORKERS: int = 16  # 数据库查询线程池大小（并发查询上限）
+    # 写入前变更检测：内容未变化的行不再重写（指纹保存在本地 SQLite）
+    CHANGE_DETECTION_ENABLED: bool = True
+    FINGERPRINT_DB_PATH: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fingerprints.db")
+    FINGERPRINT_TTL: int = 86400  # 指纹有效期（秒），过期后强制重写一次
+    # 同步日志缓冲写入
+    SYNC_LOG_FLUSH_INTERVAL: int = 30  # 写入失败后的重试间隔（秒）
+    SYNC_LOG_FLUSH_DELAY: float = 1.0  # 运行开始/结束后等待多久再写入，同一时刻的多次运行合并为一批
+    SYNC_LOG_MAX_PENDING: int = 1000  # 数据库不可用时内存中最多保留的待写记录数
+    # 比赛写后队列：实时比分/结果按 fd_id 合并后批量写入
+    WRITE_BEHIND_INTERVAL: int = 10  # 刷新间隔（秒）
+    WRITE_BEHIND_MAX_PENDING: int = 2000  # 待写行数上限，达到后入队方等待刷新
+    # Supabase 不可达时的本地写入日志（DB_PATH 同目录下 write_journal.db）
+    JOURNAL_ENABLED: bool = True
+    JOURNAL_MAX_ROWS: int = 50000  # 日志行数上限，超出时丢弃最旧的记录
+    JOURNAL_REPLAY_INTERVAL: int = 60  # 后台回放间隔（秒）
+    TEAM_DICT_REFRESH_INTERVAL: int = 300  # 球队翻译/队徽内存字典的增量刷新间隔（秒）
+    # 公开读接口的响应缓存：同步任务写入后按表/联赛失效，TTL 作为兜底
+    API_CACHE_ENABLED: bool = True
+    API_CACHE_MAX_ENTRIES: int = 512
+    API_CACHE_TTL: int = 120  # 秒
+    API_CACHE_EMPTY_TTL: int = 15  # 空结果（含查询失败）的缓存秒数
+    FINISHED_DETAILS_CACHE_SIZE: int = 500  # 已结束比赛详情的进程内缓存场数
+    # 读接口 ETag：按 data_versions 表中的版本号计算，版本未变时返回 304
+    DATA_VERSION_TTL: int = 5  # 轮询 data_versions 的间隔（秒）
+    API_CDN_MAX_AGE: int = 15  # 可公开缓存的接口在 CDN 上的 s-maxage（秒）
+    API_CDN_STALE_WHILE_REVALIDATE: int = 60
+    # 实时比分推送 (SSE, /api/v1/fd/live/stream)，仅在运行调度器的进程中可用
+    LIVE_STREAM_ENABLED: bool = True
+    LIVE_STREAM_MAX_CLIENTS: int = 500
+    LIVE_STREAM_QUEUE_SIZE: int = 100  # 每个连接的待发送事件上限，超出时通知客户端重新拉取
+    LIVE_STREAM_HEARTBEAT: int = 15  # 心跳间隔（秒），同时用于检测断开的连接
 
     # 服务
     PORT: int = 9999
@@ -47,6 +88,45 @@ class Settings(BaseSettings):
     # Football-Data.org 限流
     FD_RATE_LIMIT: int = 10  # 每分钟10次
     FD_RATE_WINDOW: int = 60  # 60秒窗口
+    # 限流状态后端: memory=进程内, sqlite=同一主机多进程共享一份配额
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_DB_PATH: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "rate_limit.db")
+
+    # Football-Data 重试与熔断
+    FD_RETRY_MAX_ATTEMPTS: int = 3  # 单次调用最多尝试次数
+    FD_RETRY_BASE_DELAY: float = 1.0  # 指数退避基数（秒）
+    FD_RETRY_MAX_DELAY: float = 30.0  # 单次等待上限；Retry-After 超过该值时直接失败
+    FD_CIRCUIT_FAILURE_THRESHOLD: int = 3  # 同一接口连续失败次数达到后熔断
+    FD_CIRCUIT_RESET_TIMEOUT: int = 120  # 熔断冷却秒数
+
+    # Football-Data 响应缓存（TTL + ETag/Last-Modified 条件请求，持久化到本地）
+    FD_CACHE_ENABLED: bool = True
+    FD_CACHE_PATH: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "http_cache.db")
+    FD_CACHE_TTL_STANDINGS: int = 600  # 积分榜
+    FD_CACHE_TTL_SCORERS: int = 1800  # 射手榜
+    FD_CACHE_TTL_TEAMS: int = 43200  # 球队列表/球队详情
+    FD_CACHE_TTL_COMPETITIONS: int = 43200  # 联赛列表/联赛详情
+    FD_CACHE_MAX_ENTRIES: int = 2000  # 内存与 SQLite 中最多保留的响应数（按最近抓取时间淘汰）
+
+    # 竞彩赛程翻页
+    SPORTTERY_PAGE_CONCURRENCY: int = 3  # 每轮并发抓取的页数
+    SPORTTERY_MAX_PAGES: int = 10  # 最多翻页数
+    # 竞彩结果抓取（分窗口、分页并发）
+    SPORTTERY_RESULT_WINDOW_DAYS: int = 7  # 单个查询窗口天数
+    SPORTTERY_RESULT_CONCURRENCY: int = 3  # 同时进行的结果请求数
+    SPORTTERY_REQUEST_INTERVAL: float = 0.3  # 每个请求结束后的礼貌间隔（秒）
+
+    # HTTP 连接池（抓取器长连接复用）
+    HTTP_POOL_LIMIT: int = 20  # 连接池总连接数上限
+    HTTP_POOL_LIMIT_PER_HOST: int = 4  # 单个主机的连接数上限
+    HTTP_KEEPALIVE_TIMEOUT: int = 30  # 空闲连接保持秒数
+    HTTP_DNS_CACHE_TTL: int = 300  # DNS 缓存秒数
+    HTTP_TIMEOUT: int = 15  # 单次请求总超时秒数
+
+    # 批量抓取：/matches?competitions=... 单次日期跨度上限（天）
+    FD_BATCH_WINDOW_DAYS: int = 10
+    FD_SCHEDULED_LOOKAHEAD_DAYS: int = 30  # 赛程同步覆盖天数（含今天）
+    FD_RESULTS_LOOKBACK_DAYS: int = 3  # 结果同步向前回溯天数
 
     # 更新频率（分钟）
     # SCHEDULED 比赛是完整赛季赛程，变化少，低频更新即可
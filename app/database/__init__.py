@@ -1,17 +1,34 @@
 """
 数据库初始化 (Supabase Agent版)
+
+STORAGE_BACKEND=sqlite 时改用本地 SQLite 文件 (DB_PATH)，接口与 Supabase 客户端一致。
 """
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client, Client
 from app.config import settings
+import asyncio
 import logging
 import os
 
 logger = logging.getLogger(__name__)
 
 supabase: Client = None
+sqlite_client = None
+
+# supabase-py 的 .execute() 是同步 HTTP 调用，统一放到有界线程池中执行；
+# 线程数即数据库并发上限，客户端内部的 httpx 连接池在这些线程间共享
+db_executor = ThreadPoolExecutor(max_workers=settings.DB_MAX_WORKERS, thread_name_prefix="supabase")
 
+if settings.STORAGE_BACKEND == "sqlite":
+    # 本地 SQLite 后端
+    from app.database.sqlite_client import SQLiteClient
+    db_dir = os.path.dirname(settings.DB_PATH)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    sqlite_client = SQLiteClient(settings.DB_PATH)
+    logger.info(f"使用本地 SQLite 存储: {settings.DB_PATH}")
 # 初始化 Supabase 客户端
-if settings.SUPABASE_URL and settings.SUPABASE_KEY:
+elif settings.SUPABASE_URL and settings.SUPABASE_KEY:
     try:
         url = settings.SUPABASE_URL.strip().strip("'").strip('"')
         key = settings.SUPABASE_KEY.strip().strip("'").strip('"')
@@ -26,6 +43,12 @@ async def init_db():
     """
     Supabase 模式下的初始化
     """
+    if sqlite_client is not None:
+        # 建表并开启 WAL
+        await run_query(sqlite_client.table('sync_logs').select('id').limit(1))
+        logger.info("Using local SQLite database.")
+        return
+
     if not supabase:
         logger.warning("Supabase client not initialized! API calls will fail.")
         return
@@ -39,6 +62,15 @@ async def init_db():
     # except Exception as e:
     #     logger.error(f"Supabase connection check failed: {e}")
 
+async def run_query(query):
+    """在数据库线程池中执行 PostgREST 查询"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, query.execute)
+
+def get_client():
+    """当前存储后端的客户端（SQLite 或 Supabase）"""
+    return sqlite_client if sqlite_client is not None else supabase
+
 async def get_db():
     """保留兼容接口"""
-    return supabase
+    return get_client()
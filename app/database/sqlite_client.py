@@ -0,0 +1,639 @@
+"""
+本地 SQLite 存储后端
+
+提供与 supabase-py 查询构造器相同的链式接口（table/select/eq/in_/gte/lte/or_/order/limit/
+maybe_single/upsert/insert/update/delete/rpc），Repository 代码无需区分后端。
+STORAGE_BACKEND=sqlite 时启用，适合单机部署：读请求无网络往返。
+
+- WAL 模式，读写互不阻塞；每个线程一个连接（查询在数据库线程池中执行）
+- upsert 使用 INSERT ... ON CONFLICT DO UPDATE 批量执行
+"""
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fd_leagues (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fd_id INTEGER NOT NULL UNIQUE,
+    code TEXT,
+    name TEXT,
+    country TEXT,
+    current_season INTEGER,
+    emblem TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS fd_teams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fd_id INTEGER NOT NULL UNIQUE,
+    name TEXT,
+    short_name TEXT,
+    tla TEXT,
+    crest TEXT,
+    venue TEXT,
+    founded INTEGER,
+    club_colors TEXT,
+    website TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_fd_teams_name ON fd_teams(name);
+
+CREATE TABLE IF NOT EXISTS fd_teams_i18n (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    team_id INTEGER NOT NULL,
+    lang_code TEXT NOT NULL,
+    name_translated TEXT NOT NULL,
+    short_name_translated TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT,
+    UNIQUE (team_id, lang_code)
+);
+
+CREATE TABLE IF NOT EXISTS fd_matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fd_id INTEGER NOT NULL UNIQUE,
+    league_code TEXT,
+    home_team_id INTEGER,
+    away_team_id INTEGER,
+    home_team_name TEXT,
+    away_team_name TEXT,
+    match_date TEXT,
+    status TEXT,
+    home_score INTEGER,
+    away_score INTEGER,
+    home_half_score INTEGER,
+    away_half_score INTEGER,
+    referee TEXT,
+    attendance INTEGER,
+    matchday INTEGER,
+    season INTEGER,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT
+);
+-- 列表按 (match_date, fd_id) 键集分页，旧的两列索引被三列索引覆盖
+DROP INDEX IF EXISTS idx_fd_matches_date;
+DROP INDEX IF EXISTS idx_fd_matches_league_date;
+DROP INDEX IF EXISTS idx_fd_matches_status_date;
+CREATE INDEX IF NOT EXISTS idx_fd_matches_date_id ON fd_matches(match_date, fd_id);
+CREATE INDEX IF NOT EXISTS idx_fd_matches_league_date_id ON fd_matches(league_code, match_date, fd_id);
+CREATE INDEX IF NOT EXISTS idx_fd_matches_status_date_id ON fd_matches(status, match_date, fd_id);
+
+CREATE VIEW IF NOT EXISTS fd_matches_enriched AS
+SELECT
+    m.*,
+    h.crest AS home_team_logo,
+    a.crest AS away_team_logo,
+    hi.name_translated AS home_team_name_zh,
+    ai.name_translated AS away_team_name_zh
+FROM fd_matches m
+LEFT JOIN fd_teams h ON h.fd_id = m.home_team_id
+LEFT JOIN fd_teams a ON a.fd_id = m.away_team_id
+LEFT JOIN fd_teams_i18n hi ON hi.team_id = m.home_team_id AND hi.lang_code = 'zh-CN'
+LEFT JOIN fd_teams_i18n ai ON ai.team_id = m.away_team_id AND ai.lang_code = 'zh-CN';
+
+CREATE TABLE IF NOT EXISTS fd_standings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    league_code TEXT NOT NULL,
+    team_id INTEGER NOT NULL,
+    team_name TEXT,
+    season INTEGER,
+    position INTEGER,
+    played_games INTEGER,
+    won INTEGER,
+    draw INTEGER,
+    lost INTEGER,
+    points INTEGER,
+    goals_for INTEGER,
+    goals_against INTEGER,
+    goal_diff INTEGER,
+    updated_at TEXT,
+    UNIQUE (league_code, team_id)
+);
+CREATE INDEX IF NOT EXISTS idx_fd_standings_league_position ON fd_standings(league_code, position);
+
+CREATE TABLE IF NOT EXISTS fd_scorers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    league_code TEXT NOT NULL,
+    season INTEGER,
+    player_id INTEGER NOT NULL,
+    player_name TEXT,
+    team_id INTEGER,
+    team_name TEXT,
+    position INTEGER,
+    goals INTEGER DEFAULT 0,
+    assists INTEGER DEFAULT 0,
+    penalties INTEGER DEFAULT 0,
+    played_matches INTEGER DEFAULT 0,
+    updated_at TEXT,
+    UNIQUE (league_code, player_id)
+);
+CREATE INDEX IF NOT EXISTS idx_fd_scorers_league_goals ON fd_scorers(league_code, goals DESC);
+
+CREATE TABLE IF NOT EXISTS fd_match_details (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id INTEGER NOT NULL UNIQUE,
+    home_formation TEXT,
+    away_formation TEXT,
+    home_coach_name TEXT,
+    away_coach_name TEXT,
+    home_goal_count INTEGER DEFAULT 0,
+    away_goal_count INTEGER DEFAULT 0,
+    home_yellow_cards INTEGER DEFAULT 0,
+    away_yellow_cards INTEGER DEFAULT 0,
+    home_red_cards INTEGER DEFAULT 0,
+    away_red_cards INTEGER DEFAULT 0,
+    details_json TEXT,
+    venue TEXT,
+    lineup_home TEXT,
+    lineup_away TEXT,
+    bench_home TEXT,
+    bench_away TEXT,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS fd_match_goals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id INTEGER NOT NULL,
+    team_id INTEGER,
+    team_name TEXT,
+    player_id INTEGER,
+    player_name TEXT,
+    minute INTEGER,
+    minute_extra INTEGER,
+    type TEXT,
+    home_away TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_fd_match_goals_match_id ON fd_match_goals(match_id);
+
+CREATE TABLE IF NOT EXISTS fd_team_coaches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    team_id INTEGER NOT NULL UNIQUE,
+    coach_id INTEGER,
+    coach_name TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    date_of_birth TEXT,
+    nationality TEXT,
+    contract_until TEXT,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS fd_league_teams (
+    league_code TEXT NOT NULL,
+    team_id INTEGER NOT NULL,
+    updated_at TEXT,
+    PRIMARY KEY (league_code, team_id)
+);
+CREATE INDEX IF NOT EXISTS idx_fd_league_teams_team_id ON fd_league_teams(team_id);
+
+CREATE TABLE IF NOT EXISTS fd_team_squads (
+    team_id INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    player_name TEXT,
+    position TEXT,
+    shirt_number INTEGER,
+    nationality TEXT,
+    date_of_birth TEXT,
+    contract_until TEXT,
+    season INTEGER,
+    updated_at TEXT,
+    PRIMARY KEY (team_id, player_id)
+);
+
+CREATE TABLE IF NOT EXISTS sporttery_matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_code TEXT NOT NULL,
+    group_date TEXT,
+    home_team TEXT,
+    away_team TEXT,
+    league TEXT,
+    match_time TEXT,
+    status TEXT DEFAULT 'pending',
+    actual_score TEXT,
+    half_score TEXT,
+    handicap TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT,
+    UNIQUE (group_date, match_code)
+);
+CREATE INDEX IF NOT EXISTS idx_sporttery_matches_code_teams ON sporttery_matches(match_code, home_team, away_team);
+CREATE INDEX IF NOT EXISTS idx_sporttery_matches_status ON sporttery_matches(status);
+CREATE INDEX IF NOT EXISTS idx_sporttery_matches_keyset ON sporttery_matches(group_date DESC, match_time, id);
+
+CREATE TABLE IF NOT EXISTS match_predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id INTEGER NOT NULL UNIQUE,
+    prediction_date TEXT DEFAULT CURRENT_TIMESTAMP,
+    home_team TEXT,
+    away_team TEXT,
+    league TEXT,
+    match_date TEXT,
+    predicted_winner TEXT,
+    predicted_score TEXT,
+    confidence REAL,
+    reasoning TEXT,
+    raw_response TEXT,
+    prompt TEXT,
+    ai_model TEXT DEFAULT 'Grok',
+    ai_provider TEXT DEFAULT 'xAI',
+    actual_winner TEXT,
+    actual_score TEXT,
+    is_correct INTEGER,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_created ON match_predictions(created_at);
+
+CREATE TABLE IF NOT EXISTS sync_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT,
+    task_type TEXT,
+    status TEXT,
+    records_count INTEGER DEFAULT 0,
+    error_message TEXT,
+    retry_count INTEGER DEFAULT 0,
+    started_at TEXT,
+    finished_at TEXT,
+    duration_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sync_logs_started ON sync_logs(started_at);
+CREATE INDEX IF NOT EXISTS idx_sync_logs_source_status_started ON sync_logs(source, status, started_at);
+"""
+
+# 未指定 on_conflict 时使用的冲突列（对应 PostgREST 的主键默认行为）
+# 读接口涉及的表：写入时由触发器递增 data_versions 中的版本号（用于 API ETag）
+VERSIONED_TABLES = (
+    "fd_matches", "fd_leagues", "fd_teams", "fd_teams_i18n", "fd_league_teams",
+    "fd_standings", "fd_scorers", "fd_match_details", "fd_match_goals", "sporttery_matches",
+)
+
+SCHEMA += """
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+""" + "".join(
+    f"""
+CREATE TRIGGER IF NOT EXISTS trg_{table}_data_version_{op.lower()} AFTER {op} ON {table}
+BEGIN
+    INSERT INTO data_versions (table_name, version, updated_at) VALUES ('{table}', 1, CURRENT_TIMESTAMP)
+    ON CONFLICT(table_name) DO UPDATE SET version = version + 1, updated_at = CURRENT_TIMESTAMP;
+END;
+"""
+    for table in VERSIONED_TABLES for op in ("INSERT", "UPDATE", "DELETE")
+)
+
+PRIMARY_KEYS = {
+    "fd_team_squads": ("team_id", "player_id"),
+    "fd_league_teams": ("league_code", "team_id"),
+}
+
+# 对应 PostgreSQL JSONB 的列：以 JSON 文本保存，读取时解析
+JSON_COLUMNS = {
+    "fd_match_details": ("lineup_home", "lineup_away", "bench_home", "bench_away"),
+}
+
+GOAL_FIELDS = ("team_id", "team_name", "player_id", "player_name",
+               "minute", "minute_extra", "type", "home_away")
+
+
+class SQLiteResponse:
+    """与 postgrest APIResponse 对应：data 为行列表（maybe_single 时为单行或 None）"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _adapt(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _columns(spec: str) -> List[str]:
+    return [c.strip() for c in spec.split(",") if c.strip()]
+
+
+LOGIC_OPERATORS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _split_logic(text: str) -> List[str]:
+    """按顶层逗号切分 PostgREST 逻辑表达式（跳过括号和双引号内的逗号）"""
+    parts, depth, quoted, escaped, start = [], 0, False, False, 0
+    for i, ch in enumerate(text):
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _logic_clause(expr: str, joiner: str = "OR") -> tuple:
+    """把 or=(...) 的内容转换为 (SQL, 参数)；支持嵌套 and()/or() 及 eq/neq/gt/gte/lt/lte/is"""
+    clauses, params = [], []
+    for part in _split_logic(expr):
+        for logic in ("and", "or"):
+            if part.startswith(f"{logic}(") and part.endswith(")"):
+                clause, p = _logic_clause(part[len(logic) + 1:-1], logic.upper())
+                break
+        else:
+            column, op, value = part.split(".", 2)
+            if value.startswith('"') and value.endswith('"'):
+                value = value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+            if op == "is":
+                clause, p = f"{column} IS {'NULL' if value == 'null' else value.upper()}", []
+            elif op in LOGIC_OPERATORS:
+                clause, p = f"{column} {LOGIC_OPERATORS[op]} ?", [value]
+            else:
+                raise ValueError(f"SQLite 后端不支持逻辑过滤操作: {op}")
+        clauses.append(f"({clause})")
+        params.extend(p)
+    return f" {joiner} ".join(clauses), params
+
+
+class SQLiteQuery:
+    """链式查询构造器"""
+
+    def __init__(self, client: "SQLiteClient", table: str):
+        self.client = client
+        self.table = table
+        self._op = "select"
+        self._columns = ["*"]
+        self._count = False
+        self._filters: List[tuple] = []
+        self._order: List[tuple] = []
+        self._limit: Optional[int] = None
+        self._single = False
+        self._payload: Any = None
+        self._on_conflict = ""
+
+    # --- 查询类型 ---
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        self._op = "select"
+        self._columns = _columns(columns) or ["*"]
+        self._count = count is not None
+        return self
+
+    def insert(self, json_data, **kwargs):
+        self._op = "insert"
+        self._payload = json_data
+        return self
+
+    def upsert(self, json_data, on_conflict: str = "", **kwargs):
+        self._op = "upsert"
+        self._payload = json_data
+        self._on_conflict = on_conflict
+        return self
+
+    def update(self, json_data, **kwargs):
+        self._op = "update"
+        self._payload = json_data
+        return self
+
+    def delete(self, **kwargs):
+        self._op = "delete"
+        return self
+
+    # --- 过滤与排序 ---
+    def eq(self, column: str, value):
+        self._filters.append((f"{column} = ?", [_adapt(value)]))
+        return self
+
+    def neq(self, column: str, value):
+        self._filters.append((f"{column} != ?", [_adapt(value)]))
+        return self
+
+    def gt(self, column: str, value):
+        self._filters.append((f"{column} > ?", [_adapt(value)]))
+        return self
+
+    def gte(self, column: str, value):
+        self._filters.append((f"{column} >= ?", [_adapt(value)]))
+        return self
+
+    def lt(self, column: str, value):
+        self._filters.append((f"{column} < ?", [_adapt(value)]))
+        return self
+
+    def lte(self, column: str, value):
+        self._filters.append((f"{column} <= ?", [_adapt(value)]))
+        return self
+
+    def in_(self, column: str, values: Sequence):
+        values = [_adapt(v) for v in values]
+        self._filters.append((f"{column} IN ({','.join('?' * len(values))})", values))
+        return self
+
+    def is_(self, column: str, value):
+        if value is None or value == "null":
+            self._filters.append((f"{column} IS NULL", []))
+        else:
+            self._filters.append((f"{column} IS ?", [_adapt(value)]))
+        return self
+
+    def or_(self, filters: str, **kwargs):
+        clause, params = _logic_clause(filters)
+        self._filters.append((f"({clause})", params))
+        return self
+
+    def order(self, column: str, desc: bool = False, **kwargs):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs):
+        self._limit = size
+        return self
+
+    def maybe_single(self):
+        self._single = True
+        self._limit = 1
+        return self
+
+    def single(self):
+        return self.maybe_single()
+
+    # --- 执行 ---
+    def _where(self) -> tuple:
+        if not self._filters:
+            return "", []
+        params = []
+        for _, p in self._filters:
+            params.extend(p)
+        return " WHERE " + " AND ".join(clause for clause, _ in self._filters), params
+
+    def execute(self) -> SQLiteResponse:
+        return getattr(self, f"_execute_{self._op}")(self.client.connection())
+
+    def _execute_select(self, conn: sqlite3.Connection) -> SQLiteResponse:
+        where, params = self._where()
+        sql = f"SELECT {', '.join(self._columns)} FROM {self.table}{where}"
+        if self._order:
+            # 与 PostgreSQL 一致：升序时 NULL 在后，降序时 NULL 在前
+            sql += " ORDER BY " + ", ".join(
+                f"{col} {'DESC NULLS FIRST' if desc else 'ASC NULLS LAST'}" for col, desc in self._order
+            )
+        if self._limit is not None:
+            sql += f" LIMIT {int(self._limit)}"
+        rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+        for col in JSON_COLUMNS.get(self.table, ()):
+            for row in rows:
+                if isinstance(row.get(col), str):
+                    row[col] = json.loads(row[col])
+
+        count = None
+        if self._count:
+            count = conn.execute(f"SELECT COUNT(*) FROM {self.table}{where}", params).fetchone()[0]
+        if self._single:
+            return SQLiteResponse(rows[0] if rows else None, count)
+        return SQLiteResponse(rows, count)
+
+    def _rows(self) -> List[Dict]:
+        return self._payload if isinstance(self._payload, list) else [self._payload]
+
+    def _execute_insert(self, conn: sqlite3.Connection) -> SQLiteResponse:
+        inserted = []
+        with conn:
+            for row in self._rows():
+                cols = list(row)
+                cursor = conn.execute(
+                    f"INSERT INTO {self.table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                    [_adapt(row[c]) for c in cols]
+                )
+                inserted.append({"id": cursor.lastrowid, **row})
+        return SQLiteResponse(inserted)
+
+    def _execute_upsert(self, conn: sqlite3.Connection) -> SQLiteResponse:
+        rows = self._rows()
+        if not rows:
+            return SQLiteResponse([])
+        conflict = _columns(self._on_conflict) if self._on_conflict else list(PRIMARY_KEYS.get(self.table, ("id",)))
+        # 与 PostgREST 一致：按所有行的列并集写入
+        cols = list(dict.fromkeys(c for row in rows for c in row))
+        updates = [c for c in cols if c not in conflict]
+        sql = (
+            f"INSERT INTO {self.table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+            f"ON CONFLICT({', '.join(conflict)}) "
+            + (f"DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in updates)}" if updates else "DO NOTHING")
+        )
+        with conn:
+            conn.executemany(sql, [[_adapt(row.get(c)) for c in cols] for row in rows])
+        return SQLiteResponse(rows)
+
+    def _execute_update(self, conn: sqlite3.Connection) -> SQLiteResponse:
+        cols = list(self._payload)
+        where, params = self._where()
+        with conn:
+            conn.execute(
+                f"UPDATE {self.table} SET {', '.join(f'{c} = ?' for c in cols)}{where}",
+                [_adapt(self._payload[c]) for c in cols] + params
+            )
+        return SQLiteResponse([])
+
+    def _execute_delete(self, conn: sqlite3.Connection) -> SQLiteResponse:
+        where, params = self._where()
+        with conn:
+            conn.execute(f"DELETE FROM {self.table}{where}", params)
+        return SQLiteResponse([])
+
+
+class SQLiteRpc:
+    """rpc() 调用：在本地实现对应的数据库函数"""
+
+    def __init__(self, client: "SQLiteClient", name: str, params: Dict):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self) -> SQLiteResponse:
+        handler = getattr(self.client, f"_rpc_{self.name}", None)
+        if handler is None:
+            raise RuntimeError(f"SQLite 后端不支持 RPC: {self.name}")
+        return SQLiteResponse(handler(self.client.connection(), **self.params))
+
+
+class SQLiteClient:
+    """本地 SQLite 客户端（接口与 supabase Client 的 table()/rpc() 一致）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._ensure_schema(conn)
+            self._local.conn = conn
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.executescript(SCHEMA)
+                self._schema_ready = True
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+    def from_(self, name: str) -> SQLiteQuery:
+        return self.table(name)
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> SQLiteRpc:
+        return SQLiteRpc(self, name, params)
+
+    def _rpc_replace_match_goals(self, conn: sqlite3.Connection, p_match_id: int, p_goals: List[Dict]) -> int:
+        """与 Postgres 函数 replace_match_goals 等价：同一事务内只删除消失的、插入新增的进球"""
+        def key(goal):
+            return tuple(goal.get(f) for f in GOAL_FIELDS)
+
+        incoming = {key(g): g for g in (p_goals or [])}
+        with conn:
+            stored = conn.execute(
+                f"SELECT id, {', '.join(GOAL_FIELDS)} FROM fd_match_goals WHERE match_id = ?", (p_match_id,)
+            ).fetchall()
+            stored_keys = set()
+            stale = []
+            for row in stored:
+                row_key = tuple(row[f] for f in GOAL_FIELDS)
+                if row_key in incoming and row_key not in stored_keys:
+                    stored_keys.add(row_key)
+                else:
+                    stale.append((row["id"],))
+            conn.executemany("DELETE FROM fd_match_goals WHERE id = ?", stale)
+            added = [g for k, g in incoming.items() if k not in stored_keys]
+            conn.executemany(
+                f"INSERT INTO fd_match_goals (match_id, {', '.join(GOAL_FIELDS)}, updated_at) "
+                f"VALUES (?, {', '.join('?' * len(GOAL_FIELDS))}, CURRENT_TIMESTAMP)",
+                [[p_match_id] + [_adapt(g.get(f)) for f in GOAL_FIELDS] for g in added]
+            )
+        return len(stale) + len(added)
@@ -14,11 +14,15 @@ if sys.platform == 'win32':
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
 from contextlib import asynccontextmanager
+import asyncio
+import signal
+import threading
 import uvicorn
 from app.config import settings, ensure_data_dir, ensure_logs_dir
-from app.database import init_db, supabase
+from app.database import init_db, get_client, run_query
 from app.api import fd_router, sporttery_router, system_router
 from app.scheduler import scheduler
+from app.services.live_hub import live_hub
 from app.web import web_router
 from fastapi.staticfiles import StaticFiles
 import os
@@ -35,6 +39,27 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def close_live_streams_on_exit():
+    """收到退出信号时先结束 SSE 连接
+
+    uvicorn 会等所有连接结束后才执行 lifespan 关闭（scheduler.stop 写出写后队列和同步日志），
+    长连接的实时比分流会一直阻塞这一步，因此在 uvicorn 自己的信号处理之前先关闭推送中心。
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(live_hub.close)
+            previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
@@ -53,6 +78,7 @@ async def lifespan(app: FastAPI):
         logger.info(f"数据库: {settings.DB_PATH}")
         logger.info(f"端口: {settings.PORT}")
         scheduler.start()
+        close_live_streams_on_exit()
         logger.info("MatchStats 服务已启动")
     else:
         logger.info("Vercel 环境：跳过调度器启动")
@@ -64,7 +90,7 @@ async def lifespan(app: FastAPI):
     # 关闭
     if not os.environ.get("VERCEL"):
         logger.info("MatchStats 服务关闭中...")
-        scheduler.stop()
+        await scheduler.stop()
         logger.info("MatchStats 服务已关闭")
 
 
@@ -81,10 +107,11 @@ async def get_predictions(request: Request):
     """获取云端博彩预测列表"""
     try:
         import traceback
-        if not supabase:
+        client = get_client()
+        if not client:
             return "<h1>Supabase 未配置</h1>"
         
-        response = supabase.table("match_predictions").select("*").order("created_at", desc=True).limit(20).execute()
+        response = await run_query(client.table("match_predictions").select("*").order("created_at", desc=True).limit(20))
         predictions = response.data
         
         html_content = "<html><head><meta charset='utf-8'><title>比赛预测</title><style>body{font-family:sans-serif;max-width:800px;margin:20px auto;line-height:1.6;background:#f4f7f6;padding:0 15px;} .card{background:#fff;border-radius:12px;box-shadow:0 4px 6px rgba(0,0,0,0.1);padding:20px;margin-bottom:25px;border-left:5px solid #2ecc71;} h2{color:#2c3e50;margin-top:0;} pre{white-space:pre-wrap;background:#fafafa;padding:15px;border-radius:6px;border:1px solid #eee;font-size:14px;color:#34495e;}</style></head><body>"
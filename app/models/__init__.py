@@ -15,6 +15,7 @@ class ApiResponse(BaseModel, Generic[T]):
     data: Optional[T] = None
     total: Optional[int] = None
     error: Optional[str] = None
+    next_cursor: Optional[str] = None  # 列表接口：下一页游标，没有更多数据时为空
     timestamp: str = ""
 
     def __init__(self, **kwargs):
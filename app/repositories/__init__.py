@@ -1,215 +1,403 @@
 """
 数据访问层 (Supabase 云数据库版)
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import asyncio
+import json
 import logging
+import time
+from collections import OrderedDict
+from postgrest import ReturnMethod
 from app.config import settings
-from app.database import supabase
+from app.database import get_client, run_query
+from app.repositories.fingerprint import get_fingerprint_store, row_fingerprint, row_key
+from app.repositories.journal import get_write_journal
+from app.repositories.pagination import encode_cursor, quote
+from app.services.events import data_events
+from app.services.team_dictionary import normalize_lang, team_dictionary
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class BulkWriteResult:
+    """批量写入结果"""
+    written: int = 0
+    failed: int = 0
+    skipped: int = 0  # 内容未变化而跳过的行
+
 class BaseRepository:
     """基础 Repository"""
     def __init__(self):
-        self._client = supabase
+        self._client = get_client()
+        self.fingerprints = get_fingerprint_store()
+        self.journal = get_write_journal()
     
     @property
     def client(self):
         if self._client is None:
-            from app.database import supabase as latest_supabase
-            self._client = latest_supabase
+            self._client = get_client()
             if self._client is None:
                 raise RuntimeError("Supabase client is not initialized. Please check your SUPABASE_KEY and SUPABASE_URL.")
         return self._client
 
+    async def _execute(self, query):
+        """在数据库线程池中执行查询，避免同步 HTTP 调用阻塞事件循环"""
+        return await run_query(query)
+
+    @staticmethod
+    def _single(response) -> Optional[Dict]:
+        """maybe_single() 的结果：postgrest 2.x 没有匹配行时返回 None 而不是响应对象"""
+        return response.data if response is not None else None
+
+    async def _bulk_upsert(self, table: str, rows: List[Dict], on_conflict: str = "",
+                           key_fields: Sequence[str] = (), journal: bool = True) -> BulkWriteResult:
+        """分块批量 upsert，单个块失败不影响其他块
+
+        Args:
+            on_conflict: 冲突列，留空时使用主键
+            key_fields: 冲突键字段，用于块内去重（同一键保留最后一行）、变更检测和写入日志
+            journal: 失败的块是否记入本地写入日志（回放时为 False）
+        """
+        result = BulkWriteResult()
+        if not rows:
+            return result
+        journal = self.journal if journal and key_fields else None
+        # 写入开始前分配序号：成功后只清除比它更早的待回放记录
+        seq = journal.next_seq() if journal else 0
+
+        # PostgreSQL 不允许一条 upsert 语句两次更新同一行，先按冲突键去重
+        if key_fields:
+            unique = {}
+            for row in rows:
+                unique[tuple(row.get(k) for k in key_fields)] = row
+            rows = list(unique.values())
+
+        # 变更检测：跳过与上次写入内容完全一致的行
+        digests = {}
+        if key_fields and self.fingerprints is not None:
+            digests = {row_key(row, key_fields): row_fingerprint(row) for row in rows}
+            seen = await self.fingerprints.get_many(table, digests.keys())
+            unchanged = {key for key, digest in digests.items() if seen.get(key) == digest}
+            if unchanged:
+                rows = [row for row in rows if row_key(row, key_fields) not in unchanged]
+            result.skipped = len(unchanged)
+
+        # 多行 upsert 按所有行的列并集写入，缺失的列会被写成 NULL，因此按列集合分组
+        groups: Dict[tuple, List[Dict]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        chunk_size = max(1, settings.DB_BATCH_SIZE)
+        written_rows = []
+        for group in groups.values():
+            for i in range(0, len(group), chunk_size):
+                chunk = group[i:i + chunk_size]
+                try:
+                    await self._execute(self.client.table(table).upsert(
+                        chunk, on_conflict=on_conflict, returning=ReturnMethod.minimal
+                    ))
+                    result.written += len(chunk)
+                    written_rows.extend(chunk)
+                    written = [row_key(row, key_fields) for row in chunk] if key_fields else []
+                    if digests:
+                        await self.fingerprints.put_many(table, {key: digests[key] for key in written})
+                    if journal:
+                        await self._journal_call(journal.discard(table, written, seq))
+                except Exception as e:
+                    result.failed += len(chunk)
+                    logger.error(f"Supabase 批量写入 {table} 失败 ({len(chunk)} 行): {e}")
+                    if journal:
+                        keys = [row_key(row, key_fields) for row in chunk]
+                        await self._journal_call(journal.append(table, chunk, keys, on_conflict, key_fields, seq))
+        if written_rows:
+            data_events.publish_rows(table, written_rows)
+        return result
+
+    @staticmethod
+    async def _journal_call(op):
+        """写入日志本身出错时只记录告警，不影响主流程"""
+        try:
+            await op
+        except Exception as e:
+            logger.warning(f"本地写入日志操作失败: {e}")
+
 class FDRepository(BaseRepository):
     """Football-Data 数据访问"""
 
+    @staticmethod
+    def _match_row(match: Dict) -> Dict:
+        return {
+            'fd_id': match.get('fd_id'),
+            'league_code': match.get('league_code'),
+            'home_team_id': match.get('home_team_id'),
+            'away_team_id': match.get('away_team_id'),
+            'home_team_name': match.get('home_team_name'),
+            'away_team_name': match.get('away_team_name'),
+            'match_date': match.get('match_date'),
+            'status': match.get('status'),
+            'home_score': match.get('home_score'),
+            'away_score': match.get('away_score'),
+            'home_half_score': match.get('home_half_score'),
+            'away_half_score': match.get('away_half_score'),
+            'referee': match.get('referee'),
+            'attendance': match.get('attendance'),
+            'matchday': match.get('matchday'),
+            'season': match.get('season'),
+            'updated_at': datetime.now().isoformat()
+        }
+
     async def save_match(self, match: Dict) -> bool:
-        """保存比赛"""
-        try:
-            # 准备数据
-            data = {
-                'fd_id': match.get('fd_id'),
-                'league_code': match.get('league_code'),
-                'home_team_id': match.get('home_team_id'),
-                'away_team_id': match.get('away_team_id'),
-                'home_team_name': match.get('home_team_name'),
-                'away_team_name': match.get('away_team_name'),
-                'match_date': match.get('match_date'),
-                'status': match.get('status'),
-                'home_score': match.get('home_score'),
-                'away_score': match.get('away_score'),
-                'home_half_score': match.get('home_half_score'),
-                'away_half_score': match.get('away_half_score'),
-                'referee': match.get('referee'),
-                'attendance': match.get('attendance'),
-                'matchday': match.get('matchday'),
-                'season': match.get('season'),
-                'updated_at': datetime.now().isoformat()
-            }
-            # 使用 upsert，基于 unique index (fd_id)
-            self.client.table('fd_matches').upsert(data, on_conflict="fd_id").execute()
+        """保存比赛（单行版，走 save_matches 的批量写入路径）"""
+        result = await self.save_matches([match])
+        return result.failed == 0
+
+    async def save_matches(self, matches: List[Dict]) -> BulkWriteResult:
+        """批量保存比赛"""
+        rows = [self._match_row(m) for m in matches]
+        return await self._bulk_upsert('fd_matches', rows, on_conflict="fd_id", key_fields=('fd_id',))
+
+    # fd_matches_enriched 视图不存在（迁移未执行）时回退到 fd_matches + 球队字典，
+    # 每隔 ENRICHED_VIEW_RECHECK 秒重新尝试视图，执行迁移后无需重启即可恢复
+    ENRICHED_VIEW_RECHECK = 600
+    _enriched_view_missing_at: Optional[float] = None
+
+    @staticmethod
+    def _is_missing_relation(error: Exception) -> bool:
+        """只有“表/视图不存在”才回退；超时、权限等错误照常上抛"""
+        if getattr(error, 'code', None) in ('42P01', 'PGRST205'):
             return True
-        except Exception as e:
-            logger.error(f"Supabase 保存比赛失败: {e}")
-            return False
+        # SQLite 后端
+        return 'no such table: fd_matches_enriched' in str(error)
 
     async def get_matches(self, date: Optional[str] = None,
                          league: Optional[str] = None,
                          status: Optional[str] = None,
                          limit: int = 100,
-                         lang: Optional[str] = 'en') -> List[Dict]:
+                         lang: Optional[str] = 'en',
+                         after: Optional[List] = None) -> List[Dict]:
         """获取比赛列表 (支持多语言)
 
         Args:
             lang: 语言代码，'en'=英文, 'zh'=中文, 默认 'en'
+            after: 上一页最后一行的 (match_date, fd_id)，见 match_cursor
         """
         try:
-            query = self.client.table('fd_matches').select("*")
-
-            if date:
-                query = query.gte('match_date', f"{date}T00:00:00").lte('match_date', f"{date}T23:59:59")
-            if league:
-                query = query.eq('league_code', league)
-            if status:
-                if status == 'LIVE':
-                    query = query.in_('status', ['LIVE', 'IN_PLAY', 'PAUSED'])
-                elif status == 'SCHEDULED':
-                    query = query.in_('status', ['SCHEDULED', 'TIMED'])
-                else:
-                    query = query.eq('status', status)
-
-            response = query.order('match_date', desc=False).limit(limit).execute()
+            missing_at = FDRepository._enriched_view_missing_at
+            if missing_at is None or time.monotonic() - missing_at >= self.ENRICHED_VIEW_RECHECK:
+                try:
+                    matches = await self._get_enriched_matches(date, league, status, limit, lang, after)
+                    if missing_at is not None:
+                        logger.info("fd_matches_enriched 视图已可用，比赛列表恢复使用读模型")
+                    FDRepository._enriched_view_missing_at = None
+                    return matches
+                except Exception as e:
+                    if not self._is_missing_relation(e):
+                        raise
+                    FDRepository._enriched_view_missing_at = time.monotonic()
+                    if missing_at is None:
+                        logger.warning("fd_matches_enriched 视图不存在，比赛列表改用 fd_matches + 球队字典")
+
+            response = await self._execute(self._filter_matches('fd_matches', date, league, status, limit, after))
             matches = response.data
 
-            # 获取所有相关球队ID
-            team_ids = set()
+            # 队名翻译和队徽从内存字典补全
+            await team_dictionary.ensure_fresh()
             for m in matches:
-                team_ids.add(m['home_team_id'])
-                team_ids.add(m['away_team_id'])
-
-            if team_ids:
-                # 根据语言参数决定查询策略
-                if lang in ['zh', 'zh-CN', 'zh_cn']:
-                    # 查询翻译表
-                    i18n_res = self.client.table('fd_teams_i18n').select("team_id, name_translated").in_('team_id', list(team_ids)).eq('lang_code', 'zh-CN').execute()
-                    team_map = {t['team_id']: t['name_translated'] for t in i18n_res.data}
-                else:
-                    # 英文：使用原始队名
-                    team_map = {}
-
-                # 获取队徽
-                teams_res = self.client.table('fd_teams').select("fd_id, crest").in_('fd_id', list(team_ids)).execute()
-                crest_map = {t['fd_id']: t.get('crest') for t in teams_res.data}
-
-                for m in matches:
-                    # 队名：优先使用翻译，否则使用英文原名
-                    h_name = team_map.get(m['home_team_id']) or m['home_team_name']
-                    a_name = team_map.get(m['away_team_id']) or m['away_team_name']
-
-                    m['home_team_name'] = h_name
-                    m['away_team_name'] = a_name
-                    m['home_team_logo'] = crest_map.get(m['home_team_id'])
-                    m['away_team_logo'] = crest_map.get(m['away_team_id'])
+                # 队名：优先使用翻译，否则使用英文原名
+                m['home_team_name'] = team_dictionary.name(m['home_team_id'], lang, m['home_team_name'])
+                m['away_team_name'] = team_dictionary.name(m['away_team_id'], lang, m['away_team_name'])
+                m['home_team_logo'] = team_dictionary.crest(m['home_team_id'])
+                m['away_team_logo'] = team_dictionary.crest(m['away_team_id'])
 
             return matches
         except Exception as e:
             logger.error(f"Supabase 获取比赛失败: {e}")
             return []
 
+    @staticmethod
+    def match_cursor(row: Dict) -> str:
+        """比赛列表下一页的游标"""
+        return encode_cursor('fd', [row['match_date'], row['fd_id']])
+
+    def _filter_matches(self, table: str, date: Optional[str], league: Optional[str],
+                        status: Optional[str], limit: int, after: Optional[List] = None):
+        query = self.client.table(table).select("*")
+
+        if date:
+            query = query.gte('match_date', f"{date}T00:00:00").lte('match_date', f"{date}T23:59:59")
+        if league:
+            query = query.eq('league_code', league)
+        if status:
+            if status == 'LIVE':
+                query = query.in_('status', ['LIVE', 'IN_PLAY', 'PAUSED'])
+            elif status == 'SCHEDULED':
+                query = query.in_('status', ['SCHEDULED', 'TIMED'])
+            else:
+                query = query.eq('status', status)
+        if after:
+            # 键集分页：(match_date, fd_id) 大于上一页最后一行
+            match_date, fd_id = after
+            query = query.or_(
+                f"match_date.gt.{quote(match_date)},"
+                f"and(match_date.eq.{quote(match_date)},fd_id.gt.{int(fd_id)})"
+            )
+
+        return query.order('match_date', desc=False).order('fd_id', desc=False).limit(limit)
+
+    async def _get_enriched_matches(self, date: Optional[str], league: Optional[str],
+                                    status: Optional[str], limit: int, lang: Optional[str],
+                                    after: Optional[List] = None) -> List[Dict]:
+        """从读模型视图一次查出比赛、队徽和中文译名"""
+        response = await self._execute(
+            self._filter_matches('fd_matches_enriched', date, league, status, limit, after)
+        )
+        matches = response.data
+        zh = normalize_lang(lang) == 'zh-CN'
+        for m in matches:
+            home_zh = m.pop('home_team_name_zh', None)
+            away_zh = m.pop('away_team_name_zh', None)
+            if zh:
+                m['home_team_name'] = home_zh or m['home_team_name']
+                m['away_team_name'] = away_zh or m['away_team_name']
+        return matches
+
     async def get_match_by_id(self, fd_id: int) -> Optional[Dict]:
         """获取单场比赛"""
-        response = self.client.table('fd_matches').select("*").eq('fd_id', fd_id).maybe_single().execute()
-        return response.data
+        response = await self._execute(self.client.table('fd_matches').select("*").eq('fd_id', fd_id).maybe_single())
+        return self._single(response)
 
     async def get_leagues(self) -> List[Dict]:
         """获取联赛列表"""
-        response = self.client.table('fd_leagues').select("*").order('code').execute()
+        response = await self._execute(self.client.table('fd_leagues').select("*").order('code'))
         return response.data
 
     async def get_teams(self, league_code: Optional[str] = None) -> List[Dict]:
         """获取球队列表"""
         if league_code:
-            # 这是一个复杂的查询，因为需要关联 matches
-            # 在 Supabase 中通常通过 RPC 或者先查出 team_ids
-            match_res = self.client.table('fd_matches').select("home_team_id, away_team_id").eq('league_code', league_code).execute()
-            team_ids = set()
-            for m in match_res.data:
-                team_ids.add(m['home_team_id'])
-                team_ids.add(m['away_team_id'])
-            
+            # 联赛成员关系来自内存中的 fd_league_teams，只需一次按主键的查询
+            await team_dictionary.ensure_fresh()
+            team_ids = team_dictionary.league_teams(league_code)
+            if not team_ids:
+                # 成员表尚未填充：回退到从该联赛的比赛中收集球队
+                match_res = await self._execute(self.client.table('fd_matches').select("home_team_id, away_team_id").eq('league_code', league_code))
+                team_ids = set()
+                for m in match_res.data:
+                    team_ids.add(m['home_team_id'])
+                    team_ids.add(m['away_team_id'])
+
             if not team_ids: return []
-            
-            response = self.client.table('fd_teams').select("*").in_('fd_id', list(team_ids)).order('name').execute()
+
+            response = await self._execute(self.client.table('fd_teams').select("*").in_('fd_id', list(team_ids)).order('name'))
             return response.data
         else:
-            response = self.client.table('fd_teams').select("*").order('name').execute()
+            response = await self._execute(self.client.table('fd_teams').select("*").order('name'))
             return response.data
 
-    async def save_team(self, team: Dict) -> bool:
-        """保存球队"""
+    async def save_league_teams(self, league_code: str, team_ids: List[int]) -> BulkWriteResult:
+        """替换联赛的参赛球队：写入当前成员并删除已不在联赛中的球队"""
+        now = datetime.now().isoformat()
+        rows = [{'league_code': league_code, 'team_id': team_id, 'updated_at': now} for team_id in team_ids]
+        result = await self._bulk_upsert('fd_league_teams', rows, on_conflict="league_code,team_id",
+                                         key_fields=('league_code', 'team_id'))
+        if result.failed:
+            return result
         try:
-            data = {
-                'fd_id': team.get('fd_id'),
-                'name': team.get('name'),
-                'short_name': team.get('short_name'),
-                'tla': team.get('tla'),
-                'crest': team.get('crest'),
-                'venue': team.get('venue'),
-                'founded': team.get('founded'),
-                'club_colors': team.get('club_colors'),
-                'website': team.get('website'),
-                'updated_at': datetime.now().isoformat()
-            }
-            self.client.table('fd_teams').upsert(data, on_conflict="fd_id").execute()
-            return True
+            current = await self._execute(self.client.table('fd_league_teams').select("team_id").eq('league_code', league_code))
+            stale = {row['team_id'] for row in current.data} - set(team_ids)
+            if stale:
+                await self._execute(self.client.table('fd_league_teams').delete().eq('league_code', league_code).in_('team_id', list(stale)))
+                if self.fingerprints is not None:
+                    # 球队之后重新进入联赛时不能被当作“未变化”跳过
+                    keys = [row_key({'league_code': league_code, 'team_id': t}, ('league_code', 'team_id')) for t in stale]
+                    await self.fingerprints.forget_many('fd_league_teams', keys)
+                data_events.publish('fd_league_teams', {league_code})
+                logger.info(f"联赛 {league_code} 移除 {len(stale)} 支已不在联赛中的球队")
         except Exception as e:
-            logger.error(f"Supabase 保存球队失败: {e}")
-            return False
+            logger.error(f"Supabase 清理联赛球队失败 ({league_code}): {e}")
+            result.failed += 1  # 成员关系未完全替换，调用方不应把这次响应当作已保存
+        team_dictionary.set_league_teams(league_code, team_ids)
+        return result
+
+    @staticmethod
+    def _team_row(team: Dict) -> Dict:
+        return {
+            'fd_id': team.get('fd_id'),
+            'name': team.get('name'),
+            'short_name': team.get('short_name'),
+            'tla': team.get('tla'),
+            'crest': team.get('crest'),
+            'venue': team.get('venue'),
+            'founded': team.get('founded'),
+            'club_colors': team.get('club_colors'),
+            'website': team.get('website'),
+            'updated_at': datetime.now().isoformat()
+        }
+
+    async def save_team(self, team: Dict) -> bool:
+        """保存球队（单行版，走 save_teams 的批量写入路径）"""
+        result = await self.save_teams([team])
+        return result.failed == 0
+
+    async def save_teams(self, teams: List[Dict]) -> BulkWriteResult:
+        """批量保存球队"""
+        rows = [self._team_row(t) for t in teams]
+        result = await self._bulk_upsert('fd_teams', rows, on_conflict="fd_id", key_fields=('fd_id',))
+        # 同进程内立即更新内存字典中的队徽
+        team_dictionary.apply_teams(rows)
+        return result
+
+    @staticmethod
+    def _league_row(league: Dict) -> Dict:
+        return {
+            'fd_id': league.get('fd_id'),
+            'code': league.get('code'),
+            'name': league.get('name'),
+            'country': league.get('country'),
+            'current_season': league.get('current_season'),
+            'emblem': league.get('emblem'),
+            'updated_at': datetime.now().isoformat()
+        }
 
     async def save_league(self, league: Dict) -> bool:
-        """保存联赛"""
-        try:
-            data = {
-                'fd_id': league.get('fd_id'),
-                'code': league.get('code'),
-                'name': league.get('name'),
-                'country': league.get('country'),
-                'current_season': league.get('current_season'),
-                'emblem': league.get('emblem'),
-                'updated_at': datetime.now().isoformat()
-            }
-            self.client.table('fd_leagues').upsert(data, on_conflict="fd_id").execute()
-            return True
-        except Exception as e:
-            logger.error(f"Supabase 保存联赛失败: {e}")
-            return False
+        """保存联赛（单行版，走 save_leagues 的批量写入路径）"""
+        result = await self.save_leagues([league])
+        return result.failed == 0
+
+    async def save_leagues(self, leagues: List[Dict]) -> BulkWriteResult:
+        """批量保存联赛"""
+        rows = [self._league_row(l) for l in leagues]
+        return await self._bulk_upsert('fd_leagues', rows, on_conflict="fd_id", key_fields=('fd_id',))
+
+    @staticmethod
+    def _scorer_row(scorer: Dict) -> Dict:
+        return {
+            'league_code': scorer.get('league_code'),
+            'season': scorer.get('season'),
+            'player_id': scorer.get('player_id'),
+            'player_name': scorer.get('player_name'),
+            'team_id': scorer.get('team_id'),
+            'team_name': scorer.get('team_name'),
+            'position': scorer.get('position'),
+            'goals': scorer.get('goals') or 0,
+            'assists': scorer.get('assists') or 0,
+            'penalties': scorer.get('penalties') or 0,
+            'played_matches': scorer.get('played_matches') or 0,
+            'updated_at': datetime.now().isoformat()
+        }
 
     async def save_scorer(self, scorer: Dict) -> bool:
-        """保存射手榜"""
-        try:
-            data = {
-                'league_code': scorer.get('league_code'),
-                'season': scorer.get('season'),
-                'player_id': scorer.get('player_id'),
-                'player_name': scorer.get('player_name'),
-                'team_id': scorer.get('team_id'),
-                'team_name': scorer.get('team_name'),
-                'position': scorer.get('position'),
-                'goals': scorer.get('goals') or 0,
-                'assists': scorer.get('assists') or 0,
-                'penalties': scorer.get('penalties') or 0,
-                'played_matches': scorer.get('played_matches') or 0,
-                'updated_at': datetime.now().isoformat()
-            }
-            # 注意：scorers 表通常没有唯一约束 fd_id，所以手动处理重复
-            self.client.table('fd_scorers').upsert(data, on_conflict="league_code,player_id").execute()
-            return True
-        except Exception as e:
-            logger.error(f"Supabase 保存射手失败: {e}")
-            return False
+        """保存射手榜（单行版，走 save_scorers 的批量写入路径）"""
+        result = await self.save_scorers([scorer])
+        return result.failed == 0
+
+    async def save_scorers(self, scorers: List[Dict]) -> BulkWriteResult:
+        """批量保存射手榜"""
+        rows = [self._scorer_row(s) for s in scorers]
+        return await self._bulk_upsert('fd_scorers', rows, on_conflict="league_code,player_id",
+                                       key_fields=('league_code', 'player_id'))
 
     async def get_scorers(self, league_code: str, season: Optional[int] = None,
                          order_by: str = 'goals', lang: Optional[str] = 'en') -> List[Dict]:
@@ -228,51 +416,48 @@ class FDRepository(BaseRepository):
             else:
                 query = query.order('goals', desc=True).order('assists', desc=True)
 
-            response = query.limit(50).execute()
+            response = await self._execute(query.limit(50))
             scorers = response.data
 
-            # 根据语言参数关联翻译
-            team_ids = list(set([s['team_id'] for s in scorers]))
-            if team_ids:
-                if lang in ['zh', 'zh-CN', 'zh_cn']:
-                    # 查询翻译表
-                    i18n_res = self.client.table('fd_teams_i18n').select("team_id, name_translated").in_('team_id', team_ids).eq('lang_code', 'zh-CN').execute()
-                    team_map = {t['team_id']: t['name_translated'] for t in i18n_res.data}
-                else:
-                    team_map = {}
-
-                for s in scorers:
-                    s['team_name'] = team_map.get(s['team_id']) or s['team_name']
+            # 根据语言参数关联翻译（内存字典）
+            await team_dictionary.ensure_fresh()
+            for s in scorers:
+                s['team_name'] = team_dictionary.name(s['team_id'], lang, s['team_name'])
 
             return scorers
         except Exception as e:
             logger.error(f"获取射手榜失败: {e}")
             return []
 
+    @staticmethod
+    def _standing_row(standing: Dict) -> Dict:
+        return {
+            'league_code': standing.get('league_code'),
+            'team_id': standing.get('team_id'),
+            'team_name': standing.get('team_name'),
+            'season': standing.get('season'),
+            'position': standing.get('position'),
+            'played_games': standing.get('played_games'),
+            'won': standing.get('won'),
+            'draw': standing.get('draw'),
+            'lost': standing.get('lost'),
+            'points': standing.get('points'),
+            'goals_for': standing.get('goals_for'),
+            'goals_against': standing.get('goals_against'),
+            'goal_diff': standing.get('goal_diff'),
+            'updated_at': datetime.now().isoformat()
+        }
+
     async def save_standing(self, standing: Dict) -> bool:
-        """保存积分榜"""
-        try:
-            data = {
-                'league_code': standing.get('league_code'),
-                'team_id': standing.get('team_id'),
-                'team_name': standing.get('team_name'),
-                'season': standing.get('season'),
-                'position': standing.get('position'),
-                'played_games': standing.get('played_games'),
-                'won': standing.get('won'),
-                'draw': standing.get('draw'),
-                'lost': standing.get('lost'),
-                'points': standing.get('points'),
-                'goals_for': standing.get('goals_for'),
-                'goals_against': standing.get('goals_against'),
-                'goal_diff': standing.get('goal_diff'),
-                'updated_at': datetime.now().isoformat()
-            }
-            self.client.table('fd_standings').upsert(data, on_conflict="league_code,team_id").execute()
-            return True
-        except Exception as e:
-            logger.error(f"Supabase 保存积分榜失败: {e}")
-            return False
+        """保存积分榜（单行版，走 save_standings 的批量写入路径）"""
+        result = await self.save_standings([standing])
+        return result.failed == 0
+
+    async def save_standings(self, standings: List[Dict]) -> BulkWriteResult:
+        """批量保存积分榜"""
+        rows = [self._standing_row(s) for s in standings]
+        return await self._bulk_upsert('fd_standings', rows, on_conflict="league_code,team_id",
+                                       key_fields=('league_code', 'team_id'))
 
     async def get_standings(self, league_code: str, season: Optional[int] = None,
                            lang: Optional[str] = 'en') -> List[Dict]:
@@ -282,21 +467,13 @@ class FDRepository(BaseRepository):
             lang: 语言代码，'en'=英文, 'zh'=中文, 默认 'en'
         """
         try:
-            response = self.client.table('fd_standings').select("*").eq('league_code', league_code).order('position', desc=False).execute()
+            response = await self._execute(self.client.table('fd_standings').select("*").eq('league_code', league_code).order('position', desc=False))
             standings = response.data
 
-            # 根据语言参数关联翻译
-            team_ids = [s['team_id'] for s in standings]
-            if team_ids:
-                if lang in ['zh', 'zh-CN', 'zh_cn']:
-                    # 查询翻译表
-                    i18n_res = self.client.table('fd_teams_i18n').select("team_id, name_translated").in_('team_id', team_ids).eq('lang_code', 'zh-CN').execute()
-                    team_map = {t['team_id']: t['name_translated'] for t in i18n_res.data}
-                else:
-                    team_map = {}
-
-                for s in standings:
-                    s['team_name'] = team_map.get(s['team_id']) or s['team_name']
+            # 根据语言参数关联翻译（内存字典）
+            await team_dictionary.ensure_fresh()
+            for s in standings:
+                s['team_name'] = team_dictionary.name(s['team_id'], lang, s['team_name'])
 
             return standings
         except Exception as e:
@@ -305,9 +482,26 @@ class FDRepository(BaseRepository):
 
     async def get_stats(self) -> Dict:
         """获取统计"""
-        matches_count = self.client.table('fd_matches').select('id', count='exact').limit(1).execute().count
+        matches_count = (await self._execute(self.client.table('fd_matches').select('id', count='exact').limit(1))).count
         return {"fd_matches": matches_count or 0}
 
+    @staticmethod
+    def _details_projection(details_json: Optional[str]) -> Dict:
+        """从原始比赛 JSON 中提取详情接口需要的场馆、首发和替补"""
+        try:
+            full_data = json.loads(details_json) if details_json else {}
+        except (TypeError, ValueError):
+            full_data = {}
+        home = full_data.get('homeTeam') or {}
+        away = full_data.get('awayTeam') or {}
+        return {
+            'venue': full_data.get('venue'),
+            'lineup_home': home.get('lineup') or [],
+            'lineup_away': away.get('lineup') or [],
+            'bench_home': home.get('bench') or [],
+            'bench_away': away.get('bench') or [],
+        }
+
     async def save_match_details(self, details: Dict) -> bool:
         """保存比赛详情"""
         try:
@@ -326,36 +520,50 @@ class FDRepository(BaseRepository):
                 'details_json': details.get('details_json'),
                 'updated_at': datetime.now().isoformat()
             }
-            self.client.table('fd_match_details').upsert(data, on_conflict="match_id").execute()
-            return True
+            # 写入时提取场馆和阵容，读取时无需再解析 details_json
+            data.update(self._details_projection(details.get('details_json')))
+            # 经批量写入路径：内容未变化时跳过，失败时进入本地写入日志等待回放
+            result = await self._bulk_upsert('fd_match_details', [data], on_conflict="match_id",
+                                             key_fields=('match_id',))
+            return result.failed == 0
         except Exception as e:
             logger.error(f"Supabase 保存比赛详情失败: {e}")
             return False
 
-    async def save_match_goal(self, goal: Dict) -> bool:
-        """保存进球记录"""
+    GOAL_FIELDS = ('team_id', 'team_name', 'player_id', 'player_name',
+                   'minute', 'minute_extra', 'type', 'home_away')
+
+    async def replace_match_goals(self, match_id: int, goals: List[Dict]) -> Optional[int]:
+        """原子替换比赛进球集合，返回实际变更的行数；失败返回 None
+
+        先与已保存的进球比较，完全一致时不发起写入；
+        否则调用 replace_match_goals 函数，在服务端只删除消失的、插入新增的进球。
+        """
         try:
-            data = {
-                'match_id': goal.get('match_id'),
-                'team_id': goal.get('team_id'),
-                'team_name': goal.get('team_name'),
-                'player_id': goal.get('player_id'),
-                'player_name': goal.get('player_name'),
-                'minute': goal.get('minute'),
-                'minute_extra': goal.get('minute_extra'),
-                'type': goal.get('type'),
-                'home_away': goal.get('home_away'),
-                'updated_at': datetime.now().isoformat()
-            }
-            self.client.table('fd_match_goals').insert(data).execute()
-            return True
+            incoming = [{k: goal.get(k) for k in self.GOAL_FIELDS} for goal in goals]
+            stored_res = await self._execute(
+                self.client.table('fd_match_goals').select(",".join(self.GOAL_FIELDS)).eq('match_id', match_id)
+            )
+            stored = [{k: row.get(k) for k in self.GOAL_FIELDS} for row in stored_res.data]
+
+            def as_key(goal: Dict):
+                return tuple(goal[k] for k in self.GOAL_FIELDS)
+
+            if sorted(map(as_key, incoming), key=repr) == sorted(map(as_key, stored), key=repr):
+                return 0
+
+            response = await self._execute(
+                self.client.rpc('replace_match_goals', {'p_match_id': match_id, 'p_goals': incoming})
+            )
+            data_events.publish('fd_match_goals', {match_id})
+            return response.data or 0
         except Exception as e:
-            logger.error(f"Supabase 保存进球失败: {e}")
-            return False
+            logger.error(f"Supabase 替换进球失败 ({match_id}): {e}")
+            return None
 
-    async def clear_match_goals(self, match_id: int):
-        """清除比赛进球记录"""
-        self.client.table('fd_match_goals').delete().eq('match_id', match_id).execute()
+    async def clear_match_goals(self, match_id: int) -> bool:
+        """清除比赛进球记录（走 replace_match_goals）"""
+        return await self.replace_match_goals(match_id, []) is not None
 
     async def save_team_coach(self, coach: Dict) -> bool:
         """保存球队教练"""
@@ -371,61 +579,84 @@ class FDRepository(BaseRepository):
                 'contract_until': coach.get('contract_until'),
                 'updated_at': datetime.now().isoformat()
             }
-            self.client.table('fd_team_coaches').upsert(data, on_conflict="team_id").execute()
-            return True
+            result = await self._bulk_upsert('fd_team_coaches', [data], on_conflict="team_id",
+                                             key_fields=('team_id',))
+            return result.failed == 0
         except Exception as e:
             logger.error(f"Supabase 保存教练失败: {e}")
             return False
 
+    @staticmethod
+    def _squad_row(player: Dict) -> Dict:
+        return {
+            'team_id': player.get('team_id'),
+            'player_id': player.get('player_id'),
+            'player_name': player.get('player_name'),
+            'position': player.get('position'),
+            'shirt_number': player.get('shirt_number'),
+            'nationality': player.get('nationality'),
+            'date_of_birth': player.get('date_of_birth'),
+            'contract_until': player.get('contract_until'),
+            'season': player.get('season'),
+            'updated_at': datetime.now().isoformat()
+        }
+
     async def save_team_squad(self, player: Dict) -> bool:
-        """保存球队阵容球员"""
-        try:
-            data = {
-                'team_id': player.get('team_id'),
-                'player_id': player.get('player_id'),
-                'player_name': player.get('player_name'),
-                'position': player.get('position'),
-                'shirt_number': player.get('shirt_number'),
-                'nationality': player.get('nationality'),
-                'date_of_birth': player.get('date_of_birth'),
-                'contract_until': player.get('contract_until'),
-                'season': player.get('season'),
-                'updated_at': datetime.now().isoformat()
-            }
-            # 组合主键 (team_id, player_id) 在迁移时已有处理
-            self.client.table('fd_team_squads').upsert(data).execute()
-            return True
-        except Exception as e:
-            logger.error(f"Supabase 保存阵容失败: {e}")
-            return False
+        """保存球队阵容球员（单行版，走 save_team_squads 的批量写入路径）"""
+        result = await self.save_team_squads([player])
+        return result.failed == 0
+
+    async def save_team_squads(self, players: List[Dict]) -> BulkWriteResult:
+        """批量保存球队阵容"""
+        rows = [self._squad_row(p) for p in players]
+        return await self._bulk_upsert('fd_team_squads', rows, key_fields=('team_id', 'player_id'))
+
+    # 已结束比赛的详情不再变化：进程内按比赛缓存，数量有上限
+    _finished_details: "OrderedDict[int, Dict]" = OrderedDict()
+
+    @classmethod
+    def _forget_finished_details(cls, table: str, scopes: Optional[set]):
+        """同进程内补写了详情或进球时丢弃对应缓存"""
+        if table not in ('fd_match_details', 'fd_match_goals'):
+            return
+        if scopes is None:
+            cls._finished_details.clear()
+        else:
+            for match_id in scopes:
+                cls._finished_details.pop(match_id, None)
 
     async def get_match_details(self, match_id: int) -> Optional[Dict]:
         """获取比赛详情"""
+        cached = self._finished_details.get(match_id)
+        if cached is not None:
+            self._finished_details.move_to_end(match_id)
+            return dict(cached)
+
         try:
-            # 1. 基础详情
-            detail_res = self.client.table('fd_match_details').select("*").eq('match_id', match_id).maybe_single().execute()
-            detail = detail_res.data
+            # 基础详情、进球、比赛信息三个查询互不依赖，并发执行
+            detail_res, goals_res, match_res = await asyncio.gather(
+                self._execute(self.client.table('fd_match_details').select("*").eq('match_id', match_id).maybe_single()),
+                self._execute(self.client.table('fd_match_goals').select("*").eq('match_id', match_id).order('minute').order('minute_extra')),
+                self._execute(self.client.table('fd_matches').select("referee, status").eq('fd_id', match_id).maybe_single())
+            )
+            detail = self._single(detail_res)
             if not detail: return None
+            match = self._single(match_res)
 
-            # 2. 进球
-            goals_res = self.client.table('fd_match_goals').select("*").eq('match_id', match_id).order('minute').order('minute_extra').execute()
             detail['goals'] = goals_res.data
-
-            # 3. 基础比赛信息
-            match_res = self.client.table('fd_matches').select("referee").eq('fd_id', match_id).maybe_single().execute()
-            if match_res.data:
-                detail['referee'] = match_res.data.get('referee')
-
-            # 4. 解析 JSON
-            import json
-            try:
-                full_data = json.loads(detail['details_json'])
-                detail['venue'] = full_data.get('venue')
-                detail['lineup_home'] = full_data.get('homeTeam', {}).get('lineup', [])
-                detail['lineup_away'] = full_data.get('awayTeam', {}).get('lineup', [])
-            except:
-                pass
-            
+            if match:
+                detail['referee'] = match.get('referee')
+
+            # 场馆/阵容在写入时已提取；迁移前写入的旧行仍从 details_json 解析
+            details_json = detail.pop('details_json', None)
+            if detail.get('lineup_home') is None:
+                detail.update(self._details_projection(details_json))
+
+            if match and match.get('status') == 'FINISHED':
+                self._finished_details[match_id] = detail
+                while len(self._finished_details) > settings.FINISHED_DETAILS_CACHE_SIZE:
+                    self._finished_details.popitem(last=False)
+                return dict(detail)
             return detail
         except Exception as e:
             logger.error(f"Supabase 获取详情失败: {e}")
@@ -433,53 +664,60 @@ class FDRepository(BaseRepository):
 
     async def get_all_team_ids(self) -> List[int]:
         """获取所有球队ID"""
-        response = self.client.table('fd_teams').select("fd_id").execute()
+        response = await self._execute(self.client.table('fd_teams').select("fd_id"))
         return [row['fd_id'] for row in response.data]
 
     async def get_match_ids_by_status(self, status: str) -> List[int]:
         """获取指定状态的比赛ID"""
-        response = self.client.table('fd_matches').select("fd_id").eq('status', status).execute()
+        response = await self._execute(self.client.table('fd_matches').select("fd_id").eq('status', status))
         return [row['fd_id'] for row in response.data]
 
+data_events.subscribe(FDRepository._forget_finished_details)
+
 class SportteryRepository(BaseRepository):
     """竞彩数据访问 (Supabase版)"""
 
+    @staticmethod
+    def _match_row(match: Dict) -> Dict:
+        data = {
+            'match_code': match.get('match_code'),
+            'group_date': match.get('group_date'),
+            'home_team': match.get('home_team'),
+            'away_team': match.get('away_team'),
+            'league': match.get('league'),
+            # 'match_time': match.get('match_time'), # REMOVED: Handled conditionally below
+            'status': match.get('status', 'pending'),
+            'actual_score': match.get('actual_score'),
+            'half_score': match.get('half_score'),
+            'handicap': match.get('handicap'),
+            'updated_at': datetime.now().isoformat()
+        }
+
+        # 只有当抓取源提供了有效时间时才更新 match_time
+        # 防止"比分接口"（不带时间）覆盖掉"赛程接口"（带时间）的记录
+        if match.get('match_time'):
+            data['match_time'] = match.get('match_time')
+
+            # [Fix Grouping Mismatch]
+            # 如果有准确的 match_time，强制重写 group_date 为比赛实际发生的日期
+            # 解决：周三012 (凌晨踢) 被分到周五组的问题
+            try:
+                dt = datetime.strptime(match.get('match_time'), "%Y-%m-%d %H:%M:%S")
+                data['group_date'] = dt.strftime("%Y-%m-%d")
+            except:
+                pass
+        return data
+
     async def save_match(self, match: Dict) -> bool:
-        """保存比赛"""
-        try:
-            data = {
-                'match_code': match.get('match_code'),
-                'group_date': match.get('group_date'),
-                'home_team': match.get('home_team'),
-                'away_team': match.get('away_team'),
-                'league': match.get('league'),
-                # 'match_time': match.get('match_time'), # REMOVED: Handled conditionally below
-                'status': match.get('status', 'pending'),
-                'actual_score': match.get('actual_score'),
-                'half_score': match.get('half_score'),
-                'handicap': match.get('handicap'),
-                'updated_at': datetime.now().isoformat()
-            }
-            
-            # 只有当抓取源提供了有效时间时才更新 match_time
-            # 防止"比分接口"（不带时间）覆盖掉"赛程接口"（带时间）的记录
-            if match.get('match_time'):
-                data['match_time'] = match.get('match_time')
-                
-                # [Fix Grouping Mismatch]
-                # 如果有准确的 match_time，强制重写 group_date 为比赛实际发生的日期
-                # 解决：周三012 (凌晨踢) 被分到周五组的问题
-                try:
-                    dt = datetime.strptime(match.get('match_time'), "%Y-%m-%d %H:%M:%S")
-                    data['group_date'] = dt.strftime("%Y-%m-%d")
-                except:
-                    pass
+        """保存比赛（单行版，走 save_matches 的批量写入路径）"""
+        result = await self.save_matches([match])
+        return result.failed == 0
 
-            self.client.table('sporttery_matches').upsert(data, on_conflict="group_date,match_code").execute()
-            return True
-        except Exception as e:
-            logger.error(f"Supabase 保存竞彩数据失败: {e}")
-            return False
+    async def save_matches(self, matches: List[Dict]) -> BulkWriteResult:
+        """批量保存比赛"""
+        rows = [self._match_row(m) for m in matches]
+        return await self._bulk_upsert('sporttery_matches', rows, on_conflict="group_date,match_code",
+                                       key_fields=('group_date', 'match_code'))
 
     async def update_match_score(self, match_code: str, home_team: str, away_team: str, actual_score: str, half_score: str) -> bool:
         """更新比赛比分 (基于编号+队名双重锁定，彻底解决日期时差问题)"""
@@ -493,13 +731,14 @@ class SportteryRepository(BaseRepository):
             
             # 使用编号+主队名+客队名进行锁定，这是全网最稳的匹配方式
             # 这三个属性加在一起，在短时间内绝对具备全球唯一性
-            self.client.table('sporttery_matches') \
-                .update(data) \
-                .eq('match_code', match_code) \
-                .eq('home_team', home_team) \
-                .eq('away_team', away_team) \
-                .execute()
-                
+            await self._execute(
+                self.client.table('sporttery_matches')
+                .update(data)
+                .eq('match_code', match_code)
+                .eq('home_team', home_team)
+                .eq('away_team', away_team)
+            )
+            data_events.publish('sporttery_matches')
             return True
         except Exception as e:
             logger.error(f"Supabase 更新竞彩比分失败 ({match_code}): {e}")
@@ -507,21 +746,30 @@ class SportteryRepository(BaseRepository):
 
     async def get_matches(self, date: Optional[str] = None,
                           status: Optional[str] = None,
-                          limit: int = 100) -> List[Dict]:
-        """获取比赛列表"""
+                          limit: int = 100,
+                          after: Optional[List] = None) -> List[Dict]:
+        """获取比赛列表
+
+        Args:
+            after: 上一页最后一行的 (group_date, match_time, id)，见 match_cursor
+        """
         query = self.client.table('sporttery_matches').select("*")
         if date:
             query = query.eq('group_date', date)
         if status:
             query = query.eq('status', status.lower())
+        if after:
+            query = query.or_(self._keyset_filter(*after))
         
-        response = query.order('group_date', desc=True).order('match_time', desc=False).limit(limit).execute()
+        response = await self._execute(
+            query.order('group_date', desc=True).order('match_time', desc=False).order('id', desc=False).limit(limit)
+        )
         matches = response.data
 
         if matches:
             match_ids = [m['id'] for m in matches]
             # 批量获取预测数据
-            pred_res = self.client.table('match_predictions').select("*").in_('match_id', match_ids).execute()
+            pred_res = await self._execute(self.client.table('match_predictions').select("*").in_('match_id', match_ids))
             pred_map = {p['match_id']: p for p in pred_res.data}
             
             for m in matches:
@@ -530,16 +778,34 @@ class SportteryRepository(BaseRepository):
         
         return matches
 
+    @staticmethod
+    def match_cursor(row: Dict) -> str:
+        """比赛列表下一页的游标"""
+        return encode_cursor('sp', [row['group_date'], row.get('match_time'), row['id']])
+
+    @staticmethod
+    def _keyset_filter(group_date: str, match_time: Optional[str], match_id: int) -> str:
+        """排序为 group_date 降序、match_time 升序（NULL 在后）、id 升序，取排在游标之后的行"""
+        same_day = f"group_date.eq.{quote(group_date)}"
+        if match_time is None:
+            return f"group_date.lt.{quote(group_date)},and({same_day},match_time.is.null,id.gt.{int(match_id)})"
+        return (
+            f"group_date.lt.{quote(group_date)},"
+            f"and({same_day},or(match_time.gt.{quote(match_time)},match_time.is.null,"
+            f"and(match_time.eq.{quote(match_time)},id.gt.{int(match_id)})))"
+        )
+
     async def get_match_by_code(self, match_code: str) -> Optional[Dict]:
         """获取单场竞彩比赛详细信息"""
         try:
-            response = self.client.table('sporttery_matches').select("*").eq('match_code', match_code).maybe_single().execute()
-            match = response.data
+            response = await self._execute(self.client.table('sporttery_matches').select("*").eq('match_code', match_code).maybe_single())
+            match = self._single(response)
             if match:
                 # 获取预测数据
-                pred_res = self.client.table('match_predictions').select("*").eq('match_id', match['id']).maybe_single().execute()
-                if pred_res.data:
-                    match['prediction'] = pred_res.data
+                pred_res = await self._execute(self.client.table('match_predictions').select("*").eq('match_id', match['id']).maybe_single())
+                prediction = self._single(pred_res)
+                if prediction:
+                    match['prediction'] = prediction
             return match
         except Exception as e:
             logger.error(f"获取单场竞彩比赛失败 ({match_code}): {e}")
@@ -547,7 +813,7 @@ class SportteryRepository(BaseRepository):
 
     async def get_stats(self) -> Dict:
         """获取统计"""
-        count = self.client.table('sporttery_matches').select('id', count='exact').limit(1).execute().count
+        count = (await self._execute(self.client.table('sporttery_matches').select('id', count='exact').limit(1))).count
         return {"sporttery_matches": count or 0}
 
 class LogRepository(BaseRepository):
@@ -556,41 +822,53 @@ class LogRepository(BaseRepository):
     async def log_sync(self, source: str, task_type: str, status: str,
                        records_count: int = 0, error_message: str = "",
                        retry_count: int = 0) -> int:
-        """记录同步日志"""
+        """记录同步日志（单行版，走 insert_logs），失败返回 0"""
+        ids = await self.insert_logs([{
+            'source': source,
+            'task_type': task_type,
+            'status': status,
+            'records_count': records_count,
+            'error_message': error_message,
+            'retry_count': retry_count,
+            'started_at': datetime.now().isoformat()
+        }])
+        return ids[0] if ids else 0
+
+    async def insert_logs(self, rows: List[Dict]) -> Optional[List[int]]:
+        """批量写入日志，按顺序返回新记录 ID；失败返回 None"""
         try:
-            data = {
-                'source': source,
-                'task_type': task_type,
-                'status': status,
-                'records_count': records_count,
-                'error_message': error_message,
-                'retry_count': retry_count,
-                'started_at': datetime.now().isoformat()
-            }
-            response = self.client.table('sync_logs').insert(data).execute()
-            if response.data:
-                return response.data[0]['id']
-            return 0
+            response = await self._execute(self.client.table('sync_logs').insert(rows))
+            return [row['id'] for row in response.data]
         except Exception as e:
-            logger.error(f"Supabase 记录日志失败: {e}")
-            return 0
+            logger.error(f"Supabase 批量记录日志失败: {e}")
+            return None
 
-    async def update_log_finish(self, log_id: int):
-        """更新日志完成时间"""
-        if not log_id: return
-        self.client.table('sync_logs').update({'finished_at': datetime.now().isoformat()}).eq('id', log_id).execute()
+    async def update_log(self, log_id: int, data: Dict) -> bool:
+        """更新日志记录"""
+        try:
+            await self._execute(self.client.table('sync_logs').update(data).eq('id', log_id))
+            return True
+        except Exception as e:
+            logger.error(f"Supabase 更新日志失败: {e}")
+            return False
+
+    async def update_log_finish(self, log_id: int) -> bool:
+        """更新日志完成时间（走 update_log）"""
+        if not log_id:
+            return False
+        return await self.update_log(log_id, {'finished_at': datetime.now().isoformat()})
 
     async def get_logs(self, source: Optional[str] = None, limit: int = 50) -> List[Dict]:
         """获取日志"""
         query = self.client.table('sync_logs').select("*")
         if source:
             query = query.eq('source', source)
-        response = query.order('started_at', desc=True).limit(limit).execute()
+        response = await self._execute(query.order('started_at', desc=True).limit(limit))
         return response.data
 
     async def get_last_sync_time(self, source: str) -> Optional[str]:
         """获取最后同步时间"""
-        response = self.client.table('sync_logs').select('started_at').eq('source', source).eq('status', 'success').order('started_at', desc=True).limit(1).execute()
+        response = await self._execute(self.client.table('sync_logs').select('started_at').eq('source', source).eq('status', 'success').order('started_at', desc=True).limit(1))
         if response.data:
             return response.data[0]['started_at']
         return None
@@ -0,0 +1,152 @@
+"""
+行内容指纹存储（写入前的变更检测）
+
+对去掉 updated_at 后的行内容做规范化哈希，记录每个主键最近一次写入的指纹；
+内容未变化的行直接跳过，updated_at 因此表示“最后一次变化”的时间。
+指纹持久化到本地 SQLite 文件，cron 脚本每次重启后仍然有效。
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional, Sequence
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 不参与指纹计算的字段
+VOLATILE_FIELDS = {"updated_at"}
+
+
+def row_fingerprint(row: Dict) -> str:
+    """规范化后的行内容哈希"""
+    payload = {k: v for k, v in row.items() if k not in VOLATILE_FIELDS}
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def row_key(row: Dict, key_fields: Sequence[str]) -> str:
+    return json.dumps([row.get(k) for k in key_fields], ensure_ascii=False, default=str)
+
+
+class FingerprintStore:
+    """两级指纹存储：进程内字典 + 可选的 SQLite 持久化
+
+    超过 ttl 秒的指纹视为失效，保证数据库被外部修改后最终仍会被重写。
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: int = 86400):
+        self.path = path
+        self.ttl = ttl
+        self._memory: Dict[str, tuple] = {}
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS row_fingerprints ("
+                "key TEXT PRIMARY KEY, digest TEXT NOT NULL, written_at REAL NOT NULL)"
+            )
+            self._initialized = True
+        return conn
+
+    def _load_sync(self, keys: Sequence[str]) -> Dict[str, tuple]:
+        found = {}
+        conn = self._connect()
+        try:
+            # SQLite 单条语句的参数个数有限，分批查询
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                for key, digest, written_at in conn.execute(
+                    f"SELECT key, digest, written_at FROM row_fingerprints WHERE key IN ({placeholders})", batch
+                ):
+                    found[key] = (digest, written_at)
+        finally:
+            conn.close()
+        return found
+
+    def _store_sync(self, items: Dict[str, tuple]):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO row_fingerprints (key, digest, written_at) VALUES (?, ?, ?)",
+                    [(key, digest, written_at) for key, (digest, written_at) in items.items()]
+                )
+        finally:
+            conn.close()
+
+    def _delete_sync(self, keys: Sequence[str]):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM row_fingerprints WHERE key = ?", [(key,) for key in keys])
+        finally:
+            conn.close()
+
+    async def get_many(self, table: str, keys: Iterable[str]) -> Dict[str, str]:
+        """返回仍在有效期内的指纹 {key: digest}"""
+        full_keys = [f"{table}:{k}" for k in keys]
+        missing = [k for k in full_keys if k not in self._memory]
+        if missing and self.path:
+            try:
+                self._memory.update(await asyncio.to_thread(self._load_sync, missing))
+            except Exception as e:
+                logger.warning(f"读取行指纹失败: {e}")
+
+        now = time.time()
+        result = {}
+        for full_key in full_keys:
+            entry = self._memory.get(full_key)
+            if entry and now - entry[1] < self.ttl:
+                result[full_key[len(table) + 1:]] = entry[0]
+        return result
+
+    async def put_many(self, table: str, digests: Dict[str, str]):
+        """记录写入成功的行指纹"""
+        if not digests:
+            return
+        now = time.time()
+        items = {f"{table}:{k}": (digest, now) for k, digest in digests.items()}
+        self._memory.update(items)
+        if self.path:
+            try:
+                await asyncio.to_thread(self._store_sync, items)
+            except Exception as e:
+                logger.warning(f"写入行指纹失败: {e}")
+
+    async def forget_many(self, table: str, keys: Iterable[str]):
+        """行被删除后清除其指纹，之后重新出现时会正常写入"""
+        full_keys = [f"{table}:{k}" for k in keys]
+        for key in full_keys:
+            self._memory.pop(key, None)
+        if full_keys and self.path:
+            try:
+                await asyncio.to_thread(self._delete_sync, full_keys)
+            except Exception as e:
+                logger.warning(f"删除行指纹失败: {e}")
+
+
+_fingerprint_store: Optional[FingerprintStore] = None
+
+
+def get_fingerprint_store() -> Optional[FingerprintStore]:
+    """获取进程内共享的指纹存储；未启用时返回 None，Vercel 只读文件系统下仅使用内存"""
+    global _fingerprint_store
+    if not settings.CHANGE_DETECTION_ENABLED:
+        return None
+    if _fingerprint_store is None:
+        path = None
+        if not os.environ.get("VERCEL"):
+            path = settings.FINGERPRINT_DB_PATH
+            db_dir = os.path.dirname(path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+        _fingerprint_store = FingerprintStore(path, ttl=settings.FINGERPRINT_TTL)
+    return _fingerprint_store
@@ -0,0 +1,231 @@
+"""
+本地写入日志 (write journal)
+
+Supabase 不可达时，写入失败的行保存到 DB_PATH 旁的本地 SQLite 文件，
+由后台回放协程在后端恢复后批量补写。
+
+- 按 (表, 主键) 只保留最新一行：同一行的多次失败写入互相覆盖，回放是幂等的
+- 每行带递增序号；直接写入成功时只清除比它更早的记录，不会用旧数据覆盖新数据
+- 总行数超过上限时丢弃最旧的记录
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import aiosqlite
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WriteJournal:
+    """基于 aiosqlite 的待写入行日志"""
+
+    def __init__(self, path: str, max_rows: int = None):
+        self.path = path
+        self.max_rows = max_rows or settings.JOURNAL_MAX_ROWS
+        self._initialized = False
+        self._pending_tables: Optional[set] = None
+        self._seq = 0
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.path, timeout=10)
+        if not self._initialized:
+            await db.execute("PRAGMA journal_mode=WAL")
+            await db.execute(
+                "CREATE TABLE IF NOT EXISTS pending_writes ("
+                "table_name TEXT NOT NULL, row_key TEXT NOT NULL, seq INTEGER NOT NULL, "
+                "on_conflict TEXT NOT NULL, key_fields TEXT NOT NULL, payload TEXT NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (table_name, row_key))"
+            )
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_pending_writes_seq ON pending_writes(seq)")
+            await db.commit()
+            async with db.execute("SELECT MAX(seq) FROM pending_writes") as cursor:
+                row = await cursor.fetchone()
+            self._seq = max(self._seq, row[0] or 0)
+            self._initialized = True
+        return db
+
+    def next_seq(self) -> int:
+        """分配一个递增序号（写入开始前获取，用于判断记录的新旧）"""
+        self._seq = max(self._seq + 1, time.time_ns())
+        return self._seq
+
+    async def pending_tables(self) -> set:
+        """有待回放记录的表"""
+        if self._pending_tables is None:
+            db = await self._connect()
+            try:
+                async with db.execute("SELECT DISTINCT table_name FROM pending_writes") as cursor:
+                    self._pending_tables = {row[0] for row in await cursor.fetchall()}
+            finally:
+                await db.close()
+        return self._pending_tables
+
+    async def append(self, table: str, rows: List[Dict], keys: List[str], on_conflict: str,
+                     key_fields: Sequence[str], seq: int):
+        """记录写入失败的行（同一主键只保留序号最新的一行）"""
+        if not rows:
+            return
+        now = time.time()
+        fields = json.dumps(list(key_fields))
+        db = await self._connect()
+        try:
+            await db.executemany(
+                "INSERT INTO pending_writes (table_name, row_key, seq, on_conflict, key_fields, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(table_name, row_key) DO UPDATE SET seq = excluded.seq, payload = excluded.payload, "
+                "created_at = excluded.created_at WHERE excluded.seq > pending_writes.seq",
+                [(table, key, seq, on_conflict, fields, json.dumps(row, ensure_ascii=False, default=str), now)
+                 for key, row in zip(keys, rows)]
+            )
+            # 超过上限时丢弃最旧的记录
+            async with db.execute("SELECT COUNT(*) FROM pending_writes") as cursor:
+                total = (await cursor.fetchone())[0]
+            if total > self.max_rows:
+                await db.execute(
+                    "DELETE FROM pending_writes WHERE rowid IN "
+                    "(SELECT rowid FROM pending_writes ORDER BY seq LIMIT ?)", (total - self.max_rows,)
+                )
+                logger.warning(f"写入日志超过上限 {self.max_rows} 行，丢弃最旧的 {total - self.max_rows} 行")
+            await db.commit()
+        finally:
+            await db.close()
+        (await self.pending_tables()).add(table)
+
+    async def discard(self, table: str, keys: List[str], before_seq: int):
+        """直接写入成功后，清除这些主键上更早的待回放记录"""
+        if table not in await self.pending_tables() or not keys:
+            return
+        db = await self._connect()
+        try:
+            await db.executemany(
+                "DELETE FROM pending_writes WHERE table_name = ? AND row_key = ? AND seq < ?",
+                [(table, key, before_seq) for key in keys]
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def load(self, table: str, limit: int) -> List[Dict]:
+        """按序号顺序读取一个表的待回放记录"""
+        db = await self._connect()
+        try:
+            async with db.execute(
+                "SELECT row_key, seq, on_conflict, key_fields, payload FROM pending_writes "
+                "WHERE table_name = ? ORDER BY seq LIMIT ?", (table, limit)
+            ) as cursor:
+                rows = await cursor.fetchall()
+        finally:
+            await db.close()
+        return [
+            {"key": key, "seq": seq, "on_conflict": on_conflict,
+             "key_fields": json.loads(key_fields), "row": json.loads(payload)}
+            for key, seq, on_conflict, key_fields, payload in rows
+        ]
+
+    async def remove(self, table: str, entries: List[Dict]):
+        """回放成功后删除记录（期间被更新过的记录保留）"""
+        db = await self._connect()
+        try:
+            await db.executemany(
+                "DELETE FROM pending_writes WHERE table_name = ? AND row_key = ? AND seq <= ?",
+                [(table, e["key"], e["seq"]) for e in entries]
+            )
+            await db.commit()
+            async with db.execute("SELECT 1 FROM pending_writes WHERE table_name = ? LIMIT 1", (table,)) as cursor:
+                if await cursor.fetchone() is None:
+                    (await self.pending_tables()).discard(table)
+        finally:
+            await db.close()
+
+    async def count(self) -> int:
+        db = await self._connect()
+        try:
+            async with db.execute("SELECT COUNT(*) FROM pending_writes") as cursor:
+                return (await cursor.fetchone())[0]
+        finally:
+            await db.close()
+
+
+class JournalReplayer:
+    """后台回放：定时把写入日志中的记录批量补写到 Supabase"""
+
+    def __init__(self, journal: WriteJournal, repo, interval: float = None):
+        self.journal = journal
+        self.repo = repo
+        self.interval = interval or settings.JOURNAL_REPLAY_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+        self.replayed = 0
+
+    async def replay(self) -> int:
+        """回放全部待写记录，返回成功补写的行数；某个表仍然失败时停止该表本轮回放"""
+        total = 0
+        for table in list(await self.journal.pending_tables()):
+            while True:
+                entries = await self.journal.load(table, settings.DB_BATCH_SIZE)
+                if not entries:
+                    break
+                # 同一批次内按 (on_conflict, key_fields) 分组写入
+                groups: Dict[tuple, List[Dict]] = {}
+                for entry in entries:
+                    groups.setdefault((entry["on_conflict"], tuple(entry["key_fields"])), []).append(entry)
+
+                done = []
+                for (on_conflict, key_fields), group in groups.items():
+                    result = await self.repo._bulk_upsert(
+                        table, [e["row"] for e in group], on_conflict=on_conflict,
+                        key_fields=key_fields, journal=False
+                    )
+                    if result.failed == 0:
+                        done.extend(group)
+                if done:
+                    await self.journal.remove(table, done)
+                    total += len(done)
+                if len(done) < len(entries):
+                    break
+        if total:
+            self.replayed += total
+            logger.info(f"写入日志回放完成: {total} 行")
+        return total
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.replay()
+            except Exception as e:
+                logger.error(f"写入日志回放失败: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_write_journal: Optional[WriteJournal] = None
+
+
+def get_write_journal() -> Optional[WriteJournal]:
+    """获取进程内共享的写入日志；未启用、使用本地 SQLite 存储或在 Vercel 只读文件系统下返回 None"""
+    global _write_journal
+    if not settings.JOURNAL_ENABLED or settings.STORAGE_BACKEND == "sqlite" or os.environ.get("VERCEL"):
+        return None
+    if _write_journal is None:
+        db_dir = os.path.dirname(settings.DB_PATH)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        _write_journal = WriteJournal(os.path.join(db_dir, "write_journal.db"))
+    return _write_journal
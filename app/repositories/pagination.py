@@ -0,0 +1,33 @@
+"""
+键集分页 (keyset pagination) 游标
+
+游标是最后一行排序键的 base64url 编码，对客户端不透明；下一页按
+“排序键大于游标”过滤，配合复合索引，任意深度的翻页代价都与第一页相同。
+"""
+import base64
+import json
+from typing import Any, List, Optional
+
+
+def encode_cursor(kind: str, values: List[Any]) -> str:
+    raw = json.dumps([kind] + list(values), ensure_ascii=False, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(kind: str, cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """解析游标，返回排序键列表；cursor 为空时返回 None，格式不对时抛出 ValueError"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw.decode("utf-8"))
+    except Exception:
+        raise ValueError("无效的分页游标")
+    if not isinstance(data, list) or len(data) != size + 1 or data[0] != kind:
+        raise ValueError("无效的分页游标")
+    return data[1:]
+
+
+def quote(value: Any) -> str:
+    """PostgREST 逻辑过滤 (or=...) 中的值加双引号，避免时间中的 : + , 被当作语法"""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
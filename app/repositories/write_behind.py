@@ -0,0 +1,126 @@
+"""
+写后队列 (write-behind)
+
+按主键合并待写入的行：同一主键在两次刷新之间的多次更新只保留最后一次，
+由后台协程按固定间隔批量写入；待写行数达到上限时，入队方等待一次刷新完成（背压）。
+写入抛出异常时这批行放回队列（期间已有更新值的主键以新值为准），下次刷新重试。
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """按主键合并的写后队列
+
+    Args:
+        flush_fn: 批量写入函数，接收行列表并返回 BulkWriteResult
+        key_field: 合并所用的主键字段
+    """
+
+    def __init__(self, flush_fn: Callable[[List[Dict]], Awaitable], key_field: str = "fd_id",
+                 flush_interval: float = None, max_pending: int = None, name: str = "default"):
+        self.flush_fn = flush_fn
+        self.key_field = key_field
+        self.flush_interval = flush_interval or settings.WRITE_BEHIND_INTERVAL
+        self.max_pending = max_pending or settings.WRITE_BEHIND_MAX_PENDING
+        self.name = name
+        self._pending: Dict = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.coalesced = 0
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+        self.requeued = 0
+
+    async def put_many(self, rows: List[Dict]) -> int:
+        """入队，返回入队行数；待写行数达到上限时先等待刷新"""
+        for row in rows:
+            key = row.get(self.key_field)
+            if key is None:
+                continue
+            if key in self._pending:
+                self.coalesced += 1
+            elif len(self._pending) >= self.max_pending:
+                await self.flush()
+            self._pending[key] = row
+            self.enqueued += 1
+        return len(rows)
+
+    async def flush(self):
+        """立即写入全部待写行，返回 flush_fn 的结果（队列为空时返回 None）
+
+        写入抛出异常时把这批行放回队列后重新抛出，调用方据此把本次运行记为失败。
+        """
+        async with self._lock:
+            if not self._pending:
+                return None
+            rows, self._pending = list(self._pending.values()), {}
+            try:
+                result = await self.flush_fn(rows)
+            except Exception as e:
+                self._requeue(rows)
+                logger.error(f"写后队列 {self.name} 刷新失败，{len(rows)} 行放回队列: {e}")
+                raise
+            self.written += result.written
+            self.skipped += result.skipped
+            self.failed += result.failed
+            logger.info(f"写后队列 {self.name} 刷新: 写入 {result.written}, 未变化 {result.skipped}, 失败 {result.failed}")
+            return result
+
+    def _requeue(self, rows: List[Dict]):
+        """失败的行放回队列；刷新期间已入队新值的主键保留新值，超过上限的部分丢弃"""
+        for row in rows:
+            key = row.get(self.key_field)
+            if key in self._pending:
+                continue
+            if len(self._pending) >= self.max_pending:
+                self.failed += 1
+                continue
+            self._pending[key] = row
+            self.requeued += 1
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"写后队列 {self.name} 刷新异常: {e}")
+
+    def start(self):
+        """启动后台定时刷新"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """停止定时刷新并写入剩余行"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            # 已记录日志；退出时无法再重试
+            self.failed += len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "enqueued": self.enqueued,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "requeued": self.requeued,
+            "pending": len(self._pending),
+        }
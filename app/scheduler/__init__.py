@@ -4,13 +4,21 @@
 import asyncio
 import json
 import logging
+import os
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from datetime import datetime
-from typing import List
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
 
 from app.config import settings
-from app.scrapers import FootballDataScraper, SportteryScraper, fetch_with_retry
-from app.repositories import FDRepository, SportteryRepository, LogRepository
+from app.scrapers import (
+    FootballDataScraper, SportteryScraper, fetch_with_retry,
+    ScraperError,
+)
+from app.repositories import BulkWriteResult, FDRepository, SportteryRepository, LogRepository
+from app.repositories.journal import JournalReplayer
+from app.repositories.write_behind import WriteBehindQueue
+from app.scheduler.log_buffer import SyncLogBuffer
+from app.services.live_hub import live_hub
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +33,12 @@ class SyncScheduler:
         self.fd_repo = FDRepository()
         self.sporttery_repo = SportteryRepository()
         self.log_repo = LogRepository()
+        self.sync_logs = SyncLogBuffer(self.log_repo)
+        # 实时比分与结果写入 fd_matches 前按 fd_id 合并（通过 lambda 取当前仓储，便于脚本替换）
+        self.match_writes = WriteBehindQueue(lambda rows: self.fd_repo.save_matches(rows),
+                                             key_field='fd_id', name='fd_matches')
+        # Supabase 恢复后回放本地写入日志
+        self.journal_replayer = JournalReplayer(self.fd_repo.journal, self.fd_repo) if self.fd_repo.journal else None
 
     def start(self):
         """启动调度器"""
@@ -127,6 +141,10 @@ class SyncScheduler:
         )
 
         self.scheduler.start()
+        self.match_writes.start()
+        self.sync_logs.start()
+        if self.journal_replayer:
+            self.journal_replayer.start()
         logger.info("调度器已启动")
 
         # 打印任务列表
@@ -135,88 +153,100 @@ class SyncScheduler:
         for job in jobs:
             logger.info(f"  - {job.name} ({job.id})")
 
-    def stop(self):
-        """停止调度器"""
-        self.scheduler.shutdown()
+    async def stop(self):
+        """停止调度器，写入缓冲的同步日志并释放抓取器连接池"""
+        if self.scheduler.running:
+            self.scheduler.shutdown()
+        live_hub.close()
+        await self.match_writes.stop()
+        await self.sync_logs.stop()
+        if self.journal_replayer:
+            await self.journal_replayer.stop()
+        await self.fd_scraper.close()
+        await self.sporttery_scraper.close()
         logger.info("调度器已停止")
 
     async def _log_task(self, source: str, task_type: str,
                        func, max_retries: int = 3) -> int:
-        """执行任务并记录日志"""
-        log_id = await self.log_repo.log_sync(source, task_type, "running")
-        records_count = 0
+        """执行任务并记录日志（每次运行一行，经缓冲批量写入）"""
+        run = self.sync_logs.begin(source, task_type)
         error_message = ""
 
         for attempt in range(max_retries):
+            run.attempts = attempt + 1
             try:
                 if attempt > 0:
-                    await self.log_repo.log_sync(
-                        source, task_type, "retrying",
-                        retry_count=attempt
-                    )
                     await asyncio.sleep(2 ** attempt)
 
                 records_count = await func()
-                await self.log_repo.update_log_finish(log_id)
-                await self.log_repo.log_sync(
-                    source, task_type, "success",
-                    records_count=records_count
-                )
+                self.sync_logs.end(run, "success", records_count=records_count)
                 return records_count
 
+            except ScraperError as e:
+                # 抓取器内部已按退避重试过（熔断、限流也是 ScraperError）：本轮直接失败，
+                # 不在外层再重跑整个任务，避免一次调度叠加多轮超时占住 worker
+                error_message = str(e)
+                logger.error(f"{source}.{task_type} 失败，跳过本轮: {e}")
+                break
+
             except Exception as e:
                 error_message = str(e)
                 logger.error(f"{source}.{task_type} 失败 (尝试 {attempt + 1}/{max_retries}): {e}")
 
         # 全部失败
-        await self.log_repo.update_log_finish(log_id)
-        await self.log_repo.log_sync(
-            source, task_type, "failed",
-            error_message=error_message, retry_count=max_retries
-        )
+        self.sync_logs.end(run, "failed", error_message=error_message)
         return 0
 
+    async def _write_matches(self, rows: List[Dict]) -> BulkWriteResult:
+        """fd_matches 的写入都经写后队列：同一比赛按入队顺序落库，赛程不会被队列中更早的行覆盖
+
+        入队后立即刷新，返回的写入结果（包含队列中其他任务的待写行）作为本次运行的记录数；
+        刷新失败时行已放回队列，异常上抛让本次运行记为失败。
+        """
+        await self.match_writes.put_many(rows)
+        return await self.match_writes.flush() or BulkWriteResult()
+
     async def sync_fd_scheduled(self):
-        """同步 FD 即将进行的比赛（完整赛季赛程）"""
+        """同步 FD 即将进行的比赛（滚动窗口内的赛程）"""
         async def task():
             logger.info("开始同步 FD 赛程数据...")
-            total = 0
-
-            for league in settings.monitored_leagues_list:
-                # 获取 SCHEDULED 和 TIMED 状态的比赛
-                for status in ["SCHEDULED", "TIMED"]:
-                    matches = await self.fd_scraper.get_matches(
-                        competition=league,
-                        status=status
-                    )
-
-                    for match in matches:
-                        season = match.get('season', {})
-                        await self.fd_repo.save_match({
-                            'fd_id': match.get('id'),
-                            'league_code': league,
-                            'home_team_id': match.get('homeTeam', {}).get('id'),
-                            'away_team_id': match.get('awayTeam', {}).get('id'),
-                            'home_team_name': match.get('homeTeam', {}).get('name'),
-                            'away_team_name': match.get('awayTeam', {}).get('name'),
-                            'match_date': match.get('utcDate'),
-                            'status': match.get('status'),
-                            'home_score': None,
-                            'away_score': None,
-                            'home_half_score': None,
-                            'away_half_score': None,
-                            'referee': None,
-                            'attendance': None,
-                            'matchday': match.get('matchday'),
-                            'season': season.get('id') if isinstance(season, dict) else season
-                        })
-                        total += 1
-
-                # 避免API限流
-                await asyncio.sleep(1)
+            rows = []
+
+            # 一次批量请求覆盖全部联赛的 SCHEDULED 和 TIMED 比赛（按日期窗口切片）
+            today = date.today()
+            matches_by_league = await self.fd_scraper.get_matches_by_competition(
+                settings.monitored_leagues_list,
+                status=["SCHEDULED", "TIMED"],
+                date_from=today,
+                date_to=today + timedelta(days=settings.FD_SCHEDULED_LOOKAHEAD_DAYS - 1)
+            )
+
+            for league, matches in matches_by_league.items():
+                for match in matches:
+                    season = match.get('season', {})
+                    rows.append({
+                        'fd_id': match.get('id'),
+                        'league_code': league,
+                        'home_team_id': match.get('homeTeam', {}).get('id'),
+                        'away_team_id': match.get('awayTeam', {}).get('id'),
+                        'home_team_name': match.get('homeTeam', {}).get('name'),
+                        'away_team_name': match.get('awayTeam', {}).get('name'),
+                        'match_date': match.get('utcDate'),
+                        'status': match.get('status'),
+                        'home_score': None,
+                        'away_score': None,
+                        'home_half_score': None,
+                        'away_half_score': None,
+                        'referee': None,
+                        'attendance': None,
+                        'matchday': match.get('matchday'),
+                        'season': season.get('id') if isinstance(season, dict) else season
+                    })
 
-            logger.info(f"FD 赛程同步完成: {total} 场")
-            return total
+            result = await self._write_matches(rows)
+            logger.info(f"FD 赛程同步完成: 入队 {len(rows)} 场, 写入 {result.written} "
+                        f"(未变化 {result.skipped}, 失败 {result.failed})")
+            return result.written
 
         return await self._log_task("football_data", "scheduled", task)
 
@@ -224,10 +254,13 @@ class SyncScheduler:
         """同步 FD 积分榜"""
         async def task():
             logger.info("开始同步 FD 积分榜...")
-            total = 0
+            rows = []
+            pending = []  # 本轮交给下游的响应，写库成功后才记为已保存
 
             for league in settings.monitored_leagues_list:
-                standings_data, season_info = await self.fd_scraper.get_standings(league)
+                standings_data, season_info = await self.fd_scraper.get_standings(
+                    league, skip_unchanged=True, pending=pending
+                )
 
                 # Extract season ID for consistency
                 season_id = season_info.get('id') if season_info else None
@@ -256,7 +289,7 @@ class SyncScheduler:
                         if not isinstance(team_data, dict):
                             continue
 
-                        await self.fd_repo.save_standing({
+                        rows.append({
                             'league_code': league,
                             'team_id': team_data.get('id'),
                             'team_name': team_data.get('name'),
@@ -271,12 +304,12 @@ class SyncScheduler:
                             'goal_diff': team.get('goalDifference'),
                             'season': season_id
                         })
-                        total += 1
 
-                await asyncio.sleep(1)
-
-            logger.info(f"FD 积分榜同步完成: {total} 条")
-            return total
+            result = await self.fd_repo.save_standings(rows)
+            logger.info(f"FD 积分榜同步完成: {result.written} 条 (未变化 {result.skipped}, 失败 {result.failed})")
+            if not result.failed:
+                await self.fd_scraper.mark_saved(pending)
+            return result.written
 
         return await self._log_task("football_data", "standings", task)
 
@@ -284,23 +317,25 @@ class SyncScheduler:
         """同步 FD 已结束的比赛结果（包含详情）"""
         async def task():
             logger.info("开始同步 FD 比赛结果...")
-            total = 0
-
-            for league in settings.monitored_leagues_list:
-                # 获取最近的已结束比赛（limit=100 足够覆盖最近几天）
-                matches = await self.fd_scraper.get_matches(
-                    competition=league,
-                    status="FINISHED",
-                    limit=100
-                )
-
+            rows = []
+
+            # 一次批量请求获取全部联赛最近几天已结束的比赛
+            today = date.today()
+            matches_by_league = await self.fd_scraper.get_matches_by_competition(
+                settings.monitored_leagues_list,
+                status="FINISHED",
+                date_from=today - timedelta(days=settings.FD_RESULTS_LOOKBACK_DAYS),
+                date_to=today
+            )
+
+            for league, matches in matches_by_league.items():
                 for match in matches:
                     score = match.get('score', {})
                     full_time = score.get('fullTime', {})
                     half_time = score.get('halfTime', {})
                     season = match.get('season', {})
 
-                    await self.fd_repo.save_match({
+                    rows.append({
                         'fd_id': match.get('id'),
                         'league_code': league,
                         'home_team_id': match.get('homeTeam', {}).get('id'),
@@ -318,12 +353,13 @@ class SyncScheduler:
                         'matchday': match.get('matchday'),
                         'season': season.get('id') if isinstance(season, dict) else season
                     })
-                    total += 1
 
-                await asyncio.sleep(1)
-
-            logger.info(f"FD 比赛结果同步完成: {total} 场")
-            return total
+            # 经写后队列与实时比分的更新合并后写入
+            result = await self._write_matches(rows)
+            live_hub.publish_matches(rows)
+            logger.info(f"FD 比赛结果同步完成: 入队 {len(rows)} 场, 写入 {result.written} "
+                        f"(未变化 {result.skipped}, 失败 {result.failed})")
+            return result.written
 
         return await self._log_task("football_data", "results", task)
 
@@ -331,17 +367,22 @@ class SyncScheduler:
         """同步 FD 球队数据（完整详情）"""
         async def task():
             logger.info("开始同步 FD 球队数据...")
-            total = 0
+            rows = []
+            league_teams = {}
+            pending = []
 
             for league in settings.monitored_leagues_list:
-                teams = await self.fd_scraper.get_teams(competition=league)
+                teams = await self.fd_scraper.get_teams(competition=league, skip_unchanged=True, pending=pending)
+                if teams:
+                    # 响应未变化时返回空列表，成员关系保持不变
+                    league_teams[league] = [team.get('id') for team in teams if team.get('id')]
 
                 for team in teams:
                     team_id = team.get('id')
                     team_name = team.get('name')
 
                     # 保存基础信息
-                    await self.fd_repo.save_team({
+                    rows.append({
                         'fd_id': team_id,
                         'name': team_name,
                         'short_name': team.get('shortName'),
@@ -352,12 +393,15 @@ class SyncScheduler:
                         'club_colors': team.get('clubColors'),
                         'website': team.get('website')
                     })
-                    total += 1
-
-                await asyncio.sleep(1)
 
-            logger.info(f"FD 球队同步完成: {total} 支")
-            return total
+            result = await self.fd_repo.save_teams(rows)
+            logger.info(f"FD 球队同步完成: {result.written} 支 (未变化 {result.skipped}, 失败 {result.failed})")
+            failed = result.failed
+            for league, team_ids in league_teams.items():
+                failed += (await self.fd_repo.save_league_teams(league, team_ids)).failed
+            if not failed:
+                await self.fd_scraper.mark_saved(pending)
+            return result.written
 
         return await self._log_task("football_data", "teams", task)
 
@@ -365,10 +409,13 @@ class SyncScheduler:
         """同步 FD 射手榜"""
         async def task():
             logger.info("开始同步 FD 射手榜...")
-            total = 0
+            rows = []
+            pending = []
 
             for league in settings.monitored_leagues_list:
-                scorers, season_info = await self.fd_scraper.get_scorers(league, limit=100)
+                scorers, season_info = await self.fd_scraper.get_scorers(
+                    league, limit=100, skip_unchanged=True, pending=pending
+                )
 
                 # Extract season ID for consistency
                 season_id = season_info.get('id') if season_info else None
@@ -376,7 +423,7 @@ class SyncScheduler:
                 for pos_idx, scorer in enumerate(scorers):
                     player = scorer.get('player', {})
                     team = scorer.get('team', {})
-                    await self.fd_repo.save_scorer({
+                    rows.append({
                         'league_code': league,
                         'season': season_id,
                         # Actually looking at debug output context, we didn't see season in the scorer keys. It is usually a parent key. 
@@ -408,12 +455,12 @@ class SyncScheduler:
                         'penalties': scorer.get('penalties', 0),
                         'played_matches': scorer.get('playedMatches', 0)
                     })
-                    total += 1
-
-                await asyncio.sleep(1)
 
-            logger.info(f"FD 射手榜同步完成: {total} 条")
-            return total
+            result = await self.fd_repo.save_scorers(rows)
+            logger.info(f"FD 射手榜同步完成: {result.written} 条 (未变化 {result.skipped}, 失败 {result.failed})")
+            if not result.failed:
+                await self.fd_scraper.mark_saved(pending)
+            return result.written
 
         return await self._log_task("football_data", "scorers", task)
 
@@ -423,14 +470,10 @@ class SyncScheduler:
             logger.info("开始同步竞彩比赛数据...")
 
             matches = await self.sporttery_scraper.get_matches()
-            total = 0
-
-            for match in matches:
-                await self.sporttery_repo.save_match(match)
-                total += 1
+            result = await self.sporttery_repo.save_matches(matches)
 
-            logger.info(f"竞彩比赛同步完成: {total} 场")
-            return total
+            logger.info(f"竞彩比赛同步完成: {result.written} 场 (未变化 {result.skipped}, 失败 {result.failed})")
+            return result.written
 
         return await self._log_task("sporttery", "matches", task)
 
@@ -457,20 +500,66 @@ class SyncScheduler:
 
         return await self._log_task("sporttery", "results", task)
 
+    async def backfill_sporttery_results(self, start_date: date, end_date: date,
+                                         checkpoint_path: Optional[str] = None):
+        """按日期窗口回填竞彩比分，可断点续跑
+
+        已完成的窗口记录在 checkpoint_path（JSON）中，中断后重跑会跳过这些窗口；
+        抓取失败的窗口不记录，下次重跑时自动补抓。
+        """
+        async def task():
+            logger.info(f"开始回填竞彩比分: {start_date} ~ {end_date}")
+            done = set()
+            if checkpoint_path and os.path.exists(checkpoint_path):
+                with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                    done = set(json.load(f).get('done', []))
+                logger.info(f"从断点恢复，跳过 {len(done)} 个已完成窗口")
+
+            total = 0
+            async for start, end, results in self.sporttery_scraper.iter_result_windows(
+                    start_date, end_date, skip=done):
+                if results is None:
+                    continue
+
+                for res in results:
+                    success = await self.sporttery_repo.update_match_score(
+                        res['match_code'],
+                        res['home_team'],
+                        res['away_team'],
+                        res['actual_score'],
+                        res['half_score']
+                    )
+                    if success:
+                        total += 1
+
+                done.add(f"{start}:{end}")
+                if checkpoint_path:
+                    with open(checkpoint_path, 'w', encoding='utf-8') as f:
+                        json.dump({'done': sorted(done)}, f, ensure_ascii=False)
+                logger.info(f"窗口 {start}~{end} 回填完成: {len(results)} 场")
+
+            logger.info(f"竞彩比分回填完成: {total} 场")
+            return total
+
+        return await self._log_task("sporttery", "backfill", task, max_retries=1)
+
     async def sync_fd_competitions(self):
         """同步 FD 联赛列表和详情"""
         async def task():
             logger.info("开始同步 FD 联赛信息...")
-            total = 0
+            rows = []
+            pending = []
 
             # 获取所有联赛
             competitions = await self.fd_scraper.get_competitions()
 
             for comp in competitions:
                 # 获取每个联赛的详情
-                detail = await self.fd_scraper.get_competition(comp.get('code'))
+                detail = await self.fd_scraper.get_competition(comp.get('code'), skip_unchanged=True, pending=pending)
+                if not detail:
+                    continue
 
-                await self.fd_repo.save_league({
+                rows.append({
                     'fd_id': detail.get('id'),
                     'code': detail.get('code'),
                     'name': detail.get('name'),
@@ -478,11 +567,13 @@ class SyncScheduler:
                     'current_season': detail.get('season', {}).get('id') if detail.get('season') else None,
                     'emblem': detail.get('emblem')
                 })
-                total += 1
                 await asyncio.sleep(6)  # 遵守10次/分钟限制
 
-            logger.info(f"FD 联赛信息同步完成: {total} 个")
-            return total
+            result = await self.fd_repo.save_leagues(rows)
+            logger.info(f"FD 联赛信息同步完成: {result.written} 个 (未变化 {result.skipped}, 失败 {result.failed})")
+            if not result.failed:
+                await self.fd_scraper.mark_saved(pending)
+            return result.written
 
         return await self._log_task("football_data", "competitions", task)
 
@@ -499,12 +590,17 @@ class SyncScheduler:
 
             for team_id in team_ids:
                 try:
-                    detail = await self.fd_scraper.get_team(team_id)
+                    pending = []
+                    detail = await self.fd_scraper.get_team(team_id, skip_unchanged=True, pending=pending)
+                    if not detail:
+                        # 球队详情未变化（或不存在），无需重写教练和阵容
+                        continue
 
                     # 保存教练信息
                     coach = detail.get('coach')
+                    coach_saved = True
                     if coach:
-                        await self.fd_repo.save_team_coach({
+                        coach_saved = await self.fd_repo.save_team_coach({
                             'team_id': team_id,
                             'coach_id': coach.get('id'),
                             'coach_name': coach.get('name'),
@@ -519,9 +615,10 @@ class SyncScheduler:
                     season = detail.get('squad', [{}])[0].get('contract', {}).get('until', '').split('-')[0] if detail.get('squad') else datetime.now().year
                     squad = detail.get('squad', [])
 
+                    squad_rows = []
                     for player in squad:
                         contract = player.get('contract', {})
-                        await self.fd_repo.save_team_squad({
+                        squad_rows.append({
                             'team_id': team_id,
                             'player_id': player.get('id'),
                             'player_name': player.get('name'),
@@ -532,7 +629,10 @@ class SyncScheduler:
                             'contract_until': contract.get('until') if contract else None,
                             'season': int(season) if season else datetime.now().year
                         })
-                        total_squad += 1
+                    result = await self.fd_repo.save_team_squads(squad_rows)
+                    total_squad += result.written
+                    if coach_saved and not result.failed:
+                        await self.fd_scraper.mark_saved(pending)
 
                     total_teams += 1
                     await asyncio.sleep(6)  # 遵守10次/分钟限制
@@ -553,6 +653,7 @@ class SyncScheduler:
         async def task():
             logger.info("开始同步 FD 比赛详情...")
             total = 0
+            failed = []
 
             # 获取进行中 (LIVE) 和最近结束 (FINISHED) 的比赛
             live_ids = await self.fd_repo.get_match_ids_by_status('IN_PLAY')
@@ -595,10 +696,8 @@ class SyncScheduler:
                     home_team_id = detail.get('homeTeam', {}).get('id')
                     away_team_id = detail.get('awayTeam', {}).get('id')
 
-                    # 清除旧进球记录
-                    await self.fd_repo.clear_match_goals(match_id)
-
                     # 处理进球
+                    goals = []
                     for goal in detail.get('goals', []):
                         team_id = goal.get('team', {}).get('id')
                         team_name = goal.get('team', {}).get('name')
@@ -608,8 +707,7 @@ class SyncScheduler:
                         # 确定是主队还是客队进球
                         home_away = 'home' if team_id == home_team_id else 'away'
 
-                        await self.fd_repo.save_match_goal({
-                            'match_id': match_id,
+                        goals.append({
                             'team_id': team_id,
                             'team_name': team_name,
                             'player_id': player_id,
@@ -626,29 +724,41 @@ class SyncScheduler:
                         else:
                             match_info['away_goal_count'] += 1
 
-                    await self.fd_repo.save_match_details(match_info)
-                    total += 1
+                    # 一次调用原子替换进球集合，未变化的进球不重写；
+                    # 进球替换失败时不写详情，避免详情里的进球数与进球表不一致
+                    if await self.fd_repo.replace_match_goals(match_id, goals) is None:
+                        failed.append(match_id)
+                    elif await self.fd_repo.save_match_details(match_info):
+                        total += 1
+                    else:
+                        failed.append(match_id)
                     await asyncio.sleep(6)  # 遵守10次/分钟限制
 
                 except Exception as e:
+                    failed.append(match_id)
                     logger.error(f"同步比赛 {match_id} 详情失败: {e}")
 
-            logger.info(f"FD 比赛详情同步完成: {total} 场")
+            logger.info(f"FD 比赛详情同步完成: {total} 场, 失败 {len(failed)} 场")
+            if failed:
+                # 本次运行记为失败；失败的比赛由下一轮调度重新同步
+                raise RuntimeError(f"{len(failed)} 场比赛详情同步失败 (成功 {total} 场): {failed}")
             return total
 
-        return await self._log_task("football_data", "match_details", task)
+        # 单场失败已在任务内汇总，不整轮重跑（每场之间有 6 秒限流等待）
+        return await self._log_task("football_data", "match_details", task, max_retries=1)
 
     async def sync_fd_live_scores(self):
         """同步 FD 实时比赛比分和状态（仅同步主表）"""
         async def task():
             logger.info("开始同步 FD 实时比分...")
-            total = 0
+            rows = []
 
-            # 抓取所有进行中的比赛
-            matches = await self.fd_scraper.get_matches(status="LIVE")
+            # 抓取监控联赛中所有进行中的比赛
+            leagues = settings.monitored_leagues_list
+            matches = await self.fd_scraper.get_matches(status="LIVE", competitions=leagues)
             # 如果 LIVE 没数据，尝试 IN_PLAY (API 文档中有时互换)
             if not matches:
-                matches = await self.fd_scraper.get_matches(status="IN_PLAY")
+                matches = await self.fd_scraper.get_matches(status="IN_PLAY", competitions=leagues)
 
             for match in matches:
                 league_code = match.get('competition', {}).get('code')
@@ -660,7 +770,7 @@ class SyncScheduler:
                 half_time = score.get('halfTime', {})
                 season = match.get('season', {})
 
-                await self.fd_repo.save_match({
+                rows.append({
                     'fd_id': match.get('id'),
                     'league_code': league_code,
                     'home_team_id': match.get('homeTeam', {}).get('id'),
@@ -678,10 +788,13 @@ class SyncScheduler:
                     'matchday': match.get('matchday'),
                     'season': season.get('id') if isinstance(season, dict) else season
                 })
-                total += 1
 
-            logger.info(f"FD 实时比分同步完成: {total} 场")
-            return total
+            # 比分/状态变化先推送给已连接的客户端，不等写库
+            pushed = live_hub.publish_matches(rows, complete=True)
+            result = await self._write_matches(rows)
+            logger.info(f"FD 实时比分同步完成: 入队 {len(rows)} 场, 写入 {result.written} "
+                        f"(未变化 {result.skipped}, 失败 {result.failed}), 推送变化 {pushed} 场")
+            return result.written
 
         return await self._log_task("football_data", "live_scores", task)
 
@@ -0,0 +1,145 @@
+"""
+同步日志缓冲写入
+
+每次任务运行只对应 sync_logs 中的一行：运行开始后写入 running 记录，结束后原地更新状态、
+重试次数、记录数、错误和耗时，进程中途崩溃时也能留下这次运行的部分记录。
+运行开始/结束时唤醒后台协程，等待 SYNC_LOG_FLUSH_DELAY 后批量写入：同一调度时刻触发的多个任务
+合并为一次 insert，在这段时间内就结束的运行只写一次终态行。写入失败时按 SYNC_LOG_FLUSH_INTERVAL 重试。
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SyncRun:
+    """一次任务运行"""
+
+    def __init__(self, source: str, task_type: str):
+        self.source = source
+        self.task_type = task_type
+        self.status = "running"
+        self.attempts = 0
+        self.records_count = 0
+        self.error_message = ""
+        self.started_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.log_id = 0  # 已写入的 running 记录 ID
+        self._started = time.monotonic()
+        self._duration: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return self._duration if self._duration is not None else time.monotonic() - self._started
+
+    def finish(self, status: str, records_count: int = 0, error_message: str = ""):
+        self.status = status
+        self.records_count = records_count
+        self.error_message = error_message
+        self.finished_at = datetime.now()
+        self._duration = time.monotonic() - self._started
+
+    def to_row(self) -> Dict:
+        return {
+            'source': self.source,
+            'task_type': self.task_type,
+            'status': self.status,
+            'records_count': self.records_count,
+            'error_message': self.error_message,
+            'retry_count': max(0, self.attempts - 1),
+            'started_at': self.started_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_ms': int(self.elapsed * 1000),
+        }
+
+
+class SyncLogBuffer:
+    """sync_logs 的进程内缓冲写入器"""
+
+    def __init__(self, log_repo, flush_interval: float = None, max_pending: int = None,
+                 flush_delay: float = None):
+        self.log_repo = log_repo
+        self.flush_interval = flush_interval or settings.SYNC_LOG_FLUSH_INTERVAL
+        self.flush_delay = flush_delay if flush_delay is not None else settings.SYNC_LOG_FLUSH_DELAY
+        self.max_pending = max_pending or settings.SYNC_LOG_MAX_PENDING
+        self._active: List[SyncRun] = []
+        self._finished: List[SyncRun] = []
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def begin(self, source: str, task_type: str) -> SyncRun:
+        """开始记录一次运行，稍后写入 running 记录"""
+        run = SyncRun(source, task_type)
+        self._active.append(run)
+        self._wakeup.set()
+        return run
+
+    def end(self, run: SyncRun, status: str, records_count: int = 0, error_message: str = ""):
+        """结束运行，等待下一次刷新写入"""
+        run.finish(status, records_count, error_message)
+        if run in self._active:
+            self._active.remove(run)
+        self._finished.append(run)
+        if len(self._finished) > self.max_pending:
+            # 数据库长时间不可用时丢弃最旧的记录，避免内存无限增长
+            dropped = len(self._finished) - self.max_pending
+            del self._finished[:dropped]
+            logger.warning(f"同步日志积压过多，丢弃 {dropped} 条")
+        self._wakeup.set()
+
+    async def flush(self):
+        """把已结束的运行批量写入，并为尚未落库的进行中运行写入 running 记录"""
+        async with self._lock:
+            finished, self._finished = self._finished, []
+            new_runs = [r for r in self._active if not r.log_id]
+
+            inserts = [r for r in finished if not r.log_id] + new_runs
+            if inserts:
+                ids = await self.log_repo.insert_logs([r.to_row() for r in inserts])
+                if ids is None:
+                    # 写入失败：已结束的运行放回队列，下次重试
+                    self._finished[:0] = [r for r in finished if not r.log_id]
+                else:
+                    for run, log_id in zip(inserts, ids):
+                        run.log_id = log_id
+
+            for run in finished:
+                if run.log_id and run not in inserts:
+                    if not await self.log_repo.update_log(run.log_id, run.to_row()):
+                        self._finished.append(run)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # 稍等片刻，把同一时刻开始/结束的运行合并为一批
+            await asyncio.sleep(self.flush_delay)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"同步日志刷新失败: {e}")
+
+    def start(self):
+        """启动后台定时刷新"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """停止定时刷新并写入剩余记录"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -3,137 +3,365 @@
 """
 import aiohttp
 import asyncio
+import hashlib
 import logging
 import json
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+import time
+from typing import List, Dict, Optional, Union
+from datetime import date, datetime, timedelta
 from app.config import settings
+from app.scrapers.cache import ApiPayload, CacheEntry, body_digest, get_response_cache
+from app.scrapers.rate_limiter import RateLimiter, get_rate_limiter
+from app.scrapers.replay import FixtureStore
+from app.scrapers.retry import (
+    CircuitBreaker, CircuitOpenError, RateLimitedError, RetryPolicy, ScraperError,
+    endpoint_key, parse_quota, parse_retry_after,
+)
+from app.scrapers.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
-class RateLimiter:
-    """API 限流器"""
+class BaseScraper:
+    """抓取器基类：持有长连接复用的 aiohttp 会话
 
-    def __init__(self, max_calls: int = 10, window: int = 60):
-        self.max_calls = max_calls
-        self.window = window
-        self.calls = []
+    会话在首次请求时于当前事件循环中懒创建，由 close() 显式释放，
+    生命周期跟随 SyncScheduler.start/stop 与 FastAPI lifespan。
+    """
 
-    async def acquire(self):
-        """获取调用许可"""
-        while True:
-            now = asyncio.get_event_loop().time()
-            # 清理窗口外的记录
-            self.calls = [t for t in self.calls if now - t < self.window]
-
-            if len(self.calls) < self.max_calls:
-                self.calls.append(now)
-                return
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        # 设置 HTTP_RECORD_DIR 时把响应录制为回放夹具
+        self.recorder = FixtureStore(settings.HTTP_RECORD_DIR) if settings.HTTP_RECORD_DIR else None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取（必要时创建）连接池会话"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.HTTP_TIMEOUT),
+            )
+        return self._session
+
+    def _record(self, url: str, status: int, headers, body: bytes):
+        """录制一次响应（仅在开启录制时生效）"""
+        if self.recorder is None:
+            return
+        try:
+            self.recorder.record(url, status, dict(headers), body)
+        except Exception as e:
+            logger.warning(f"录制响应失败: {e}")
 
-            # 等待
-            wait_time = self.window - (now - self.calls[0]) + 0.1
-            await asyncio.sleep(wait_time)
+    async def close(self):
+        """关闭会话并释放连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
 
-class FootballDataScraper:
+class FootballDataScraper(BaseScraper):
     """Football-Data.org 数据抓取器"""
 
+    # 进程内所有实例共享的在途请求表（调度器、cron 接口、脚本），
+    # 键里带上令牌指纹：不同令牌的实例（权限可能不同）不会共享彼此的结果
+    inflight = SingleFlight()
+
     def __init__(self, api_token: str = None):
+        super().__init__()
         self.api_token = api_token or settings.FD_API_TOKEN
-        self.base_url = "https://api.football-data.org/v4"
-        self.limiter = RateLimiter(settings.FD_RATE_LIMIT, settings.FD_RATE_WINDOW)
+        self._token_scope = hashlib.sha256((self.api_token or "").encode()).hexdigest()[:12]
+        self.base_url = settings.FD_API_BASE_URL
+        self.limiter = get_rate_limiter("football_data", settings.FD_RATE_LIMIT, settings.FD_RATE_WINDOW)
+        self.retry_policy = RetryPolicy(settings.FD_RETRY_MAX_ATTEMPTS,
+                                        settings.FD_RETRY_BASE_DELAY,
+                                        settings.FD_RETRY_MAX_DELAY)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.cache = get_response_cache()
 
     def _headers(self):
         return {"X-Auth-Token": self.api_token}
 
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        key = endpoint_key(endpoint)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(settings.FD_CIRCUIT_FAILURE_THRESHOLD,
+                                     settings.FD_CIRCUIT_RESET_TIMEOUT)
+            self._breakers[key] = breaker
+        return breaker
+
+    def _observe_quota(self, headers):
+        """根据配额响应头提前暂停限流器，避免下一次请求撞上 429"""
+        available, reset = parse_quota(headers)
+        if available == 0 and reset:
+            logger.info(f"本分钟配额已用完，{reset:.0f} 秒后恢复")
+            self.limiter.pause(reset)
+
+    async def _store_response(self, endpoint: str, cached: Optional[CacheEntry],
+                              raw: bytes, headers) -> Dict:
+        """解析 200 响应体，按需写入缓存并判断内容是否变化"""
+        data = json.loads(raw)
+        if self.cache is None:
+            return data
+
+        digest = body_digest(raw)
+        saved_digest = cached.saved_digest if cached else None
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        self.cache.misses += 1
+        if self.cache.is_cacheable(endpoint, etag, last_modified):
+            await self.cache.put(endpoint, CacheEntry(data, digest, time.time(), etag, last_modified, saved_digest))
+        return ApiPayload(data, unchanged=saved_digest == digest, endpoint=endpoint, digest=digest)
+
     async def _get(self, endpoint: str) -> Dict:
-        """发送 GET 请求"""
-        await self.limiter.acquire()
+        """发送 GET 请求；同一令牌对同一接口的并发调用合并为一次请求并共享解析结果"""
+        return await self.inflight.do(f"{self._token_scope}:{self.base_url}{endpoint}",
+                                      lambda: self._fetch(endpoint))
+
+    async def _fetch(self, endpoint: str) -> Dict:
+        """实际发送 GET 请求
+
+        429 按 Retry-After 等待、5xx 与网络错误按抖动指数退避重试；
+        重试耗尽或遇到不可重试错误时抛出 ScraperError，而不是返回空结果。
+        启用响应缓存时：TTL 内直接返回缓存，否则携带 ETag/Last-Modified 发送条件请求，
+        返回的 ApiPayload.unchanged 标记内容是否与上一次成功写库的版本一致（见 mark_saved）。
+        """
+        cached = await self.cache.get(endpoint) if self.cache else None
+        if cached and cached.is_fresh(self.cache.ttl_for(endpoint)):
+            self.cache.hits += 1
+            return ApiPayload(cached.body, unchanged=cached.saved, endpoint=endpoint, digest=cached.digest)
+
+        breaker = self._breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(
+                f"接口熔断中，{breaker.remaining():.0f} 秒后重试: {endpoint_key(endpoint)}"
+            )
+
+        trial = breaker.state == CircuitBreaker.HALF_OPEN
+        try:
+            return await self._request(endpoint, cached, breaker)
+        finally:
+            # 任何退出路径（包括取消、响应体解析失败）都不能占住半开状态的试探名额
+            if trial:
+                breaker.release()
+
+    async def _request(self, endpoint: str, cached: Optional[CacheEntry], breaker: CircuitBreaker) -> Dict:
+        """带重试的请求循环；每个退出路径都向熔断器记录结果
 
+        5xx 与网络错误计为失败；429 和其他 4xx 说明上游可达，计为成功，不会让熔断器停在半开状态。
+        """
         url = f"{self.base_url}{endpoint}"
-        logger.info(f"请求 Football-Data API: {endpoint}")
+        last_error: Optional[ScraperError] = None
+        upstream_failure = True
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self._headers()) as response:
+        for attempt in range(self.retry_policy.max_attempts):
+            await self.limiter.acquire()
+            logger.info(f"请求 Football-Data API: {endpoint}")
+
+            headers = self._headers()
+            if cached:
+                headers.update(cached.conditional_headers())
+
+            try:
+                session = await self._get_session()
+                async with session.get(url, headers=headers) as response:
+                    self._observe_quota(response.headers)
                     if response.status == 200:
-                        return await response.json()
+                        raw = await response.read()
+                        self._record(url, response.status, response.headers, raw)
+                        breaker.record_success()
+                        return await self._store_response(endpoint, cached, raw, response.headers)
+                    elif response.status == 304 and cached:
+                        breaker.record_success()
+                        self.cache.revalidated += 1
+                        await self.cache.touch(endpoint, cached)
+                        return ApiPayload(cached.body, unchanged=cached.saved, endpoint=endpoint, digest=cached.digest)
                     elif response.status == 404:
+                        self._record(url, response.status, response.headers, await response.read())
+                        breaker.record_success()
                         logger.warning(f"资源不存在: {endpoint}")
                         return {}
                     elif response.status == 429:
-                        logger.warning("请求超限，等待后重试...")
-                        await asyncio.sleep(60)
-                        return await self._get(endpoint)
+                        wait = parse_retry_after(response.headers)
+                        if wait is None:
+                            wait = self.retry_policy.backoff(attempt)
+                        last_error = RateLimitedError(f"请求超限: {endpoint}", retry_after=wait)
+                        upstream_failure = False
+                        if wait > self.retry_policy.max_delay:
+                            # 不让一次调度占住 worker 数分钟，交给下一轮调度
+                            breaker.record_success()
+                            raise last_error
+                        logger.warning(f"请求超限，{wait:.1f} 秒后重试 ({attempt + 1}/{self.retry_policy.max_attempts})")
+                        self.limiter.pause(wait)
+                        continue
+                    elif response.status >= 500:
+                        text = await response.text()
+                        last_error = ScraperError(f"API请求失败: {response.status} - {text[:200]}")
+                        upstream_failure = True
                     else:
                         text = await response.text()
-                        logger.error(f"API请求失败: {response.status} - {text}")
-                        return {}
-        except Exception as e:
-            logger.error(f"请求异常: {e}")
-            return {}
+                        breaker.record_success()
+                        raise ScraperError(f"API请求失败: {response.status} - {text[:200]}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = ScraperError(f"请求异常: {e!r}")
+                upstream_failure = True
+
+            logger.warning(f"{last_error} ({attempt + 1}/{self.retry_policy.max_attempts})")
+            if attempt + 1 < self.retry_policy.max_attempts:
+                await asyncio.sleep(self.retry_policy.backoff(attempt))
+
+        if upstream_failure:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        raise last_error
 
     async def get_matches(self, competition: str = None,
-                         status: str = "SCHEDULED",
-                         limit: int = None) -> List[Dict]:
-        """获取比赛"""
+                         status: Union[str, List[str]] = "SCHEDULED",
+                         limit: int = None,
+                         competitions: List[str] = None,
+                         date_from: str = None,
+                         date_to: str = None) -> List[Dict]:
+        """获取比赛
+
+        competitions 传入多个联赛代码时走批量接口
+        /matches?competitions=PL,BL1&status=...&dateFrom=...&dateTo=...
+        """
+        if not isinstance(status, str):
+            status = ",".join(status)
+
         if competition:
             endpoint = f"/competitions/{competition}/matches?status={status}"
-            if limit:
-                endpoint += f"&limit={limit}"
         else:
             endpoint = f"/matches?status={status}"
-            if limit:
-                endpoint += f"&limit={limit}"
+            if competitions:
+                endpoint += f"&competitions={','.join(competitions)}"
+        if date_from and date_to:
+            endpoint += f"&dateFrom={date_from}&dateTo={date_to}"
+        if limit:
+            endpoint += f"&limit={limit}"
 
         data = await self._get(endpoint)
         return data.get("matches", [])
 
+    async def get_matches_by_competition(self, competitions: List[str],
+                                         status: Union[str, List[str]],
+                                         date_from: date,
+                                         date_to: date) -> Dict[str, List[Dict]]:
+        """批量获取多个联赛在日期区间内的比赛，并按联赛代码拆分
+
+        Football-Data 限制单次 dateFrom~dateTo 跨度，区间按 FD_BATCH_WINDOW_DAYS 切片，
+        每个切片一次请求覆盖全部联赛。
+        """
+        grouped: Dict[str, Dict[int, Dict]] = {code: {} for code in competitions}
+        window = timedelta(days=settings.FD_BATCH_WINDOW_DAYS)
+        start = date_from
+        while start <= date_to:
+            end = min(start + window - timedelta(days=1), date_to)
+            matches = await self.get_matches(
+                status=status,
+                competitions=competitions,
+                date_from=start.isoformat(),
+                date_to=end.isoformat()
+            )
+            for match in matches:
+                code = (match.get('competition') or {}).get('code')
+                if code in grouped:
+                    grouped[code][match.get('id')] = match
+            start = end + timedelta(days=1)
+
+        return {code: list(matches.values()) for code, matches in grouped.items()}
+
     async def get_match(self, match_id: int) -> Optional[Dict]:
         """获取单场比赛详情"""
         endpoint = f"/matches/{match_id}"
         return await self._get(endpoint)
 
-    async def get_competitions(self) -> List[Dict]:
+    @staticmethod
+    def _skip(data: Dict, skip_unchanged: bool, endpoint: str, pending: Optional[List] = None) -> bool:
+        """内容与上次写库的版本一致且调用方要求跳过时返回 True，下游无需再解析和写库
+
+        不跳过时把响应加入 pending，调用方写库成功后交给 mark_saved。
+        """
+        if skip_unchanged and getattr(data, "unchanged", False):
+            logger.info(f"响应未变化，跳过下游处理: {endpoint}")
+            return True
+        if pending is not None and getattr(data, "digest", None):
+            pending.append(data)
+        return False
+
+    async def mark_saved(self, payloads: List[ApiPayload]):
+        """下游写库成功后调用：这些响应之后再次返回相同内容时才会被当作未变化而跳过"""
+        if self.cache is None:
+            return
+        for payload in payloads:
+            await self.cache.mark_saved(payload.endpoint, payload.digest)
+
+    async def get_competitions(self, skip_unchanged: bool = False,
+                               pending: Optional[List] = None) -> List[Dict]:
         """获取所有联赛"""
         endpoint = "/competitions"
         data = await self._get(endpoint)
+        if self._skip(data, skip_unchanged, endpoint, pending):
+            return []
         return data.get("competitions", [])
 
-    async def get_competition(self, competition_id: int) -> Dict:
+    async def get_competition(self, competition_id: int, skip_unchanged: bool = False,
+                              pending: Optional[List] = None) -> Dict:
         """获取单个联赛详情"""
         endpoint = f"/competitions/{competition_id}"
-        return await self._get(endpoint)
+        data = await self._get(endpoint)
+        if self._skip(data, skip_unchanged, endpoint, pending):
+            return {}
+        return data
 
-    async def get_scorers(self, competition: str, limit: int = None) -> tuple[List[Dict], Dict]:
+    async def get_scorers(self, competition: str, limit: int = None,
+                          skip_unchanged: bool = False, pending: Optional[List] = None) -> tuple[List[Dict], Dict]:
         """获取射手榜"""
         endpoint = f"/competitions/{competition}/scorers"
         if limit:
             endpoint += f"?limit={limit}"
         data = await self._get(endpoint)
+        if self._skip(data, skip_unchanged, endpoint, pending):
+            return [], {}
         return data.get("scorers", []), data.get("season", {})
 
-    async def get_standings(self, competition: str) -> tuple[List, Dict]:
+    async def get_standings(self, competition: str, skip_unchanged: bool = False,
+                            pending: Optional[List] = None) -> tuple[List, Dict]:
         """获取积分榜"""
         endpoint = f"/competitions/{competition}/standings"
         data = await self._get(endpoint)
+        if self._skip(data, skip_unchanged, endpoint, pending):
+            return [], {}
         # API直接返回列表，不是字典 (Some endpoints might, but standard is dict)
         if isinstance(data, list):
             return data, {}
         # 备用：如果是字典，取standings字段
         return data.get("standings", []), data.get("season", {})
 
-    async def get_teams(self, competition: str, limit: int = 100) -> List[Dict]:
+    async def get_teams(self, competition: str, limit: int = 100,
+                        skip_unchanged: bool = False, pending: Optional[List] = None) -> List[Dict]:
         """获取联赛球队"""
         endpoint = f"/competitions/{competition}/teams?limit={limit}"
         data = await self._get(endpoint)
+        if self._skip(data, skip_unchanged, endpoint, pending):
+            return []
         return data.get("teams", [])
 
-    async def get_team(self, team_id: int) -> Dict:
+    async def get_team(self, team_id: int, skip_unchanged: bool = False,
+                       pending: Optional[List] = None) -> Dict:
         """获取球队详情"""
         endpoint = f"/teams/{team_id}"
-        return await self._get(endpoint)
+        data = await self._get(endpoint)
+        if self._skip(data, skip_unchanged, endpoint, pending):
+            return {}
+        return data
 
     async def get_team_matches(self, team_id: int, limit: int = 10) -> List[Dict]:
         """获取球队比赛"""
@@ -142,13 +370,20 @@ class FootballDataScraper:
         return data.get("matches", [])
 
 
-class SportteryScraper:
+class SportteryScraper(BaseScraper):
     """竞彩官网数据抓取器 - 升级全量版"""
 
-    API_URL = "https://webapi.sporttery.cn/gateway/uniform/football/getMatchCalculatorV1.qry?clientCode=3001"
-    RESULT_API_URL = "https://webapi.sporttery.cn/gateway/uniform/football/getUniformMatchResultV1.qry?matchPage=0"
+    inflight = SingleFlight()
+
+    API_PATH = "/gateway/uniform/football/getMatchCalculatorV1.qry?clientCode=3001"
+    RESULT_API_PATH = "/gateway/uniform/football/getUniformMatchResultV1.qry"
+    RESULT_PAGE_SIZE = 100
 
     def __init__(self):
+        super().__init__()
+        self._result_semaphore = asyncio.Semaphore(settings.SPORTTERY_RESULT_CONCURRENCY)
+        self.API_URL = f"{settings.SPORTTERY_API_BASE_URL}{self.API_PATH}"
+        self.RESULT_API_URL = f"{settings.SPORTTERY_API_BASE_URL}{self.RESULT_API_PATH}"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
             'Accept': 'application/json, text/plain, */*',
@@ -162,117 +397,234 @@ class SportteryScraper:
         }
 
     async def get_matches(self) -> List[Dict]:
-        """获取所有赛程 - 真正的全量、多页、防缓存模式"""
-        import time
+        """获取所有赛程；并发调用共享同一次抓取"""
+        return await self.inflight.do("matches", self._fetch_matches)
+
+    async def get_match_results(self, start_date: Optional[date] = None,
+                                end_date: Optional[date] = None) -> List[Dict]:
+        """获取日期区间内的比分结果（默认今天及前3天）；并发调用共享同一次抓取"""
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=3)
+        return await self.inflight.do(
+            f"results:{start_date}:{end_date}",
+            lambda: self._fetch_match_results(start_date, end_date)
+        )
+
+    async def _fetch_match_page(self, page: int) -> tuple[int, Optional[List[Dict]]]:
+        """抓取单页赛程，返回 (页码, matchInfoList)；请求失败时列表为 None"""
+        ts = int(time.time() * 1000)
+        url = f"{self.API_URL}&poolCode=HHAD&channel=c&matchPage={page}&_={ts}"
+        try:
+            session = await self._get_session()
+            async with session.get(url, headers=self.headers) as response:
+                if response.status != 200:
+                    logger.warning(f"抓取 Page {page} 返回状态: {response.status}")
+                    return page, None
+
+                text = await response.text()
+                self._record(url, response.status, response.headers, text.encode("utf-8"))
+                if not text or "<html>" in text:
+                    return page, None
+
+                data = json.loads(text)
+                return page, (data.get('value') or {}).get('matchInfoList') or []
+        except Exception as e:
+            logger.error(f"抓取 Page {page} 出错: {e}")
+            return page, None
+
+    def _merge_groups(self, groups: List[Dict], all_matches: Dict[str, Dict]) -> int:
+        """解析一页的比赛分组并去重合并，返回新增比赛数"""
+        added = 0
+        for group in groups:
+            b_date = group.get('businessDate')
+            for item in group.get('subMatchList', []):
+                parsed = self._parse_match(item, b_date)
+                if parsed:
+                    # 使用 match_code 或 matchId 作为 key 去重
+                    m_id = parsed.get('match_code') or str(item.get('matchId'))
+                    if m_id not in all_matches:
+                        added += 1
+                    all_matches[m_id] = parsed
+        return added
+
+    async def _fetch_matches(self) -> List[Dict]:
+        """获取所有赛程 - 并发、自适应翻页、防缓存模式
+
+        每轮并发抓取 SPORTTERY_PAGE_CONCURRENCY 页，页面返回即解析去重；
+        只要本轮每一页都带来新比赛就继续下一轮，遇到空页、重复页或失败页即停止。
+        使用 getMatchCalculatorV1 接口（getMatchListV1 已被 WAF 拦截）。
+        """
         logger.info("正在执行深度全量赛程抓取...")
-        
-        all_matches = {}
-        # 扫描 matchPage 1 到 2，使用 getMatchCalculatorV1 接口（getMatchListV1 已被 WAF 拦截）
-        for page in [1, 2]:
-            ts = int(time.time() * 1000)
-            url = f"{self.API_URL}&poolCode=HHAD&channel=c&matchPage={page}&_={ts}"
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, headers=self.headers, timeout=aiohttp.ClientTimeout(total=15)) as response:
-                        if response.status != 200:
-                            continue
-                        
-                        text = await response.text()
-                        if not text or "<html>" in text:
-                            continue
-                            
-                        data = json.loads(text)
-                        groups = data.get('value', {}).get('matchInfoList', [])
-                        
-                        for group in groups:
-                            b_date = group.get('businessDate')
-                            sub_list = group.get('subMatchList', [])
-                            for item in sub_list:
-                                parsed = self._parse_match(item, b_date)
-                                if parsed:
-                                    # 使用 match_code 或 matchId 作为 key 去重
-                                    m_id = parsed.get('match_code') or str(item.get('matchId'))
-                                    all_matches[m_id] = parsed
-            except Exception as e:
-                logger.error(f"抓取 Page {page} 出错: {e}")
-                
+
+        all_matches: Dict[str, Dict] = {}
+        batch = max(1, settings.SPORTTERY_PAGE_CONCURRENCY)
+        next_page = 1
+        while next_page <= settings.SPORTTERY_MAX_PAGES:
+            pages = range(next_page, min(next_page + batch, settings.SPORTTERY_MAX_PAGES + 1))
+            keep_going = True
+            for future in asyncio.as_completed([self._fetch_match_page(p) for p in pages]):
+                page, groups = await future
+                if groups is None:
+                    keep_going = False
+                    continue
+                added = self._merge_groups(groups, all_matches)
+                if added == 0:
+                    logger.info(f"Page {page} 为空或全部重复，停止翻页")
+                    keep_going = False
+            if not keep_going:
+                break
+            next_page += batch
+
         final_list = list(all_matches.values())
         logger.info(f"全量抓取完成: 最终获得 {len(final_list)} 场独立赛程")
         return final_list
 
-    async def get_match_results(self) -> List[Dict]:
-        """使用高级接口获取最近3天的全量比分结果 (单次100场)"""
-        logger.info("请求竞彩高级结果 API (3日动态窗口)")
-        
-        # 动态计算日期范围：今天及前3天
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=3)).strftime('%Y-%m-%d')
-        
-        # 使用 pageSize=100 确保覆盖周末高峰
-        api_url = f"https://webapi.sporttery.cn/gateway/uniform/football/getUniformMatchResultV1.qry?matchBeginDate={start_date}&matchEndDate={end_date}&leagueId=&pageSize=100&pageNo=1&isFix=0&matchPage=1&pcOrWap=1"
-        
-        results = []
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url, headers=self.headers,
-                                      timeout=aiohttp.ClientTimeout(total=15)) as response:
+    def _result_windows(self, start_date: date, end_date: date) -> List[tuple[date, date]]:
+        """把日期区间切成 SPORTTERY_RESULT_WINDOW_DAYS 天的窗口"""
+        windows = []
+        span = timedelta(days=max(1, settings.SPORTTERY_RESULT_WINDOW_DAYS))
+        start = start_date
+        while start <= end_date:
+            end = min(start + span - timedelta(days=1), end_date)
+            windows.append((start, end))
+            start = end + timedelta(days=1)
+        return windows
+
+    async def _fetch_result_page(self, start: date, end: date, page_no: int) -> Dict:
+        """抓取结果接口的一页，返回 value 字段；失败时抛出 ScraperError"""
+        api_url = (f"{self.RESULT_API_URL}?matchBeginDate={start}&matchEndDate={end}&leagueId="
+                   f"&pageSize={self.RESULT_PAGE_SIZE}&pageNo={page_no}&isFix=0&matchPage=1&pcOrWap=1")
+        # 礼貌抓取：限制并发数，并在每次请求后留出间隔
+        async with self._result_semaphore:
+            try:
+                session = await self._get_session()
+                async with session.get(api_url, headers=self.headers) as response:
                     if response.status != 200:
-                        logger.error(f"竞彩高级结果API返回状态: {response.status}")
-                        return []
-
-                    data = await response.json()
-                    if not data.get('success'):
-                        logger.error(f"竞彩高级结果API返回失败: {data}")
-                        return []
-
-                    match_list = data.get('value', {}).get('matchResult', [])
-                    for item in match_list:
-                        match_date_str = item.get('matchDate')
-                        match_time_str = item.get('matchTime')
-                        match_code = item.get('matchNumStr', '')
-                        
-                        # [Business Logic Fix] 
-                        # 官方结果接口给的是自然日(matchDate)，我们需要转换成竞彩业务日(group_date)
-                        # 逻辑：如果是凌晨踢的比赛(0-11点)，且编号是前一天的，则 group_date 需要减一天
-                        group_date = match_date_str
-                        try:
-                            if match_code and len(match_code) >= 2:
-                                weekday_map = {"周一": 0, "周二": 1, "周三": 2, "周四": 3, "周五": 4, "周六": 5, "周日": 6}
-                                code_weekday = weekday_map.get(match_code[:2])
-                                
-                                if code_weekday is not None:
-                                    dt = datetime.strptime(match_date_str, "%Y-%m-%d")
-                                    # 如果自然日是周四(3)，但编号是周三(2)，则业务日应该是周三
-                                    current_weekday = dt.weekday()
-                                    if current_weekday != code_weekday:
-                                        # 简单的日期回退，确保 group_date 匹配编号
-                                        days_diff = (current_weekday - code_weekday + 7) % 7
-                                        if days_diff == 1: # 只处理相差一天的，防止逻辑跨度过大
-                                            dt = dt - timedelta(days=1)
-                                            group_date = dt.strftime("%Y-%m-%d")
-                        except Exception as e:
-                            logger.error(f"计算业务日期失败: {e}")
-
-                        full_match_time = f"{match_date_str} {match_time_str}" if match_date_str and match_time_str else None
-
-                        results.append({
-                            'match_code': match_code,
-                            'home_team': item.get('homeTeam'),
-                            'away_team': item.get('awayTeam'),
-                            'league': item.get('leagueName'),
-                            'group_date': group_date, # 使用计算出的业务日期
-                            'match_time': full_match_time, 
-                            'actual_score': item.get('sectionsNo999'),
-                            'half_score': item.get('sectionsNo1'),
-                            'status': 'finished'
-                        })
-                
-                logger.info(f"竞彩高级结果API共获取到 {len(results)} 场比分")
-                return results
+                        raise ScraperError(f"竞彩高级结果API返回状态: {response.status}")
+                    raw = await response.read()
+                    self._record(api_url, response.status, response.headers, raw)
+                    data = json.loads(raw)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                raise ScraperError(f"竞彩高级结果API请求失败: {e!r}")
+            finally:
+                await asyncio.sleep(settings.SPORTTERY_REQUEST_INTERVAL)
+
+        if not data.get('success'):
+            raise ScraperError(f"竞彩高级结果API返回失败: {data}")
+        return data.get('value') or {}
+
+    async def fetch_result_window(self, start: date, end: date) -> List[Dict]:
+        """抓取一个日期窗口内的全部结果：先取第1页得到总页数，其余页并发抓取"""
+        first = await self._fetch_result_page(start, end, 1)
+        items = list(first.get('matchResult') or [])
+
+        pages = first.get('pages')
+        if not pages and first.get('total'):
+            pages = -(-int(first['total']) // self.RESULT_PAGE_SIZE)
+
+        if pages:
+            rest = await asyncio.gather(*(
+                self._fetch_result_page(start, end, page_no) for page_no in range(2, int(pages) + 1)
+            ))
+            for value in rest:
+                items.extend(value.get('matchResult') or [])
+        else:
+            # 接口未返回总页数时顺序翻页，直到某页不满
+            page_no = 1
+            page_items = items
+            while len(page_items) >= self.RESULT_PAGE_SIZE:
+                page_no += 1
+                value = await self._fetch_result_page(start, end, page_no)
+                page_items = value.get('matchResult') or []
+                items.extend(page_items)
+
+        return [self._parse_result(item) for item in items]
+
+    async def iter_result_windows(self, start_date: date, end_date: date,
+                                  skip: Optional[set] = None):
+        """并发抓取多个日期窗口，按完成顺序产出 (窗口开始, 窗口结束, 结果或 None)
+
+        skip 中的窗口 key ("YYYY-MM-DD:YYYY-MM-DD") 会被跳过，用于断点续抓；
+        抓取失败的窗口产出 None，调用方不应把它记为已完成。
+        """
+        skip = skip or set()
+
+        async def run(start: date, end: date):
+            try:
+                return start, end, await self.fetch_result_window(start, end)
+            except ScraperError as e:
+                logger.error(f"抓取结果窗口 {start}~{end} 失败: {e}")
+                return start, end, None
+
+        windows = [w for w in self._result_windows(start_date, end_date)
+                   if f"{w[0]}:{w[1]}" not in skip]
+        for future in asyncio.as_completed([run(start, end) for start, end in windows]):
+            yield await future
+
+    async def _fetch_match_results(self, start_date: date, end_date: date) -> List[Dict]:
+        """使用高级接口按窗口、逐页获取日期区间内的全量比分结果
+
+        任一窗口抓取失败时抛出 ScraperError，不返回缺少部分比分的结果；
+        只有按断点续抓的回填任务才直接使用 iter_result_windows 跳过失败窗口。
+        """
+        logger.info(f"请求竞彩高级结果 API ({start_date} ~ {end_date})")
+
+        results: Dict[tuple, Dict] = {}
+        failed = []
+        async for start, end, window_results in self.iter_result_windows(start_date, end_date):
+            if window_results is None:
+                failed.append(f"{start}~{end}")
+                continue
+            for res in window_results:
+                results[(res['match_code'], res['group_date'])] = res
+        if failed:
+            raise ScraperError(f"竞彩结果窗口抓取失败: {', '.join(sorted(failed))}")
+
+        final_list = list(results.values())
+        logger.info(f"竞彩高级结果API共获取到 {len(final_list)} 场比分")
+        return final_list
+
+    def _parse_result(self, item: Dict) -> Dict:
+        """解析结果接口的一条记录"""
+        match_date_str = item.get('matchDate')
+        match_time_str = item.get('matchTime')
+        match_code = item.get('matchNumStr', '')
 
+        # [Business Logic Fix] 
+        # 官方结果接口给的是自然日(matchDate)，我们需要转换成竞彩业务日(group_date)
+        # 逻辑：如果是凌晨踢的比赛(0-11点)，且编号是前一天的，则 group_date 需要减一天
+        group_date = match_date_str
+        try:
+            if match_code and len(match_code) >= 2:
+                weekday_map = {"周一": 0, "周二": 1, "周三": 2, "周四": 3, "周五": 4, "周六": 5, "周日": 6}
+                code_weekday = weekday_map.get(match_code[:2])
+                
+                if code_weekday is not None:
+                    dt = datetime.strptime(match_date_str, "%Y-%m-%d")
+                    # 如果自然日是周四(3)，但编号是周三(2)，则业务日应该是周三
+                    current_weekday = dt.weekday()
+                    if current_weekday != code_weekday:
+                        # 简单的日期回退，确保 group_date 匹配编号
+                        days_diff = (current_weekday - code_weekday + 7) % 7
+                        if days_diff == 1: # 只处理相差一天的，防止逻辑跨度过大
+                            dt = dt - timedelta(days=1)
+                            group_date = dt.strftime("%Y-%m-%d")
         except Exception as e:
-            logger.error(f"竞彩高级结果API请求失败: {e}")
-            return results
+            logger.error(f"计算业务日期失败: {e}")
+
+        full_match_time = f"{match_date_str} {match_time_str}" if match_date_str and match_time_str else None
+
+        return {
+            'match_code': match_code,
+            'home_team': item.get('homeTeam'),
+            'away_team': item.get('awayTeam'),
+            'league': item.get('leagueName'),
+            'group_date': group_date, # 使用计算出的业务日期
+            'match_time': full_match_time, 
+            'actual_score': item.get('sectionsNo999'),
+            'half_score': item.get('sectionsNo1'),
+            'status': 'finished'
+        }
 
     def _parse_match(self, item: Dict, business_date: str) -> Optional[Dict]:
         """解析单场比赛"""
@@ -0,0 +1,223 @@
+"""
+Football-Data 响应缓存
+
+按接口族设置 TTL，保存 ETag / Last-Modified 校验值用于条件请求，
+并持久化到本地 SQLite 文件，让短生命周期的 cron 脚本也能命中缓存。
+“未变化”以最近一次成功写库的响应为准（saved_digest），而不是最近一次抓取：
+抓取后写库失败或任务中途出错时，下次仍会把这份数据交给下游。
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ApiPayload(dict):
+    """接口响应体；unchanged=True 表示内容与上一次成功写库的版本一致"""
+
+    def __init__(self, data: Dict, unchanged: bool = False,
+                 endpoint: Optional[str] = None, digest: Optional[str] = None):
+        super().__init__(data)
+        self.unchanged = unchanged
+        self.endpoint = endpoint
+        self.digest = digest
+
+
+@dataclass
+class CacheEntry:
+    body: Dict
+    digest: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    saved_digest: Optional[str] = None  # 下游已成功写库的响应摘要
+
+    @property
+    def saved(self) -> bool:
+        return self.saved_digest == self.digest
+
+    def is_fresh(self, ttl: int) -> bool:
+        return ttl > 0 and time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def body_digest(raw: bytes) -> str:
+    return hashlib.sha1(raw).hexdigest()
+
+
+def default_ttls() -> List[Tuple[str, int]]:
+    """接口族 -> TTL（秒）；未匹配的接口（比赛等实时数据）不做 TTL 缓存"""
+    return [
+        (r"^/competitions/[^/]+/standings", settings.FD_CACHE_TTL_STANDINGS),
+        (r"^/competitions/[^/]+/scorers", settings.FD_CACHE_TTL_SCORERS),
+        (r"^/competitions/[^/]+/teams", settings.FD_CACHE_TTL_TEAMS),
+        (r"^/teams/\d+$", settings.FD_CACHE_TTL_TEAMS),
+        (r"^/competitions(/[^/]+)?$", settings.FD_CACHE_TTL_COMPETITIONS),
+    ]
+
+
+class ResponseCache:
+    """两级响应缓存：进程内字典 + 可选的 SQLite 持久化"""
+
+    # 每写入多少次清理一次 SQLite 中的旧条目
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: Optional[str] = None, ttls: Optional[List[Tuple[str, int]]] = None,
+                 max_entries: int = None):
+        self.path = path
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls or default_ttls())]
+        self.max_entries = max_entries or settings.FD_CACHE_MAX_ENTRIES
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._puts = 0
+        self._initialized = False
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def ttl_for(self, endpoint: str) -> int:
+        path = endpoint.split("?", 1)[0]
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return 0
+
+    def is_cacheable(self, endpoint: str, etag: Optional[str], last_modified: Optional[str]) -> bool:
+        return self.ttl_for(endpoint) > 0 or bool(etag or last_modified)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS http_cache ("
+                "key TEXT PRIMARY KEY, body TEXT NOT NULL, digest TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL, etag TEXT, last_modified TEXT, saved_digest TEXT)"
+            )
+            # 旧版本创建的缓存文件没有 saved_digest 列
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(http_cache)")}
+            if "saved_digest" not in columns:
+                conn.execute("ALTER TABLE http_cache ADD COLUMN saved_digest TEXT")
+            self._initialized = True
+        return conn
+
+    def _load_sync(self, key: str) -> Optional[CacheEntry]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT body, digest, fetched_at, etag, last_modified, saved_digest FROM http_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2], row[3], row[4], row[5])
+
+    def _store_sync(self, key: str, entry: CacheEntry):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO http_cache "
+                    "(key, body, digest, fetched_at, etag, last_modified, saved_digest) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, json.dumps(entry.body, ensure_ascii=False), entry.digest,
+                     entry.fetched_at, entry.etag, entry.last_modified, entry.saved_digest)
+                )
+        finally:
+            conn.close()
+
+    def _prune_sync(self):
+        """只保留最近抓取的 max_entries 条（带日期参数的 /matches 等 key 会不断产生新条目）"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "DELETE FROM http_cache WHERE key NOT IN "
+                    "(SELECT key FROM http_cache ORDER BY fetched_at DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+        finally:
+            conn.close()
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+        elif self.path:
+            try:
+                entry = await asyncio.to_thread(self._load_sync, key)
+            except Exception as e:
+                logger.warning(f"读取响应缓存失败: {e}")
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    async def put(self, key: str, entry: CacheEntry):
+        self._remember(key, entry)
+        if self.path:
+            self._puts += 1
+            try:
+                await asyncio.to_thread(self._store_sync, key, entry)
+                if self._puts % self.PRUNE_EVERY == 0:
+                    await asyncio.to_thread(self._prune_sync)
+            except Exception as e:
+                logger.warning(f"写入响应缓存失败: {e}")
+
+    async def mark_saved(self, key: str, digest: str):
+        """下游已把 digest 对应的响应写入数据库；之后相同内容的响应才算“未变化”"""
+        entry = await self.get(key)
+        if entry is not None and entry.digest == digest and entry.saved_digest != digest:
+            entry.saved_digest = digest
+            await self.put(key, entry)
+
+    async def touch(self, key: str, entry: CacheEntry):
+        """304 Not Modified：刷新抓取时间"""
+        entry.fetched_at = time.time()
+        await self.put(key, entry)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses,
+                "entries": len(self._memory)}
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """获取进程内共享的响应缓存；未启用时返回 None，Vercel 只读文件系统下仅使用内存"""
+    global _response_cache
+    if not settings.FD_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        path = None
+        if not os.environ.get("VERCEL"):
+            path = settings.FD_CACHE_PATH
+            cache_dir = os.path.dirname(path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+        _response_cache = ResponseCache(path)
+    return _response_cache
@@ -0,0 +1,150 @@
+"""
+令牌桶限流器
+
+- RateLimiter: O(1) 令牌桶，协程按 FIFO 顺序公平等待
+- SQLiteTokenStore: 可选的共享后端，同一主机上的多个进程共用一份配额
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteTokenStore:
+    """基于本地 SQLite 文件锁的令牌桶状态存储（跨进程共享）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        if not self._initialized:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS token_buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._initialized = True
+        return conn
+
+    def _take_sync(self, name: str, capacity: float, rate: float) -> float:
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE 获取写锁，保证读-改-写在进程间原子执行
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (name,)
+            ).fetchone()
+            now = time.time()
+            if row is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+
+            conn.execute(
+                "INSERT INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (name, tokens, now)
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    async def take(self, name: str, capacity: float, rate: float) -> float:
+        """尝试取一个令牌，成功返回 0，否则返回建议等待秒数"""
+        return await asyncio.to_thread(self._take_sync, name, capacity, rate)
+
+
+class RateLimiter:
+    """令牌桶限流器
+
+    桶容量为 max_calls，按 max_calls / window 的速率匀速补充。
+    acquire 只做常数次运算；等待中的协程持有同一把锁，按到达顺序依次放行。
+    """
+
+    def __init__(self, max_calls: int = 10, window: int = 60,
+                 name: str = "default", store: Optional[SQLiteTokenStore] = None):
+        self.max_calls = max_calls
+        self.window = window
+        self.name = name
+        self.store = store
+        self.capacity = float(max_calls)
+        self.rate = max_calls / window
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._resume_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """上游告知配额耗尽时暂停放行，直到 seconds 秒后"""
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    def _take_local(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def _take(self) -> float:
+        if self.store is not None:
+            try:
+                return await self.store.take(self.name, self.capacity, self.rate)
+            except Exception as e:
+                # 共享后端不可用时退回进程内令牌桶，不阻塞抓取
+                logger.warning(f"共享限流后端不可用，改用进程内限流: {e}")
+        return self._take_local()
+
+    async def acquire(self):
+        """获取调用许可"""
+        async with self._lock:
+            while True:
+                paused = self._resume_at - time.monotonic()
+                if paused > 0:
+                    await asyncio.sleep(paused)
+                    continue
+                wait = await self._take()
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(name: str, max_calls: int, window: int) -> RateLimiter:
+    """获取进程内共享的限流器实例
+
+    同名限流器在进程内只创建一次，调度器、cron 接口和脚本共用同一份配额；
+    RATE_LIMIT_BACKEND=sqlite 时再通过 SQLite 文件在同一主机的进程间共享。
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        store = None
+        if settings.RATE_LIMIT_BACKEND == "sqlite":
+            db_dir = os.path.dirname(settings.RATE_LIMIT_DB_PATH)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            store = SQLiteTokenStore(settings.RATE_LIMIT_DB_PATH)
+        limiter = RateLimiter(max_calls, window, name=name, store=store)
+        _limiters[name] = limiter
+    return limiter
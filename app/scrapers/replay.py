@@ -0,0 +1,190 @@
+"""
+HTTP 录制 / 回放
+
+- FixtureStore: 把真实接口响应保存为 JSON 夹具文件，并按请求路径查找
+- create_replay_app: 本地 aiohttp 回放服务，支持固定延迟、429 注入和比赛时间平移
+
+录制: 设置 HTTP_RECORD_DIR 后，抓取器会把每个响应写入该目录。
+回放: 启动 scripts/replay_server.py，再把 FD_API_BASE_URL / SPORTTERY_API_BASE_URL
+指向回放服务即可离线运行完整同步。
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# 每次请求都会变化、不参与匹配的参数（防缓存时间戳）
+VOLATILE_PARAMS = {"_"}
+# 宽松匹配时忽略的日期参数：回放时的“今天”与录制时不同
+DATE_PARAMS = {"dateFrom", "dateTo", "matchBeginDate", "matchEndDate"}
+# 时间平移时需要调整的字段
+SHIFTED_FIELDS = {"utcDate", "lastUpdated"}
+
+
+def fixture_key(url: str, loose: bool = False) -> str:
+    """请求 -> 夹具 key：路径 + 排序后的查询参数（去掉易变参数）"""
+    parts = urlsplit(url)
+    ignored = VOLATILE_PARAMS | DATE_PARAMS if loose else VOLATILE_PARAMS
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in ignored)
+    return f"{parts.path}?{urlencode(query)}" if query else parts.path
+
+
+class FixtureStore:
+    """夹具目录：每个响应一个 JSON 文件"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._exact: Dict[str, Dict] = {}
+        self._loose: Dict[str, Dict] = {}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest()[:16] + ".json")
+
+    def record(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        """保存一次响应"""
+        os.makedirs(self.directory, exist_ok=True)
+        key = fixture_key(url)
+        text = body.decode("utf-8", errors="replace")
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            payload = text
+        fixture = {
+            "key": key,
+            "status": status,
+            "headers": {k: v for k, v in headers.items()
+                        if k.lower() in ("content-type", "etag", "last-modified")},
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "body": payload,
+        }
+        with open(self._path(key), "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False)
+
+    def load(self) -> int:
+        """加载目录下全部夹具，返回数量"""
+        self._exact.clear()
+        self._loose.clear()
+        if not os.path.isdir(self.directory):
+            return 0
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                fixture = json.load(f)
+            self._exact[fixture["key"]] = fixture
+            self._loose.setdefault(fixture_key(fixture["key"], loose=True), fixture)
+        return len(self._exact)
+
+    def find(self, url: str) -> Optional[Dict]:
+        """先精确匹配，再忽略日期参数宽松匹配"""
+        return self._exact.get(fixture_key(url)) or self._loose.get(fixture_key(url, loose=True))
+
+
+def shift_times(value, delta: timedelta):
+    """递归平移响应体中的比赛时间字段，让录制时的进行中比赛在回放时仍是“进行中”"""
+    if isinstance(value, dict):
+        shifted = {}
+        for k, v in value.items():
+            if k in SHIFTED_FIELDS and isinstance(v, str):
+                try:
+                    dt = datetime.fromisoformat(v.replace("Z", "+00:00")) + delta
+                    shifted[k] = dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+                    continue
+                except ValueError:
+                    pass
+            shifted[k] = shift_times(v, delta)
+        return shifted
+    if isinstance(value, list):
+        return [shift_times(v, delta) for v in value]
+    return value
+
+
+def create_replay_app(store: FixtureStore, latency_ms: int = 0, jitter_ms: int = 0,
+                      rate_limit_every: int = 0, retry_after: int = 1,
+                      time_shift: bool = False) -> web.Application:
+    """创建回放服务
+
+    Args:
+        latency_ms / jitter_ms: 每个响应的固定延迟与随机抖动
+        rate_limit_every: 每 N 个请求注入一次 429（0 表示不注入）
+        retry_after: 注入 429 时的 Retry-After 秒数
+        time_shift: 按录制时间与当前时间的差值平移 utcDate / lastUpdated
+    """
+    stats = {"requests": 0, "served": 0, "missing": 0, "throttled": 0}
+
+    async def handle(request: web.Request) -> web.Response:
+        stats["requests"] += 1
+        if latency_ms or jitter_ms:
+            await asyncio.sleep((latency_ms + random.uniform(0, jitter_ms)) / 1000)
+
+        if rate_limit_every and stats["requests"] % rate_limit_every == 0:
+            stats["throttled"] += 1
+            return web.json_response(
+                {"message": "You reached your request limit (replay)."}, status=429,
+                headers={"Retry-After": str(retry_after), "X-Requests-Available-Minute": "0"}
+            )
+
+        fixture = store.find(str(request.rel_url))
+        if fixture is None:
+            stats["missing"] += 1
+            logger.warning(f"回放夹具不存在: {request.rel_url}")
+            return web.json_response({"message": "fixture not found", "key": fixture_key(str(request.rel_url))},
+                                     status=404)
+
+        stats["served"] += 1
+        body = fixture["body"]
+        if time_shift and fixture.get("recorded_at"):
+            recorded_at = datetime.fromisoformat(fixture["recorded_at"])
+            body = shift_times(body, datetime.now(timezone.utc) - recorded_at)
+
+        headers = {k: v for k, v in fixture.get("headers", {}).items() if k.lower() != "content-type"}
+        if isinstance(body, str):
+            return web.Response(text=body, status=fixture["status"], headers=headers)
+        return web.json_response(body, status=fixture["status"], headers=headers)
+
+    async def handle_stats(request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_get("/__replay__/stats", handle_stats)
+    app.router.add_route("GET", "/{tail:.*}", handle)
+    return app
+
+
+# 一个完整比赛日会运行的同步任务（SyncScheduler 方法名，按执行顺序）
+MATCH_DAY_JOBS = [
+    "sync_fd_competitions",
+    "sync_fd_scheduled",
+    "sync_fd_results",
+    "sync_fd_standings",
+    "sync_fd_scorers",
+    "sync_fd_teams",
+    "sync_fd_live_scores",
+    "sync_sporttery_matches",
+    "sync_sporttery_results",
+]
+
+
+class NullRepository:
+    """录制/回放时替代数据库仓储：写入直接丢弃，查询和批量插入返回空列表"""
+
+    def __getattr__(self, name: str):
+        async def method(*args, **kwargs):
+            if name.startswith(("get_", "insert_")):
+                return []
+            if args and isinstance(args[0], list):
+                # 批量写入：按全部写入成功计数
+                from app.repositories import BulkWriteResult
+                return BulkWriteResult(written=len(args[0]))
+            return True
+        return method
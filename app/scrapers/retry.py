@@ -0,0 +1,140 @@
+"""
+抓取重试策略与熔断器
+
+- RetryPolicy: 带抖动的指数退避
+- CircuitBreaker: 按接口维度熔断，上游故障期间快速失败
+- parse_retry_after / parse_quota: 解析 Retry-After 与 Football-Data 配额响应头
+"""
+import random
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+
+
+class ScraperError(Exception):
+    """抓取失败（重试耗尽或不可重试的错误）"""
+
+
+class RateLimitedError(ScraperError):
+    """上游限流，且要求的等待时间超过允许的上限"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(ScraperError):
+    """熔断器处于打开状态，请求被快速拒绝"""
+
+
+class RetryPolicy:
+    """带完全抖动 (full jitter) 的指数退避策略"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次（从 0 开始）失败后的等待秒数"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """熔断器: closed -> open (连续失败达到阈值) -> half_open (冷却后放行一次试探)"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 120.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """当前是否允许发出请求"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        # half_open: 只放行一个试探请求
+        if self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.state = self.CLOSED
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """请求未给出结果就退出（取消等）时归还试探名额，下一次调用可以重新试探"""
+        self._trial_in_flight = False
+
+    def remaining(self) -> float:
+        """距离下一次试探还需等待的秒数"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+def endpoint_key(endpoint: str) -> str:
+    """接口维度的熔断 key：去掉查询串，数字 ID 归一为 {id}"""
+    path = endpoint.split("?", 1)[0]
+    return re.sub(r"/\d+", "/{id}", path)
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """解析 Retry-After（秒数或 HTTP 日期），缺失时退回 X-RequestCounter-Reset"""
+    value = headers.get("Retry-After")
+    if value:
+        value = value.strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                dt = parsedate_to_datetime(value)
+                if dt.tzinfo is None:
+                    dt = dt.replace(tzinfo=timezone.utc)
+                return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    reset = headers.get("X-RequestCounter-Reset")
+    if reset:
+        try:
+            return max(0.0, float(reset))
+        except ValueError:
+            pass
+    return None
+
+
+def parse_quota(headers: Mapping[str, str]) -> Tuple[Optional[int], Optional[float]]:
+    """解析 Football-Data 配额头，返回 (本分钟剩余次数, 距重置秒数)"""
+    available = headers.get("X-Requests-Available-Minute")
+    reset = headers.get("X-RequestCounter-Reset")
+    try:
+        available = int(available) if available is not None else None
+    except ValueError:
+        available = None
+    try:
+        reset = float(reset) if reset is not None else None
+    except ValueError:
+        reset = None
+    return available, reset
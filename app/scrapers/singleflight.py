@@ -0,0 +1,39 @@
+"""
+请求合并 (single-flight)
+
+同一 key 的并发调用只执行一次，其余调用方等待并共享同一个结果。
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """进程内在途请求去重"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """执行 fn()；若同 key 的调用仍在进行中，则直接等待其结果"""
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        # shield: 某个调用方被取消时不影响共享同一请求的其他调用方
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # 标记异常已读取，避免所有调用方都已取消时告警
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.calls, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
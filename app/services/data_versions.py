@@ -0,0 +1,77 @@
+"""
+表级数据版本
+
+data_versions 表由数据库触发器维护：任何写入都会把对应表的版本号加一，
+因此不论写入来自调度器、cron 脚本还是其他实例，各实例看到的版本都一致。
+进程内只按 DATA_VERSION_TTL 间隔轮询这张小表；本进程写入后立即重新轮询。
+读接口用版本号计算 ETag，版本未变时直接返回 304，不查询业务表。
+"""
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from typing import Dict, Iterable, Optional, Set
+
+from app.config import settings
+from app.database import get_client, run_query
+from app.services.events import data_events
+
+logger = logging.getLogger(__name__)
+
+
+class DataVersions:
+    """表名 -> 版本号"""
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl if ttl is not None else settings.DATA_VERSION_TTL
+        self._versions: Dict[str, int] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        # data_versions 表不可用（迁移未执行）时退化为进程内计数，ETag 只在本进程内有效
+        self._persisted = True
+        self._local: Dict[str, int] = {}
+        self._nonce = uuid.uuid4().hex[:8]
+        self.polls = 0
+
+    def on_change(self, table: str, scopes: Optional[Set] = None):
+        """本进程写入后：本地计数加一，下次读取时重新轮询"""
+        self._local[table] = self._local.get(table, 0) + 1
+        self._fetched_at = 0.0
+
+    async def _refresh(self):
+        if time.monotonic() - self._fetched_at < self.ttl:
+            return
+        async with self._lock:
+            if time.monotonic() - self._fetched_at < self.ttl:
+                return
+            client = get_client()
+            try:
+                if client is None:
+                    raise RuntimeError("database client is not initialized")
+                response = await run_query(client.table('data_versions').select("table_name, version"))
+                self._versions = {row['table_name']: row['version'] for row in response.data}
+                self._persisted = True
+            except Exception as e:
+                if self._persisted:
+                    logger.warning(f"读取 data_versions 失败，ETag 改用进程内版本: {e}")
+                self._persisted = False
+            self._fetched_at = time.monotonic()
+            self.polls += 1
+
+    async def etag(self, key: str, tables: Iterable[str]) -> str:
+        """由请求 key 和相关表的版本号计算强 ETag"""
+        await self._refresh()
+        if self._persisted:
+            parts = [f"{t}={self._versions.get(t, 0)}" for t in sorted(set(tables))]
+        else:
+            parts = [f"{t}={self._nonce}.{self._local.get(t, 0)}" for t in sorted(set(tables))]
+        digest = hashlib.sha1("|".join([key] + parts).encode("utf-8")).hexdigest()[:20]
+        return f'"{digest}"'
+
+    def stats(self) -> Dict:
+        return {"persisted": self._persisted, "polls": self.polls, "versions": dict(self._versions)}
+
+
+data_versions = DataVersions()
+data_events.subscribe(data_versions.on_change)
@@ -0,0 +1,58 @@
+"""
+数据变更事件
+
+写入路径在数据落库后发布 (表, 范围) 事件，订阅方（API 响应缓存等）据此失效自己的数据。
+范围是该表上用于切分读请求的字段值，例如 fd_matches 的 league_code；
+scopes 为 None 表示整张表都可能变化。
+"""
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 表 -> 划分范围的字段
+SCOPE_FIELDS = {
+    'fd_matches': 'league_code',
+    'fd_standings': 'league_code',
+    'fd_scorers': 'league_code',
+    'fd_league_teams': 'league_code',
+    'fd_match_details': 'match_id',
+    'fd_match_goals': 'match_id',
+}
+
+Listener = Callable[[str, Optional[Set]], None]
+
+
+class DataEvents:
+    """进程内的同步发布/订阅"""
+
+    def __init__(self):
+        self._listeners: List[Listener] = []
+        self.published = 0
+
+    def subscribe(self, listener: Listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def publish(self, table: str, scopes: Optional[Iterable] = None):
+        """通知订阅方 table 在 scopes 范围内的数据已变化"""
+        self.published += 1
+        scopes = set(scopes) if scopes is not None else None
+        for listener in list(self._listeners):
+            try:
+                listener(table, scopes)
+            except Exception as e:
+                logger.warning(f"数据变更事件处理失败 ({table}): {e}")
+
+    def publish_rows(self, table: str, rows: Iterable[Dict]):
+        """按写入的行计算范围后发布；行里缺少范围字段时按整表变化处理"""
+        field = SCOPE_FIELDS.get(table)
+        scopes = None
+        if field:
+            values = {row.get(field) for row in rows}
+            if None not in values:
+                scopes = values
+        self.publish(table, scopes)
+
+
+data_events = DataEvents()
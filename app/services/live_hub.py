@@ -0,0 +1,121 @@
+"""
+实时比分推送中心
+
+调度器每次同步实时比分/结果后把比赛行交给 LiveHub，LiveHub 与上一次看到的状态比较，
+只把比分或状态发生变化的比赛推送给所有订阅者（SSE 连接）。
+每个订阅者一个有界队列：客户端跟不上时清空队列并发送 resync，让客户端重新拉取列表。
+服务关闭时 close() 向每个队列放入 CLOSE，SSE 连接随之结束，不阻塞进程的优雅退出。
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 推送给客户端的字段
+LIVE_FIELDS = ('status', 'home_score', 'away_score', 'home_half_score', 'away_half_score')
+LIVE_STATUSES = {'LIVE', 'IN_PLAY', 'PAUSED'}
+# 队列中的关闭标记：订阅者收到后结束连接
+CLOSE = None
+
+
+class LiveHub:
+    """进程内发布/订阅"""
+
+    def __init__(self, queue_size: int = None, max_clients: int = None):
+        self.queue_size = queue_size or settings.LIVE_STREAM_QUEUE_SIZE
+        self.max_clients = max_clients or settings.LIVE_STREAM_MAX_CLIENTS
+        self._subscribers: List[asyncio.Queue] = []
+        self._state: Dict[int, Dict] = {}  # fd_id -> 最近一次的比分/状态（只保留未结束的比赛）
+        self._event_id = 0
+        self.closed = False
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def clients(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Optional[asyncio.Queue]:
+        """新增订阅者；连接数达到上限或服务正在关闭时返回 None"""
+        if self.closed or len(self._subscribers) >= self.max_clients:
+            return None
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def snapshot(self) -> List[Dict]:
+        """当前进行中比赛的比分/状态，新连接建立时先发送一次"""
+        return [{'fd_id': fd_id, **state} for fd_id, state in self._state.items()]
+
+    def close(self):
+        """服务关闭：通知所有订阅者结束连接，之后不再接受新订阅"""
+        self.closed = True
+        for queue in list(self._subscribers):
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(CLOSE)
+
+    def publish_matches(self, rows: List[Dict], complete: bool = False) -> int:
+        """比较后推送变化的比赛，返回推送的比赛数
+
+        首次出现的比赛只有在进行中时才推送（避免启动后把最近几天的赛果全部推送一遍）；
+        比赛结束后推送最后一次变化并从状态表中移除。
+        complete=True 表示 rows 是当前全部进行中的比赛（实时比分任务），
+        不在其中的比赛已离开进行中状态（结束、中断等），从状态表中移除，snapshot 不再包含它们。
+        """
+        if complete:
+            current = {row.get('fd_id') for row in rows}
+            for fd_id in [fd_id for fd_id in self._state if fd_id not in current]:
+                del self._state[fd_id]
+
+        changes = []
+        for row in rows:
+            fd_id = row.get('fd_id')
+            if fd_id is None:
+                continue
+            state = {field: row.get(field) for field in LIVE_FIELDS}
+            previous = self._state.get(fd_id)
+            if previous is None and state['status'] not in LIVE_STATUSES:
+                continue
+            if state != previous:
+                changes.append({'fd_id': fd_id, 'league_code': row.get('league_code'), **state})
+            if state['status'] in LIVE_STATUSES:
+                self._state[fd_id] = state
+            else:
+                self._state.pop(fd_id, None)
+
+        if changes:
+            self._broadcast({'type': 'score', 'matches': changes})
+        return len(changes)
+
+    def _broadcast(self, event: Dict):
+        self._event_id += 1
+        event = {'id': self._event_id, **event}
+        self.published += 1
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 客户端消费太慢：丢弃积压，通知其重新拉取完整列表
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({'id': self._event_id, 'type': 'resync'})
+                self.dropped += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "clients": self.clients,
+            "live_matches": len(self._state),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+live_hub = LiveHub()
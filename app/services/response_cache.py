@@ -0,0 +1,122 @@
+"""
+API 响应缓存
+
+公开读接口的结果按 (接口, 规范化后的查询参数) 缓存在进程内：
+- LRU + TTL 淘汰，条目数有上限
+- 每个条目带 (表, 范围) 标签，写入路径发布数据变更事件时按标签失效
+- 同一 key 的并发未命中只查询一次数据库
+TTL 只作为兜底：其他进程（cron 脚本等）写入的数据不会触发本进程的事件。
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from app.config import settings
+from app.scrapers.singleflight import SingleFlight
+from app.services.events import data_events
+
+logger = logging.getLogger(__name__)
+
+Tag = Tuple[str, Any]  # (表, 范围)；范围为 None 表示依赖整张表
+Tags = Union[Iterable[Tag], Callable[[Any], Iterable[Tag]]]
+
+
+def cache_key(endpoint: str, **params) -> str:
+    """接口名 + 排序后的非空参数"""
+    parts = [f"{k}={v}" for k, v in sorted(params.items()) if v is not None]
+    return endpoint + "?" + "&".join(parts)
+
+
+class _Entry:
+    __slots__ = ("value", "tags", "expires_at")
+
+    def __init__(self, value: Any, tags: List[Tag], expires_at: float):
+        self.value = value
+        self.tags = tags
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """按数据变更事件失效的 LRU + TTL 缓存"""
+
+    def __init__(self, max_entries: int = None, ttl: float = None, empty_ttl: float = None):
+        self.max_entries = max_entries or settings.API_CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else settings.API_CACHE_TTL
+        self.empty_ttl = empty_ttl if empty_ttl is not None else settings.API_CACHE_EMPTY_TTL
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}  # 表 -> 失效次数，用于丢弃加载期间已过期的结果
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.evicted = 0
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], tags: Tags) -> Any:
+        """命中时直接返回；未命中时执行 loader() 并按 tags 缓存结果
+
+        Args:
+            tags: 标签列表，或根据结果计算标签的函数
+        """
+        if not settings.API_CACHE_ENABLED:
+            return await loader()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            del self._entries[key]
+
+        self.misses += 1
+        return await self._flight.do(key, lambda: self._load(key, loader, tags))
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], tags: Tags) -> Any:
+        generations = dict(self._generations)
+        value = await loader()
+        tag_list = list(tags(value) if callable(tags) else tags)
+
+        # 加载期间相关表发生过写入：结果可能已过期，只返回不缓存
+        if any(self._generations.get(table, 0) != generations.get(table, 0) for table, _ in tag_list):
+            return value
+
+        ttl = self.ttl if getattr(value, "data", value) else min(self.ttl, self.empty_ttl)
+        if ttl <= 0:
+            return value
+        self._entries[key] = _Entry(value, tag_list, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+        return value
+
+    def invalidate(self, table: str, scopes: Optional[Set] = None):
+        """失效依赖 table 的条目；scopes 为 None 时失效整张表"""
+        self._generations[table] = self._generations.get(table, 0) + 1
+        stale = [
+            key for key, entry in self._entries.items()
+            if any(t == table and (scopes is None or scope is None or scope in scopes) for t, scope in entry.tags)
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.invalidated += len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+            "coalesced": self._flight.coalesced,
+            "invalidated": self.invalidated,
+            "evicted": self.evicted,
+        }
+
+
+api_cache = ResponseCache()
+data_events.subscribe(api_cache.invalidate)
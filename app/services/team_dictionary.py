@@ -0,0 +1,135 @@
+"""
+球队字典服务
+
+进程内缓存全部球队的翻译名和队徽，读接口补全队名/队徽时直接查内存，不再每次查询
+fd_teams_i18n 和 fd_teams。超过刷新间隔后按 updated_at 增量拉取变化的行，
+外部脚本（如 update_translations_cn.py）写入的翻译会在下一个刷新周期生效。
+联赛-球队成员关系（fd_league_teams）很小且会有删除，每次刷新全量重载。
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.database import get_client, run_query
+
+logger = logging.getLogger(__name__)
+
+# 请求参数中的语言写法 -> fd_teams_i18n.lang_code
+LANG_ALIASES = {'zh': 'zh-CN', 'zh-CN': 'zh-CN', 'zh_cn': 'zh-CN'}
+
+
+def normalize_lang(lang: Optional[str]) -> str:
+    """有翻译的语言返回 lang_code，其他一律按英文原名处理"""
+    return LANG_ALIASES.get(lang, 'en')
+
+
+class TeamDictionary:
+    """球队翻译名与队徽的内存字典"""
+
+    def __init__(self, refresh_interval: float = None):
+        self.refresh_interval = refresh_interval if refresh_interval is not None else settings.TEAM_DICT_REFRESH_INTERVAL
+        self._names: Dict[str, Dict[int, str]] = {}  # lang_code -> {team_id: 翻译名}
+        self._crests: Dict[int, str] = {}  # fd_id -> 队徽
+        self._teams_cursor: Optional[str] = None  # 已加载的最大 updated_at
+        self._i18n_cursor: Optional[str] = None
+        self._league_teams: Dict[str, List[int]] = {}  # league_code -> [team_id]
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at > 0
+
+    async def ensure_fresh(self):
+        """首次使用时全量加载，超过刷新间隔后增量刷新；并发调用只触发一次刷新"""
+        if self.loaded and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        async with self._lock:
+            if self.loaded and time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+            try:
+                await self.refresh()
+            except Exception as e:
+                # 刷新失败时继续使用旧数据，下次请求再试
+                logger.warning(f"球队字典刷新失败: {e}")
+
+    async def refresh(self):
+        """拉取 updated_at 晚于上次游标的球队和翻译"""
+        client = get_client()
+        if client is None:
+            return
+
+        teams_query = client.table('fd_teams').select("fd_id, crest, updated_at")
+        if self._teams_cursor:
+            teams_query = teams_query.gt('updated_at', self._teams_cursor)
+        i18n_query = client.table('fd_teams_i18n').select("team_id, lang_code, name_translated, updated_at")
+        if self._i18n_cursor:
+            i18n_query = i18n_query.gt('updated_at', self._i18n_cursor)
+
+        teams_res, i18n_res = await asyncio.gather(run_query(teams_query), run_query(i18n_query))
+
+        self.apply_teams(teams_res.data)
+        for row in i18n_res.data:
+            self._names.setdefault(row['lang_code'], {})[row['team_id']] = row['name_translated']
+        self._teams_cursor = self._max_updated_at(teams_res.data, self._teams_cursor)
+        self._i18n_cursor = self._max_updated_at(i18n_res.data, self._i18n_cursor)
+
+        try:
+            members_res = await run_query(client.table('fd_league_teams').select("league_code, team_id"))
+            league_teams: Dict[str, List[int]] = {}
+            for row in members_res.data:
+                league_teams.setdefault(row['league_code'], []).append(row['team_id'])
+            self._league_teams = league_teams
+        except Exception as e:
+            # 迁移未执行时成员表不存在，按联赛查询球队会回退到比赛表
+            logger.warning(f"加载联赛球队成员失败: {e}")
+
+        if self.loaded and (teams_res.data or i18n_res.data):
+            logger.info(f"球队字典增量刷新: 球队 {len(teams_res.data)}, 翻译 {len(i18n_res.data)}")
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+
+    def apply_teams(self, rows: Iterable[Dict]):
+        """用刚写入或拉取到的球队行更新队徽"""
+        for row in rows:
+            if row.get('fd_id') is not None:
+                self._crests[row['fd_id']] = row.get('crest')
+
+    @staticmethod
+    def _max_updated_at(rows: List[Dict], current: Optional[str]) -> Optional[str]:
+        values = [r['updated_at'] for r in rows if r.get('updated_at')]
+        if current:
+            values.append(current)
+        return max(values) if values else None
+
+    def name(self, team_id: int, lang: Optional[str], default: Optional[str] = None) -> Optional[str]:
+        """球队在指定语言下的名称，没有翻译时返回 default"""
+        lang_code = normalize_lang(lang)
+        if lang_code == 'en':
+            return default
+        return self._names.get(lang_code, {}).get(team_id) or default
+
+    def crest(self, team_id: int) -> Optional[str]:
+        return self._crests.get(team_id)
+
+    def league_teams(self, league_code: str) -> List[int]:
+        """联赛当前的参赛球队 ID；未知联赛返回空列表"""
+        return self._league_teams.get(league_code, [])
+
+    def set_league_teams(self, league_code: str, team_ids: Iterable[int]):
+        """同步任务写入成员关系后直接更新内存"""
+        self._league_teams[league_code] = list(team_ids)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "teams": len(self._crests),
+            "translations": sum(len(names) for names in self._names.values()),
+            "leagues": len(self._league_teams),
+            "refreshes": self.refreshes,
+        }
+
+
+team_dictionary = TeamDictionary()
@@ -308,10 +308,52 @@ const app = createApp({
             return '';
         };
 
+        // Live Scores - 实时比分推送 (SSE)，不可用时回退到轮询
+        const POLL_INTERVAL = 60000;       // 无推送时的轮询间隔
+        const SLOW_POLL_INTERVAL = 300000; // 推送连接正常时，只低频刷新积分榜/日志等
+        let pollTimer = null;
+        let pollInterval = null;
+
+        const schedulePolling = (interval) => {
+            if (pollInterval === interval) return;
+            if (pollTimer) clearInterval(pollTimer);
+            pollTimer = setInterval(refreshAll, interval);
+            pollInterval = interval;
+        };
+
+        const applyLiveScores = (updates) => {
+            if (activeSource.value !== 'fd' || !updates || !updates.length) return;
+            const byId = new Map(updates.map(u => [u.fd_id, u]));
+            matches.value.forEach(m => {
+                const u = byId.get(m.fd_id);
+                if (!u) return;
+                m.status = u.status;
+                m.home_score = u.home_score;
+                m.away_score = u.away_score;
+                m.home_half_score = u.home_half_score;
+                m.away_half_score = u.away_half_score;
+            });
+        };
+
+        const startLiveStream = () => {
+            if (!window.EventSource) {
+                schedulePolling(POLL_INTERVAL);
+                return;
+            }
+            const source = new EventSource('/api/v1/fd/live/stream');
+            source.addEventListener('open', () => schedulePolling(SLOW_POLL_INTERVAL));
+            source.addEventListener('snapshot', (e) => applyLiveScores(JSON.parse(e.data).matches));
+            source.addEventListener('score', (e) => applyLiveScores(JSON.parse(e.data).matches));
+            source.addEventListener('resync', () => fetchMatches());
+            // 断线重连期间或服务端不支持推送 (204) 时恢复正常轮询
+            source.onerror = () => schedulePolling(POLL_INTERVAL);
+        };
+
         // Init
         onMounted(() => {
             refreshAll();
-            setInterval(refreshAll, 60000);
+            schedulePolling(POLL_INTERVAL);
+            startLiveStream();
         });
 
         return {
@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 from fastapi.responses import HTMLResponse, FileResponse
 from datetime import datetime
+from urllib.parse import urlencode
 import os
 
 from app.repositories import FDRepository, SportteryRepository, LogRepository
+from app.repositories.pagination import decode_cursor
 from app.config import settings
 
 web_router = APIRouter(tags=["Web界面"])
@@ -492,28 +494,44 @@ async def matches_page(
     source: str = "fd",
     date: str = "",
     league: str = "",
-    status: str = ""
+    status: str = "",
+    cursor: str = ""
 ):
-    """比赛列表页面"""
+    """比赛列表页面（按游标分页，每页 100 场）"""
+    page_size = 100
+    repo = fd_repo if source == "fd" else sporttery_repo
+    try:
+        after = decode_cursor('fd' if source == "fd" else 'sp', cursor, 2 if source == "fd" else 3)
+    except ValueError:
+        after = None  # 游标无效时回到第一页
+
     if source == "fd":
         matches = await fd_repo.get_matches(
             date=date if date else None,
             league=league if league else None,
             status=status if status else None,
-            limit=200
+            limit=page_size,
+            after=after
         )
         source_name = "欧洲联赛"
     else:
         matches = await sporttery_repo.get_matches(
             date=date if date else None,
             status=status if status else None,
-            limit=200
+            limit=page_size,
+            after=after
         )
         source_name = "竞彩官网"
 
+    next_link = ""
+    if len(matches) == page_size:
+        params = {k: v for k, v in {"source": source, "date": date, "league": league, "status": status}.items() if v}
+        params["cursor"] = repo.match_cursor(matches[-1])
+        next_link = f'<div style="padding:16px 20px;text-align:right;"><a class="filter-btn" href="/matches?{urlencode(params)}">下一页</a></div>'
+
     # 构建比赛行
     matches_rows = ""
-    for m in matches[:100]:
+    for m in matches:
         if source == "fd":
             league_code = m.get('league_code', '')
             league_name = LEAGUE_MAP.get(league_code, league_code)
@@ -546,7 +564,7 @@ async def matches_page(
     content = f'''
     <div class="page-header">
         <h1 class="page-title">比赛列表</h1>
-        <p class="page-subtitle">{source_name} · 共 {len(matches)} 场比赛</p>
+        <p class="page-subtitle">{source_name} · 本页 {len(matches)} 场比赛</p>
     </div>
 
     <div class="card">
@@ -570,6 +588,7 @@ async def matches_page(
                 </table>
             </div>
         </div>
+        {next_link}
     </div>
 
     <script>
@@ -715,12 +734,7 @@ async def standings_page(league: str = "PL"):
 @web_router.get("/leagues", response_class=HTMLResponse)
 async def leagues_page():
     """联赛列表页面"""
-    conn = await fd_repo.get_connection()
-    conn.row_factory = lambda c, r: dict(zip([col[0] for col in c.description], r))
-    cursor = await conn.cursor()
-    await cursor.execute("SELECT * FROM fd_leagues ORDER BY code")
-    leagues = await cursor.fetchall()
-    await conn.close()
+    leagues = await fd_repo.get_leagues()
 
     leagues_rows = ""
     for league in leagues:
@@ -767,22 +781,7 @@ async def leagues_page():
 @web_router.get("/teams", response_class=HTMLResponse)
 async def teams_page(league: str = ""):
     """球队列表页面"""
-    conn = await fd_repo.get_connection()
-    conn.row_factory = lambda c, r: dict(zip([col[0] for col in c.description], r))
-    cursor = await conn.cursor()
-
-    if league:
-        await cursor.execute('''
-            SELECT DISTINCT t.* FROM fd_teams t
-            INNER JOIN fd_matches m ON (m.home_team_id = t.fd_id OR m.away_team_id = t.fd_id)
-            WHERE m.league_code = ?
-            ORDER BY t.name
-        ''', (league,))
-    else:
-        await cursor.execute("SELECT * FROM fd_teams ORDER BY name")
-
-    teams = await cursor.fetchall()
-    await conn.close()
+    teams = await fd_repo.get_teams(league_code=league or None)
 
     teams_rows = ""
     for team in teams:
@@ -0,0 +1,45 @@
+"""
+竞彩比分回填工具（可断点续跑）
+
+停机后按日期窗口并发、逐页回填 sporttery_matches 的比分，例如:
+    python scripts/backfill_sporttery_results.py --start 2026-01-01 --end 2026-03-31
+中断后用同样的参数重跑即可从断点继续。
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings, ensure_data_dir
+from app.scheduler import scheduler
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill sporttery_matches scores over a date range")
+    parser.add_argument("--start", help="Start date YYYY-MM-DD (default: 30 days ago)")
+    parser.add_argument("--end", help="End date YYYY-MM-DD (default: today)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: data/sporttery_backfill_<start>_<end>.json)")
+    args = parser.parse_args()
+
+    end = date.fromisoformat(args.end) if args.end else date.today()
+    start = date.fromisoformat(args.start) if args.start else end - timedelta(days=30)
+
+    ensure_data_dir()
+    checkpoint = args.checkpoint or os.path.join(
+        os.path.dirname(settings.DB_PATH), f"sporttery_backfill_{start}_{end}.json"
+    )
+
+    print(f"Backfilling sporttery results {start} ~ {end} (checkpoint: {checkpoint})")
+    try:
+        count = await scheduler.backfill_sporttery_results(start, end, checkpoint_path=checkpoint)
+        print(f"Backfill finished. Scores updated: {count}")
+    finally:
+        await scheduler.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
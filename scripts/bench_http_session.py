@@ -0,0 +1,125 @@
+"""
+HTTP 会话基准测试：对比“每次请求新建会话”与“长连接复用会话”的单请求延迟
+
+在本机启动一个模拟 Football-Data 的 HTTPS 服务（临时自签名证书，需要 openssl 命令），
+分别用两种方式顺序请求 N 次，输出平均/中位/P95 延迟。连接复用省下的主要是 TCP + TLS 握手，
+因此替身服务必须走 TLS。新实现直接调用 FootballDataScraper._request，
+并关闭响应缓存，不经过 SingleFlight 和缓存查找，只比较连接管理本身。
+
+用法:
+    python scripts/bench_http_session.py --requests 200
+"""
+import argparse
+import asyncio
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 必须在导入 app 之前设置：不创建响应缓存，也不在仓库里写入 data/http_cache.db
+os.environ["FD_CACHE_ENABLED"] = "false"
+
+from app.scrapers import FootballDataScraper, RateLimiter
+
+PAYLOAD = {"matches": [{"id": i, "status": "SCHEDULED"} for i in range(50)]}
+
+
+async def handle_matches(request):
+    return web.json_response(PAYLOAD)
+
+
+def make_certificate(directory: str) -> tuple:
+    """生成 127.0.0.1 的自签名证书，返回 (证书路径, 私钥路径)"""
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+         "-keyout", key, "-out", cert],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+async def start_stand_in(cert: str, key: str) -> tuple:
+    """启动本地 HTTPS 替身服务，返回 (runner, base_url)"""
+    app = web.Application()
+    app.router.add_get("/v4/matches", handle_matches)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    server_ssl = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_ssl.load_cert_chain(cert, key)
+    site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=server_ssl)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"https://127.0.0.1:{port}/v4"
+
+
+async def bench_per_request_session(base_url: str, n: int) -> list:
+    """旧实现：每次请求新建 ClientSession"""
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{base_url}/matches") as response:
+                await response.json()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def bench_pooled_session(base_url: str, n: int) -> list:
+    """新实现：FootballDataScraper 复用连接池（直接走请求循环，绕过 SingleFlight 和缓存）"""
+    scraper = FootballDataScraper(api_token="bench")
+    scraper.base_url = base_url
+    # 基准测试不受 API 限流约束
+    scraper.limiter = RateLimiter(max_calls=n * 10, window=60)
+    breaker = scraper._breaker("/matches")
+    latencies = []
+    try:
+        for _ in range(n):
+            start = time.perf_counter()
+            await scraper._request("/matches", None, breaker)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await scraper.close()
+    return latencies
+
+
+def report(name: str, latencies: list):
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[max(0, int(len(ms) * 0.95) - 1)]
+    print(f"{name:<24} mean={statistics.mean(ms):7.3f}ms  "
+          f"p50={statistics.median(ms):7.3f}ms  p95={p95:7.3f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Per-request latency: fresh session vs pooled session")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        # 两种实现都用默认校验的 SSL 上下文（aiohttp 首次 HTTPS 请求时才创建），只信任替身证书
+        os.environ["SSL_CERT_FILE"] = cert
+        runner, base_url = await start_stand_in(cert, key)
+        try:
+            before = await bench_per_request_session(base_url, args.requests)
+            after = await bench_pooled_session(base_url, args.requests)
+        finally:
+            await runner.cleanup()
+
+    print(f"Stand-in: {base_url}  requests/mode: {args.requests}")
+    report("before (new session)", before)
+    report("after (pooled session)", after)
+    print(f"speedup (mean): {statistics.mean(before) / statistics.mean(after):.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
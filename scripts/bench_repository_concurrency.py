@@ -0,0 +1,122 @@
+"""
+数据访问层并发基准测试：对比“在事件循环内同步 execute()”与“数据库线程池执行”
+
+用一个模拟 PostgREST 往返延迟的假客户端，同时发起 N 个 FDRepository.get_matches 请求，
+输出单请求延迟的 P50/P99 以及事件循环最大卡顿时间。
+
+用法:
+    python scripts/bench_repository_concurrency.py --concurrency 100 --latency 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.repositories import FDRepository
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+        self.count = len(data)
+
+
+class FakeQuery:
+    """模拟 PostgREST 查询构造器：链式调用返回自身，execute() 同步阻塞 latency 秒"""
+
+    def __init__(self, table: str, latency: float):
+        self.table = table
+        self.latency = latency
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self.latency)
+        if self.table in ('fd_matches', 'fd_matches_enriched'):
+            return FakeResponse([
+                {'fd_id': i, 'home_team_id': i * 2, 'away_team_id': i * 2 + 1,
+                 'home_team_name': f'Team {i * 2}', 'away_team_name': f'Team {i * 2 + 1}'}
+                for i in range(20)
+            ])
+        if self.table == 'fd_teams_i18n':
+            return FakeResponse([{'team_id': i, 'name_translated': f'球队 {i}'} for i in range(40)])
+        return FakeResponse([{'fd_id': i, 'crest': f'https://crests/{i}.png'} for i in range(40)])
+
+
+class FakeClient:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(name, self.latency)
+
+
+async def blocking_execute(query):
+    """旧实现：直接在协程里调用同步 execute()"""
+    return query.execute()
+
+
+async def measure_loop_lag(stop: asyncio.Event) -> float:
+    """每 5ms 唤醒一次，记录事件循环的最大调度延迟"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        worst = max(worst, time.perf_counter() - start - 0.005)
+    return worst
+
+
+async def run(repo: FDRepository, concurrency: int) -> tuple:
+    # 延迟从统一的发起时刻算起：阻塞执行时排队等待事件循环的时间也计入
+    start = time.perf_counter()
+
+    async def one() -> float:
+        await repo.get_matches(lang='zh')
+        return time.perf_counter() - start
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    latencies = await asyncio.gather(*[one() for _ in range(concurrency)])
+    stop.set()
+    return latencies, await lag_task
+
+
+def report(name: str, latencies: list, lag: float):
+    ms = sorted(x * 1000 for x in latencies)
+    p99 = ms[max(0, int(len(ms) * 0.99) - 1)]
+    print(f"{name:<26} p50={statistics.median(ms):8.1f}ms  p99={p99:8.1f}ms  "
+          f"max loop lag={lag * 1000:8.1f}ms")
+    return p99
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Repository p99 latency: blocking execute vs thread pool")
+    parser.add_argument("--concurrency", type=int, default=100, help="Concurrent get_matches calls")
+    parser.add_argument("--latency", type=float, default=20, help="Simulated PostgREST round trip (ms)")
+    args = parser.parse_args()
+
+    client = FakeClient(args.latency / 1000)
+
+    before_repo = FDRepository()
+    before_repo._client = client
+    before_repo._execute = blocking_execute
+    before, before_lag = await run(before_repo, args.concurrency)
+
+    after_repo = FDRepository()
+    after_repo._client = client
+    after, after_lag = await run(after_repo, args.concurrency)
+
+    print(f"concurrency: {args.concurrency}  simulated latency: {args.latency}ms  (1 query per request, team names/crests from memory)")
+    p99_before = report("before (blocking execute)", before, before_lag)
+    p99_after = report("after (thread pool)", after, after_lag)
+    print(f"p99 improvement: {p99_before / p99_after:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
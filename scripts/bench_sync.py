@@ -0,0 +1,91 @@
+"""
+同步吞吐基准测试（离线、可复现）
+
+在本进程内启动回放服务，把抓取器指向它，依次运行一个完整比赛日的同步任务，
+输出每个任务的耗时与回放服务统计。数据库写入被替换为空操作，只衡量抓取与处理开销。
+
+用法:
+    python scripts/record_fixtures.py --dir data/fixtures      # 先录制一次
+    python scripts/bench_sync.py --dir data/fixtures --latency 80 --jitter 40
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DIR = os.path.join(PROJECT_ROOT, "data", "fixtures")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline match-day sync benchmark against recorded fixtures")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="Fixture directory")
+    parser.add_argument("--latency", type=int, default=50, help="Fixed latency per response (ms)")
+    parser.add_argument("--jitter", type=int, default=0, help="Random extra latency per response (ms)")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Inject a 429 every N requests (0 = off)")
+    parser.add_argument("--time-shift", action="store_true", help="Shift utcDate/lastUpdated to the current time")
+    parser.add_argument("--jobs", nargs="*", help="Subset of jobs to run (default: full match day)")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main(args, port: int):
+    from aiohttp import web
+
+    from app.scheduler import scheduler
+    from app.scrapers.replay import MATCH_DAY_JOBS, FixtureStore, NullRepository, create_replay_app
+
+    store = FixtureStore(args.dir)
+    count = store.load()
+    if not count:
+        print(f"No fixtures in {args.dir}; run scripts/record_fixtures.py first")
+        return
+
+    app = create_replay_app(
+        store, latency_ms=args.latency, jitter_ms=args.jitter,
+        rate_limit_every=args.rate_limit_every, time_shift=args.time_shift,
+    )
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    scheduler.fd_repo = NullRepository()
+    scheduler.sporttery_repo = NullRepository()
+    scheduler.log_repo = NullRepository()
+    scheduler.sync_logs.log_repo = scheduler.log_repo
+
+    print(f"Replaying {count} fixtures on :{port}  latency={args.latency}ms jitter={args.jitter}ms")
+    timings = []
+    try:
+        for job in args.jobs or MATCH_DAY_JOBS:
+            start = time.perf_counter()
+            result = await getattr(scheduler, job)()
+            timings.append((job, time.perf_counter() - start, result))
+    finally:
+        await scheduler.stop()
+        await runner.cleanup()
+
+    for job, elapsed, result in timings:
+        print(f"{job:<26} {elapsed * 1000:9.1f}ms  result={result}")
+    print(f"{'total':<26} {sum(t[1] for t in timings) * 1000:9.1f}ms")
+    print(f"replay stats: {app['stats']}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    port = free_port()
+    # 配置在导入 app 时读取：先把接口地址指向回放服务，并关闭缓存与限流对基准的干扰
+    os.environ["FD_API_BASE_URL"] = f"http://127.0.0.1:{port}/v4"
+    os.environ["SPORTTERY_API_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ["FD_CACHE_ENABLED"] = "false"
+    os.environ["FD_RATE_LIMIT"] = "100000"
+    os.environ["HTTP_RECORD_DIR"] = ""
+    sys.path.append(PROJECT_ROOT)
+    asyncio.run(main(args, port))
@@ -0,0 +1,49 @@
+"""
+录制回放夹具
+
+对真实的 Football-Data / 竞彩接口跑一遍完整比赛日的同步任务（不写数据库），
+把每个响应保存到夹具目录，之后可用 scripts/replay_server.py 离线回放:
+    python scripts/record_fixtures.py --dir data/fixtures
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DIR = os.path.join(PROJECT_ROOT, "data", "fixtures")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Record live API responses as replay fixtures")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="Fixture directory")
+    return parser.parse_args()
+
+
+async def main(args):
+    from app.scheduler import scheduler
+    from app.scrapers.replay import MATCH_DAY_JOBS, NullRepository
+
+    scheduler.fd_repo = NullRepository()
+    scheduler.sporttery_repo = NullRepository()
+    scheduler.log_repo = NullRepository()
+    scheduler.sync_logs.log_repo = scheduler.log_repo
+
+    try:
+        for job in MATCH_DAY_JOBS:
+            print(f"Recording {job}...")
+            await getattr(scheduler, job)()
+    finally:
+        await scheduler.stop()
+
+    count = len([name for name in os.listdir(args.dir) if name.endswith(".json")]) if os.path.isdir(args.dir) else 0
+    print(f"Done. {count} fixtures in {args.dir}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # 配置在导入 app 时读取，必须先设置环境变量；录制时绕过响应缓存，保证每个接口都真正请求一次
+    os.environ["HTTP_RECORD_DIR"] = args.dir
+    os.environ["FD_CACHE_ENABLED"] = "false"
+    sys.path.append(PROJECT_ROOT)
+    asyncio.run(main(args))
@@ -0,0 +1,52 @@
+"""
+Football-Data / 竞彩接口回放服务
+
+从 scripts/record_fixtures.py 录制的夹具目录回放响应，供离线开发与基准测试使用:
+    python scripts/replay_server.py --dir data/fixtures --port 8765 --latency 80 --jitter 40
+
+然后把抓取器指向回放服务:
+    FD_API_BASE_URL=http://127.0.0.1:8765/v4
+    SPORTTERY_API_BASE_URL=http://127.0.0.1:8765
+"""
+import argparse
+import logging
+import os
+import sys
+
+from aiohttp import web
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.scrapers.replay import FixtureStore, create_replay_app
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fixtures")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Football-Data / Sporttery responses")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="Fixture directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=int, default=0, help="Fixed latency per response (ms)")
+    parser.add_argument("--jitter", type=int, default=0, help="Random extra latency per response (ms)")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Inject a 429 every N requests (0 = off)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--time-shift", action="store_true", help="Shift utcDate/lastUpdated to the current time")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = FixtureStore(args.dir)
+    count = store.load()
+    print(f"Loaded {count} fixtures from {args.dir}")
+
+    app = create_replay_app(
+        store, latency_ms=args.latency, jitter_ms=args.jitter,
+        rate_limit_every=args.rate_limit_every, retry_after=args.retry_after,
+        time_shift=args.time_shift,
+    )
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -41,5 +41,8 @@ async def main():
         
         print("Full Sync Complete.")
 
+    # 写入缓冲中的比分与日志，并释放抓取器连接池
+    await scheduler.stop()
+
 if __name__ == "__main__":
     asyncio.run(main())
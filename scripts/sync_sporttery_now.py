@@ -10,7 +10,7 @@ sys.path.insert(0, project_root)
 os.chdir(project_root)  # 切换工作目录到项目根目录，方便读取 .env 等文件
 
 
-from app.scrapers import SportteryScraper
+from app.scrapers import ScraperError, SportteryScraper
 from app.repositories import SportteryRepository
 from app.notifications.webhook import webhook_client
 
@@ -38,7 +38,13 @@ async def sync_sporttery():
         print("---------------------------\n")
 
     print("\n[2] 同步比分结果 (get_match_results)...")
-    results = await scraper.get_match_results()
+    try:
+        results = await scraper.get_match_results()
+    except ScraperError as e:
+        # 部分窗口失败时不写入残缺的比分，只同步赛程
+        print(f"❌ 获取比分失败: {e}")
+        await webhook_client.notify_sync_failed(error_msg=f"竞彩比分获取失败: {e}")
+        results = []
 
     if not results:
         print("⚠️ 未获取到比分记录（可能无已结束比赛）")
@@ -49,17 +55,19 @@ async def sync_sporttery():
     print(f"\n[3] 汇总处理，共计 {len(combined_data)} 条记录保存到 Supabase...")
     
     saved_count = 0
+    skipped_count = 0
     failed_count = 0
 
-    for item in combined_data:
-        success = await repo.save_match(item)
-        if success:
-            saved_count += 1
-        else:
-            failed_count += 1
+    # 赛程与比分分两批写入，保持“比分覆盖赛程”的先后顺序
+    for batch in (matches, results):
+        result = await repo.save_matches(batch)
+        saved_count += result.written
+        skipped_count += result.skipped
+        failed_count += result.failed
 
     print(f"\n同步完成:")
     print(f"  成功: {saved_count} 场 (含更新)")
+    print(f"  未变化: {skipped_count} 场")
     print(f"  失败: {failed_count} 场")
 
     # 发送同步结果通知
@@ -0,0 +1,50 @@
+-- ============================================
+-- 表级数据版本
+-- 每条写入语句执行后把对应表的版本号加一（语句级触发器），
+-- 读接口据此计算 ETag：版本未变时直接返回 304，不查询业务表
+-- ============================================
+
+-- 1. 版本表
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- 2. 触发器函数
+CREATE OR REPLACE FUNCTION bump_data_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO data_versions (table_name, version, updated_at)
+    VALUES (TG_TABLE_NAME, 1, NOW())
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = data_versions.version + 1, updated_at = NOW();
+    RETURN NULL;
+END;
+$$;
+
+-- 3. 为读接口涉及的表创建语句级触发器
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'fd_matches', 'fd_leagues', 'fd_teams', 'fd_teams_i18n', 'fd_league_teams',
+        'fd_standings', 'fd_scorers', 'fd_match_details', 'fd_match_goals', 'sporttery_matches'
+    ]
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_data_version ON %I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_data_version AFTER INSERT OR UPDATE OR DELETE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()', t, t
+        );
+        INSERT INTO data_versions (table_name, version) VALUES (t, 0) ON CONFLICT (table_name) DO NOTHING;
+    END LOOP;
+END;
+$$;
+
+-- 4. 添加注释
+COMMENT ON TABLE data_versions IS '各表的数据版本号，任何写入语句执行后加一';
+COMMENT ON FUNCTION bump_data_version() IS '语句级触发器：递增 TG_TABLE_NAME 的数据版本';
@@ -0,0 +1,30 @@
+-- ============================================
+-- 联赛-球队成员索引
+-- 由 sync_fd_teams 维护：每个联赛当前赛季的参赛球队。
+-- 按联赛查询球队时直接查这张小表，不再扫描整个赛季的 fd_matches。
+-- ============================================
+
+-- 1. 创建成员表
+CREATE TABLE IF NOT EXISTS fd_league_teams (
+    league_code VARCHAR(10) NOT NULL,
+    team_id INTEGER NOT NULL,  -- 关联 fd_teams.fd_id
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (league_code, team_id)
+);
+
+-- 2. 按球队反查所属联赛的索引
+CREATE INDEX IF NOT EXISTS idx_fd_league_teams_team_id ON fd_league_teams(team_id);
+
+-- 3. 用已有比赛数据回填：每个联赛最新赛季出现过的主客队
+INSERT INTO fd_league_teams (league_code, team_id)
+SELECT DISTINCT m.league_code, t.team_id
+FROM fd_matches m
+JOIN (SELECT league_code, MAX(season) AS season FROM fd_matches GROUP BY league_code) s
+  ON s.league_code = m.league_code AND s.season = m.season
+CROSS JOIN LATERAL (VALUES (m.home_team_id), (m.away_team_id)) AS t(team_id)
+WHERE t.team_id IS NOT NULL
+ON CONFLICT (league_code, team_id) DO NOTHING;
+
+-- 4. 添加注释
+COMMENT ON TABLE fd_league_teams IS '联赛当前赛季的参赛球队，由球队同步任务维护';
+COMMENT ON COLUMN fd_league_teams.team_id IS '关联的球队ID (fd_teams.fd_id)';
@@ -0,0 +1,36 @@
+-- ============================================
+-- 比赛列表读模型
+-- fd_matches_enriched 视图把主客队的中文译名和队徽直接关联到比赛行上，
+-- 比赛列表接口一次查询即可返回完整数据，不再分别查询 fd_teams_i18n 和 fd_teams。
+--
+-- 为什么用普通视图而不是物化视图 / 同步任务维护的表：
+-- - 四个关联都落在唯一键上 (fd_teams.fd_id、fd_teams_i18n(team_id, lang_code))，
+--   每行只多两次索引探测；筛选与排序都在 fd_matches 的列上，规划器先按下面的索引
+--   取出一页 (LIMIT) 再关联，开销与页大小成正比，和表的总行数无关。
+-- - 实时比分任务每分钟写入 fd_matches，物化视图要么每分钟整表 REFRESH（成本随总行数增长），
+--   要么在刷新间隔内返回过期比分；维护表则要在每条写入路径上再写一遍。
+-- - 普通视图始终与基础表一致，无需刷新任务，也不增加写入量。
+-- ============================================
+
+-- 1. 比赛列表筛选 + 键集分页索引：排序键 (match_date, fd_id)，筛选列在前
+CREATE INDEX IF NOT EXISTS idx_fd_matches_date_id ON fd_matches(match_date, fd_id);
+CREATE INDEX IF NOT EXISTS idx_fd_matches_league_date_id ON fd_matches(league_code, match_date, fd_id);
+CREATE INDEX IF NOT EXISTS idx_fd_matches_status_date_id ON fd_matches(status, match_date, fd_id);
+
+-- 2. 读模型视图
+CREATE OR REPLACE VIEW fd_matches_enriched AS
+SELECT
+    m.*,
+    h.crest AS home_team_logo,
+    a.crest AS away_team_logo,
+    hi.name_translated AS home_team_name_zh,
+    ai.name_translated AS away_team_name_zh
+FROM fd_matches m
+LEFT JOIN fd_teams h ON h.fd_id = m.home_team_id
+LEFT JOIN fd_teams a ON a.fd_id = m.away_team_id
+LEFT JOIN fd_teams_i18n hi ON hi.team_id = m.home_team_id AND hi.lang_code = 'zh-CN'
+LEFT JOIN fd_teams_i18n ai ON ai.team_id = m.away_team_id AND ai.lang_code = 'zh-CN';
+
+-- 3. 添加注释
+COMMENT ON VIEW fd_matches_enriched IS '比赛列表读模型：比赛 + 主客队队徽 + 中文译名';
+COMMENT ON INDEX idx_fd_matches_date_id IS '比赛列表键集分页 (match_date, fd_id)';
@@ -0,0 +1,28 @@
+-- ============================================
+-- 比赛详情结构化字段
+-- 场馆、首发和替补在写入时从 details_json 中提取一次，
+-- 读取详情时不再解析整个原始 JSON
+-- ============================================
+
+-- 1. 新增字段
+ALTER TABLE fd_match_details ADD COLUMN IF NOT EXISTS venue TEXT;
+ALTER TABLE fd_match_details ADD COLUMN IF NOT EXISTS lineup_home JSONB;
+ALTER TABLE fd_match_details ADD COLUMN IF NOT EXISTS lineup_away JSONB;
+ALTER TABLE fd_match_details ADD COLUMN IF NOT EXISTS bench_home JSONB;
+ALTER TABLE fd_match_details ADD COLUMN IF NOT EXISTS bench_away JSONB;
+
+-- 2. 用已有的 details_json 回填
+UPDATE fd_match_details
+SET venue = details_json::jsonb ->> 'venue',
+    lineup_home = COALESCE(details_json::jsonb -> 'homeTeam' -> 'lineup', '[]'::jsonb),
+    lineup_away = COALESCE(details_json::jsonb -> 'awayTeam' -> 'lineup', '[]'::jsonb),
+    bench_home = COALESCE(details_json::jsonb -> 'homeTeam' -> 'bench', '[]'::jsonb),
+    bench_away = COALESCE(details_json::jsonb -> 'awayTeam' -> 'bench', '[]'::jsonb)
+WHERE details_json IS NOT NULL AND lineup_home IS NULL;
+
+-- 3. 添加注释
+COMMENT ON COLUMN fd_match_details.venue IS '比赛场馆（写入时从 details_json 提取）';
+COMMENT ON COLUMN fd_match_details.lineup_home IS '主队首发';
+COMMENT ON COLUMN fd_match_details.lineup_away IS '客队首发';
+COMMENT ON COLUMN fd_match_details.bench_home IS '主队替补';
+COMMENT ON COLUMN fd_match_details.bench_away IS '客队替补';
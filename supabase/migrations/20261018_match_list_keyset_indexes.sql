@@ -0,0 +1,17 @@
+-- ============================================
+-- 比赛列表键集分页索引
+-- 列表接口改为按游标翻页：fd_matches 按 (match_date, fd_id)，
+-- sporttery_matches 按 (group_date DESC, match_time, id) 排序并从上一页最后一行之后继续读取。
+-- 排序键全部落在索引上，任意深度的翻页都只扫描一页的行数，不再有 OFFSET 的线性代价。
+-- fd_matches 的三个键集索引已由 20261018_fd_matches_enriched.sql 创建，这里不再重复。
+-- ============================================
+
+-- 1. sporttery_matches：与列表排序方向一致（match_time 升序时 NULL 在后，与默认一致）
+CREATE INDEX IF NOT EXISTS idx_sporttery_matches_keyset ON sporttery_matches(group_date DESC, match_time, id);
+
+-- 2. 保留 idx_sporttery_matches_date (group_date)
+-- 新索引虽以 group_date 开头，但本迁移不删除其他系列创建的索引；
+-- 确认所有按 group_date 查询的脚本都已改走新索引后，再单独评估是否删除。
+
+-- 3. 添加注释
+COMMENT ON INDEX idx_sporttery_matches_keyset IS '竞彩列表键集分页 (group_date DESC, match_time, id)';
@@ -0,0 +1,73 @@
+-- ============================================
+-- 原子替换比赛进球记录
+-- 一次 RPC 调用把某场比赛的进球集合替换为传入的列表：
+-- 只删除已不存在的进球、只插入新增的进球，未变化的进球不重写，
+-- 整个过程在同一事务内完成，读者不会看到空的进球列表
+-- ============================================
+
+-- 1. 按比赛查询进球的索引
+CREATE INDEX IF NOT EXISTS idx_fd_match_goals_match_id ON fd_match_goals(match_id);
+
+-- 2. 替换函数
+CREATE OR REPLACE FUNCTION replace_match_goals(p_match_id BIGINT, p_goals JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_deleted INTEGER;
+    v_inserted INTEGER;
+BEGIN
+    -- 同一场比赛的并发替换串行执行
+    PERFORM pg_advisory_xact_lock(p_match_id);
+
+    -- 删除不在新列表中的进球
+    DELETE FROM fd_match_goals t
+    WHERE t.match_id = p_match_id
+      AND NOT EXISTS (
+          SELECT 1
+          FROM jsonb_to_recordset(COALESCE(p_goals, '[]'::jsonb)) AS g(
+              team_id BIGINT, team_name TEXT, player_id BIGINT, player_name TEXT,
+              minute INTEGER, minute_extra INTEGER, type TEXT, home_away TEXT
+          )
+          WHERE g.team_id IS NOT DISTINCT FROM t.team_id
+            AND g.team_name IS NOT DISTINCT FROM t.team_name
+            AND g.player_id IS NOT DISTINCT FROM t.player_id
+            AND g.player_name IS NOT DISTINCT FROM t.player_name
+            AND g.minute IS NOT DISTINCT FROM t.minute
+            AND g.minute_extra IS NOT DISTINCT FROM t.minute_extra
+            AND g.type IS NOT DISTINCT FROM t.type
+            AND g.home_away IS NOT DISTINCT FROM t.home_away
+      );
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+
+    -- 插入新增的进球
+    INSERT INTO fd_match_goals (
+        match_id, team_id, team_name, player_id, player_name,
+        minute, minute_extra, type, home_away, updated_at
+    )
+    SELECT DISTINCT p_match_id, g.team_id, g.team_name, g.player_id, g.player_name,
+           g.minute, g.minute_extra, g.type, g.home_away, NOW()
+    FROM jsonb_to_recordset(COALESCE(p_goals, '[]'::jsonb)) AS g(
+        team_id BIGINT, team_name TEXT, player_id BIGINT, player_name TEXT,
+        minute INTEGER, minute_extra INTEGER, type TEXT, home_away TEXT
+    )
+    WHERE NOT EXISTS (
+        SELECT 1 FROM fd_match_goals t
+        WHERE t.match_id = p_match_id
+          AND g.team_id IS NOT DISTINCT FROM t.team_id
+          AND g.team_name IS NOT DISTINCT FROM t.team_name
+          AND g.player_id IS NOT DISTINCT FROM t.player_id
+          AND g.player_name IS NOT DISTINCT FROM t.player_name
+          AND g.minute IS NOT DISTINCT FROM t.minute
+          AND g.minute_extra IS NOT DISTINCT FROM t.minute_extra
+          AND g.type IS NOT DISTINCT FROM t.type
+          AND g.home_away IS NOT DISTINCT FROM t.home_away
+    );
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+
+    RETURN v_deleted + v_inserted;
+END;
+$$;
+
+-- 3. 添加注释
+COMMENT ON FUNCTION replace_match_goals(BIGINT, JSONB) IS '原子替换比赛进球集合，返回删除+插入的行数';
@@ -0,0 +1,15 @@
+-- ============================================
+-- sync_logs 改为每次运行一行
+-- 运行结束后一次写入状态、重试次数、记录数和耗时；
+-- 长时间运行的任务先写 running 记录，结束后原地更新
+-- ============================================
+
+-- 1. 新增耗时字段
+ALTER TABLE sync_logs ADD COLUMN IF NOT EXISTS duration_ms INTEGER;
+
+-- 2. 最近成功同步时间查询 (get_last_sync_time) 的索引
+CREATE INDEX IF NOT EXISTS idx_sync_logs_source_status_started ON sync_logs(source, status, started_at DESC);
+
+-- 3. 添加注释
+COMMENT ON COLUMN sync_logs.duration_ms IS '本次运行耗时（毫秒）';
+COMMENT ON COLUMN sync_logs.retry_count IS '本次运行的重试次数';
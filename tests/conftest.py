@@ -0,0 +1,16 @@
+"""
+测试环境：使用临时目录下的本地 SQLite 存储，关闭持久化响应缓存
+
+必须在导入 app 之前设置环境变量（settings 在导入时读取）。
+"""
+import os
+import tempfile
+
+_data_dir = tempfile.mkdtemp(prefix="matchstats-tests-")
+
+os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("DB_PATH", os.path.join(_data_dir, "matchstats.db"))
+os.environ.setdefault("FINGERPRINT_DB_PATH", os.path.join(_data_dir, "fingerprints.db"))
+os.environ.setdefault("FD_CACHE_PATH", os.path.join(_data_dir, "http_cache.db"))
+os.environ.setdefault("RATE_LIMIT_BACKEND", "memory")
+os.environ.setdefault("INTERNAL_API_KEY", "test-key")
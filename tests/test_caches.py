@@ -0,0 +1,254 @@
+"""响应缓存：Football-Data 条件请求缓存、API 结果 LRU/TTL 缓存与请求合并"""
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from app.scrapers.cache import CacheEntry, ResponseCache as HttpCache
+from app.scrapers.singleflight import SingleFlight
+from app.services.response_cache import ResponseCache as ApiCache, cache_key
+
+TTLS = [(r"^/competitions/[^/]+/standings", 3600)]
+
+
+def entry(digest: str, fetched_at: float = None, **kwargs) -> CacheEntry:
+    return CacheEntry({"digest": digest}, digest, fetched_at or time.time(), **kwargs)
+
+
+# ---------- Football-Data 响应缓存 ----------
+
+def test_ttl_follows_endpoint_family():
+    cache = HttpCache(ttls=TTLS, max_entries=10)
+    assert cache.ttl_for("/competitions/PL/standings?season=2026") == 3600
+    assert cache.ttl_for("/matches") == 0
+    assert cache.is_cacheable("/matches", etag='"v1"', last_modified=None)
+    assert not cache.is_cacheable("/matches", etag=None, last_modified=None)
+
+
+def test_memory_is_bounded_lru():
+    async def scenario():
+        cache = HttpCache(ttls=TTLS, max_entries=2)
+        await cache.put("/a", entry("a"))
+        await cache.put("/b", entry("b"))
+        await cache.get("/a")  # /a 变为最近使用
+        await cache.put("/c", entry("c"))
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert list(cache._memory) == ["/a", "/c"]
+    assert cache.stats()["entries"] == 2
+
+
+def test_persisted_entries_survive_new_instance(tmp_path):
+    path = str(tmp_path / "http_cache.db")
+
+    async def scenario():
+        await HttpCache(path, ttls=TTLS, max_entries=10).put("/a", entry("a", etag='"v1"'))
+        return await HttpCache(path, ttls=TTLS, max_entries=10).get("/a")
+
+    loaded = asyncio.run(scenario())
+    assert loaded.digest == "a"
+    assert loaded.conditional_headers() == {"If-None-Match": '"v1"'}
+
+
+def test_prune_keeps_most_recent_entries(tmp_path, monkeypatch):
+    path = str(tmp_path / "http_cache.db")
+    monkeypatch.setattr(HttpCache, "PRUNE_EVERY", 5)
+
+    async def scenario():
+        cache = HttpCache(path, ttls=TTLS, max_entries=3)
+        for i in range(5):
+            await cache.put(f"/matches?date={i}", entry(str(i), fetched_at=1000.0 + i))
+
+    asyncio.run(scenario())
+    conn = sqlite3.connect(path)
+    keys = sorted(row[0] for row in conn.execute("SELECT key FROM http_cache"))
+    conn.close()
+    assert keys == ["/matches?date=2", "/matches?date=3", "/matches?date=4"]
+
+
+def test_old_cache_file_gains_saved_digest_column(tmp_path):
+    path = str(tmp_path / "http_cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE http_cache (key TEXT PRIMARY KEY, body TEXT NOT NULL, digest TEXT NOT NULL, "
+        "fetched_at REAL NOT NULL, etag TEXT, last_modified TEXT)"
+    )
+    conn.execute("INSERT INTO http_cache VALUES ('/a', '{}', 'a', 1.0, NULL, NULL)")
+    conn.commit()
+    conn.close()
+
+    loaded = asyncio.run(HttpCache(path, ttls=TTLS, max_entries=10).get("/a"))
+    assert loaded.digest == "a"
+    assert loaded.saved_digest is None
+
+
+def test_unchanged_only_after_mark_saved():
+    async def scenario():
+        cache = HttpCache(ttls=TTLS, max_entries=10)
+        await cache.put("/a", entry("a"))
+        before = (await cache.get("/a")).saved
+        await cache.mark_saved("/a", "stale-digest")  # 旧版本的确认不生效
+        ignored = (await cache.get("/a")).saved
+        await cache.mark_saved("/a", "a")
+        return before, ignored, (await cache.get("/a")).saved
+
+    assert asyncio.run(scenario()) == (False, False, True)
+
+
+# ---------- API 结果缓存 ----------
+
+class Loader:
+    def __init__(self, value=("row",)):
+        self.calls = 0
+        self.value = list(value)
+
+    async def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_cache_key_ignores_param_order_and_none():
+    assert cache_key("matches", league="PL", date=None, status="LIVE") == \
+        cache_key("matches", status="LIVE", league="PL")
+
+
+def test_hit_after_first_load():
+    async def scenario():
+        cache, loader = ApiCache(max_entries=10, ttl=60, empty_ttl=5), Loader()
+        await cache.get_or_load("k", loader, [("fd_matches", None)])
+        await cache.get_or_load("k", loader, [("fd_matches", None)])
+        return cache, loader
+
+    cache, loader = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_entry_is_reloaded(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.response_cache.time.monotonic", lambda: now[0])
+
+    async def scenario():
+        cache, loader = ApiCache(max_entries=10, ttl=60, empty_ttl=5), Loader()
+        await cache.get_or_load("k", loader, [("fd_matches", None)])
+        now[0] += 61
+        await cache.get_or_load("k", loader, [("fd_matches", None)])
+        return loader
+
+    assert asyncio.run(scenario()).calls == 2
+
+
+def test_empty_result_uses_short_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.response_cache.time.monotonic", lambda: now[0])
+
+    async def scenario():
+        cache, loader = ApiCache(max_entries=10, ttl=60, empty_ttl=5), Loader(value=())
+        await cache.get_or_load("k", loader, [("fd_matches", None)])
+        now[0] += 6
+        await cache.get_or_load("k", loader, [("fd_matches", None)])
+        return loader
+
+    assert asyncio.run(scenario()).calls == 2
+
+
+def test_lru_eviction():
+    async def scenario():
+        cache = ApiCache(max_entries=2, ttl=60, empty_ttl=5)
+        for key in ("a", "b"):
+            await cache.get_or_load(key, Loader(), [("fd_matches", None)])
+        await cache.get_or_load("a", Loader(), [("fd_matches", None)])  # a 变为最近使用
+        await cache.get_or_load("c", Loader(), [("fd_matches", None)])
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.stats()["evicted"] == 1
+
+
+def test_invalidate_by_table_and_scope():
+    async def scenario():
+        cache = ApiCache(max_entries=10, ttl=60, empty_ttl=5)
+        await cache.get_or_load("PL", Loader(), [("fd_standings", "PL")])
+        await cache.get_or_load("SA", Loader(), [("fd_standings", "SA")])
+        await cache.get_or_load("all", Loader(), [("fd_standings", None)])
+        await cache.get_or_load("other", Loader(), [("fd_matches", None)])
+        cache.invalidate("fd_standings", {"PL"})
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert sorted(cache._entries) == ["SA", "other"]
+
+
+def test_result_loaded_during_invalidation_is_not_cached():
+    async def scenario():
+        cache = ApiCache(max_entries=10, ttl=60, empty_ttl=5)
+
+        async def loader():
+            cache.invalidate("fd_matches")  # 加载期间发生写入
+            return ["stale"]
+
+        value = await cache.get_or_load("k", loader, [("fd_matches", None)])
+        return cache, value
+
+    cache, value = asyncio.run(scenario())
+    assert value == ["stale"]
+    assert cache.stats()["entries"] == 0
+
+
+def test_concurrent_misses_load_once():
+    async def scenario():
+        cache = ApiCache(max_entries=10, ttl=60, empty_ttl=5)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return ["row"]
+
+        results = await asyncio.gather(*[cache.get_or_load("k", loader, [("fd_matches", None)]) for _ in range(5)])
+        return calls, results
+
+    calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert results == [["row"]] * 5
+
+
+# ---------- 请求合并 ----------
+
+def test_singleflight_shares_result_and_error():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(*[flight.do("k", boom) for _ in range(3)], return_exceptions=True)
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.stats() == {"requests": 1, "coalesced": 2, "in_flight": 0}
+
+
+def test_singleflight_cancelled_caller_does_not_cancel_others():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", slow))
+        second = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
@@ -0,0 +1,139 @@
+"""数据访问层（本地 SQLite 后端）：键集分页、变更检测、写入日志回放"""
+import asyncio
+
+import pytest
+
+from app.database import init_db
+from app.repositories import FDRepository, SportteryRepository
+from app.repositories.journal import JournalReplayer, WriteJournal
+from app.repositories.pagination import decode_cursor, encode_cursor, quote
+
+
+@pytest.fixture(scope="module", autouse=True)
+def database():
+    asyncio.run(init_db())
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# ---------- 游标 ----------
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("fd", ["2026-10-18T15:00:00+00:00", 42])
+    assert "=" not in cursor
+    assert decode_cursor("fd", cursor, 2) == ["2026-10-18T15:00:00+00:00", 42]
+    assert decode_cursor("fd", None, 2) is None
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor("sp", ["2026-10-18", None, 1]),
+                                    encode_cursor("fd", ["2026-10-18"])])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor("fd", cursor, 2)
+
+
+def test_quote_escapes_postgrest_syntax():
+    assert quote('2026-10-18T15:00:00+00:00') == '"2026-10-18T15:00:00+00:00"'
+    assert quote('a"b\\c') == '"a\\"b\\\\c"'
+
+
+# ---------- 键集分页 ----------
+
+def fd_match(fd_id: int, match_date: str, league: str) -> dict:
+    return {"fd_id": fd_id, "league_code": league, "match_date": match_date, "status": "TIMED",
+            "home_team_id": None, "away_team_id": None,
+            "home_team_name": f"home {fd_id}", "away_team_name": f"away {fd_id}"}
+
+
+def test_fd_pages_cover_every_match_once():
+    repo = FDRepository()
+    kickoffs = ["2026-10-18T12:00:00+00:00", "2026-10-18T15:00:00+00:00", "2026-10-18T15:00:00+00:00",
+                "2026-10-18T15:00:00+00:00", "2026-10-18T19:45:00+00:00"]
+    run(repo.save_matches([fd_match(9000 + i, kickoff, "KS1") for i, kickoff in enumerate(reversed(kickoffs))]))
+
+    async def walk():
+        pages, after = [], None
+        while True:
+            page = await repo.get_matches(league="KS1", limit=2, after=after)
+            if not page:
+                return pages
+            pages.append(page)
+            after = decode_cursor("fd", repo.match_cursor(page[-1]), 2)
+
+    pages = run(walk())
+    rows = [row for page in pages for row in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [(r["match_date"], r["fd_id"]) for r in rows] == sorted((r["match_date"], r["fd_id"]) for r in rows)
+    assert len({r["fd_id"] for r in rows}) == 5
+
+
+def test_sporttery_pages_follow_list_order_with_null_times():
+    repo = SportteryRepository()
+    run(repo.save_matches([
+        {"match_code": "KS001", "match_time": "2026-09-02 20:00:00", "home_team": "a", "away_team": "b"},
+        {"match_code": "KS002", "match_time": "2026-09-02 18:00:00", "home_team": "c", "away_team": "d"},
+        {"match_code": "KS003", "match_time": "2026-09-02 18:00:00", "home_team": "e", "away_team": "f"},
+        {"match_code": "KS004", "group_date": "2026-09-02", "home_team": "g", "away_team": "h"},
+        {"match_code": "KS005", "group_date": "2026-09-02", "home_team": "i", "away_team": "j"},
+        {"match_code": "KS006", "match_time": "2026-09-01 21:00:00", "home_team": "k", "away_team": "l"},
+    ]))
+
+    async def walk():
+        rows, after = [], None
+        while True:
+            page = await repo.get_matches(status="pending", limit=2, after=after)
+            page = [row for row in page if row["match_code"].startswith("KS")]
+            if not page:
+                return rows
+            rows.extend(page)
+            after = decode_cursor("sp", repo.match_cursor(page[-1]), 3)
+
+    rows = run(walk())
+    expected = sorted(rows, key=lambda r: (r["match_time"] is None, r["match_time"] or "", r["id"]))
+    expected.sort(key=lambda r: r["group_date"], reverse=True)
+    assert [r["match_code"] for r in rows] == [r["match_code"] for r in expected]
+    assert [r["match_code"] for r in rows][:3] == ["KS002", "KS003", "KS001"]
+    assert len(rows) == 6
+
+
+# ---------- 变更检测 ----------
+
+def test_unchanged_rows_are_skipped():
+    repo = FDRepository()
+    rows = [fd_match(9100, "2026-10-19T12:00:00+00:00", "KS2"), fd_match(9101, "2026-10-19T15:00:00+00:00", "KS2")]
+
+    first = run(repo.save_matches(rows))
+    second = run(repo.save_matches(rows))
+    rows[1] = dict(rows[1], status="FINISHED")
+    third = run(repo.save_matches(rows))
+
+    assert (first.written, first.skipped) == (2, 0)
+    assert (second.written, second.skipped) == (0, 2)
+    assert (third.written, third.skipped) == (1, 1)
+
+
+# ---------- 写入日志回放 ----------
+
+def test_failed_chunk_is_journaled_and_replayed(tmp_path, monkeypatch):
+    repo = FDRepository()
+    repo.journal = WriteJournal(str(tmp_path / "write_journal.db"))
+    rows = [fd_match(9200, "2026-10-20T12:00:00+00:00", "KS3"), fd_match(9201, "2026-10-20T15:00:00+00:00", "KS3")]
+
+    async def unavailable(query):
+        raise ConnectionError("backend unavailable")
+
+    original = repo._execute
+    monkeypatch.setattr(repo, "_execute", unavailable)
+    failed = run(repo.save_matches(rows))
+    pending = run(repo.journal.count())
+
+    monkeypatch.setattr(repo, "_execute", original)
+    replayed = run(JournalReplayer(repo.journal, repo).replay())
+
+    assert failed.failed == 2
+    assert pending == 2
+    assert replayed == 2
+    assert run(repo.journal.count()) == 0
+    assert run(repo.get_match_by_id(9201))["league_code"] == "KS3"
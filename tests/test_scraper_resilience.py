@@ -0,0 +1,238 @@
+"""抓取器：令牌桶、熔断器、重试与 ETag 条件请求（本地 aiohttp 服务作为上游）"""
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from app.scrapers import FootballDataScraper
+from app.scrapers.cache import ResponseCache
+from app.scrapers.rate_limiter import RateLimiter
+from app.scrapers.retry import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, ScraperError, endpoint_key, parse_quota, parse_retry_after,
+)
+
+
+# ---------- 令牌桶 ----------
+
+def test_token_bucket_allows_burst_then_paces():
+    async def scenario():
+        limiter = RateLimiter(max_calls=3, window=0.3, name="test-burst")
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        burst = time.monotonic() - started
+        await limiter.acquire()
+        return burst, time.monotonic() - started
+
+    burst, total = asyncio.run(scenario())
+    assert burst < 0.05
+    assert total >= 0.08  # 第 4 次需等待约 window / max_calls = 0.1 秒
+
+
+def test_pause_blocks_until_quota_resets():
+    async def scenario():
+        limiter = RateLimiter(max_calls=100, window=1, name="test-pause")
+        limiter.pause(0.1)
+        started = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.09
+
+
+# ---------- 熔断器与响应头解析 ----------
+
+def test_breaker_opens_and_allows_single_trial_after_timeout():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # 试探进行中
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_release_returns_trial_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_header_parsing():
+    assert parse_retry_after({"Retry-After": "12"}) == 12
+    assert parse_retry_after({"X-RequestCounter-Reset": "30"}) == 30
+    assert parse_retry_after({}) is None
+    assert parse_quota({"X-Requests-Available-Minute": "0", "X-RequestCounter-Reset": "41"}) == (0, 41.0)
+    assert endpoint_key("/teams/65?season=2026") == "/teams/{id}"
+
+
+# ---------- 请求路径 ----------
+
+class Upstream:
+    """按脚本返回状态码的本地 Football-Data 替身"""
+
+    def __init__(self):
+        self.statuses = []
+        self.requests = []
+        self.delay = 0.0
+
+    async def handle(self, request):
+        self.requests.append(dict(request.headers))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 200:
+            return web.json_response({"matches": [{"id": 1}]}, headers={"ETag": '"v1"'})
+        if status == 304:
+            return web.Response(status=304, headers={"ETag": '"v1"'})
+        return web.Response(status=status)
+
+
+async def serve(upstream: Upstream):
+    app = web.Application()
+    app.router.add_get("/v4/matches", upstream.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/v4"
+
+
+def make_scraper(base_url: str, cache: bool = True) -> FootballDataScraper:
+    scraper = FootballDataScraper(api_token="test-token")
+    scraper.base_url = base_url
+    scraper.limiter = RateLimiter(max_calls=1000, window=1, name="test-upstream")
+    scraper.retry_policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.02)
+    scraper.cache = ResponseCache(ttls=[(r"^/competitions$", 3600)], max_entries=10) if cache else None
+    return scraper
+
+
+def with_upstream(scenario):
+    async def main():
+        upstream = Upstream()
+        runner, base_url = await serve(upstream)
+        try:
+            return await scenario(upstream, base_url)
+        finally:
+            await runner.cleanup()
+    return asyncio.run(main())
+
+
+def test_etag_revalidation_reuses_cached_body():
+    async def scenario(upstream, base_url):
+        scraper = make_scraper(base_url)
+        try:
+            first = await scraper._get("/matches")
+            await scraper.mark_saved([first])
+            upstream.statuses = [304]
+            second = await scraper._get("/matches")
+            return upstream, first, second
+        finally:
+            await scraper.close()
+
+    upstream, first, second = with_upstream(scenario)
+    assert first == second == {"matches": [{"id": 1}]}
+    assert not first.unchanged
+    assert second.unchanged
+    assert upstream.requests[1]["If-None-Match"] == '"v1"'
+
+
+def test_server_errors_are_retried_then_succeed():
+    async def scenario(upstream, base_url):
+        scraper = make_scraper(base_url, cache=False)
+        upstream.statuses = [503, 502]
+        try:
+            data = await scraper._get("/matches")
+            return upstream, data, scraper._breaker("/matches").state
+        finally:
+            await scraper.close()
+
+    upstream, data, state = with_upstream(scenario)
+    assert data == {"matches": [{"id": 1}]}
+    assert len(upstream.requests) == 3
+    assert state == CircuitBreaker.CLOSED
+
+
+def test_exhausted_retries_raise_and_open_breaker(monkeypatch):
+    monkeypatch.setattr("app.scrapers.settings.FD_CIRCUIT_FAILURE_THRESHOLD", 1)
+
+    async def scenario(upstream, base_url):
+        scraper = make_scraper(base_url, cache=False)
+        upstream.statuses = [500, 500, 500]
+        try:
+            with pytest.raises(ScraperError):
+                await scraper._get("/matches")
+            with pytest.raises(CircuitOpenError):
+                await scraper._get("/matches")
+            return upstream
+        finally:
+            await scraper.close()
+
+    assert len(with_upstream(scenario).requests) == 3
+
+
+def test_client_errors_are_not_retried():
+    async def scenario(upstream, base_url):
+        scraper = make_scraper(base_url, cache=False)
+        upstream.statuses = [403]
+        try:
+            with pytest.raises(ScraperError):
+                await scraper._get("/matches")
+            return upstream, scraper._breaker("/matches").state
+        finally:
+            await scraper.close()
+
+    upstream, state = with_upstream(scenario)
+    assert len(upstream.requests) == 1
+    assert state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_releases_half_open_breaker():
+    async def scenario(upstream, base_url):
+        scraper = make_scraper(base_url, cache=False)
+        breaker = scraper._breaker("/matches")
+        breaker.reset_timeout = 0
+        breaker.state, breaker.opened_at = CircuitBreaker.OPEN, time.monotonic()
+        upstream.delay = 0.5
+        try:
+            task = asyncio.create_task(scraper._fetch("/matches"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return breaker.allow()
+        finally:
+            await scraper.close()
+
+    assert with_upstream(scenario)
+
+
+def test_concurrent_calls_share_one_request():
+    async def scenario(upstream, base_url):
+        scraper = make_scraper(base_url, cache=False)
+        upstream.delay = 0.05
+        try:
+            results = await asyncio.gather(*[scraper._get("/matches") for _ in range(4)])
+            return upstream, results
+        finally:
+            await scraper.close()
+
+    upstream, results = with_upstream(scenario)
+    assert len(upstream.requests) == 1
+    assert all(r == {"matches": [{"id": 1}]} for r in results)
@@ -0,0 +1,142 @@
+"""写后队列：按主键合并、刷新结果、失败放回队列"""
+import asyncio
+
+import pytest
+
+from app.repositories import BulkWriteResult
+from app.repositories.write_behind import WriteBehindQueue
+
+
+class RecordingWriter:
+    """记录每次刷新收到的行；fail 为 True 时抛出异常"""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    async def __call__(self, rows):
+        if self.fail:
+            raise ConnectionError("backend unavailable")
+        self.batches.append(rows)
+        return BulkWriteResult(written=len(rows))
+
+
+def test_put_many_coalesces_by_key():
+    async def scenario():
+        writer = RecordingWriter()
+        queue = WriteBehindQueue(writer, flush_interval=60, max_pending=100)
+        await queue.put_many([{"fd_id": 1, "status": "TIMED"}, {"fd_id": 2, "status": "TIMED"}])
+        await queue.put_many([{"fd_id": 1, "status": "IN_PLAY"}])
+        result = await queue.flush()
+        return writer, queue, result
+
+    writer, queue, result = asyncio.run(scenario())
+    assert result.written == 2
+    assert writer.batches == [[{"fd_id": 1, "status": "IN_PLAY"}, {"fd_id": 2, "status": "TIMED"}]]
+    assert queue.stats()["coalesced"] == 1
+    assert queue.stats()["pending"] == 0
+
+
+def test_flush_on_empty_queue_returns_none():
+    queue = WriteBehindQueue(RecordingWriter(), flush_interval=60, max_pending=100)
+    assert asyncio.run(queue.flush()) is None
+
+
+def test_rows_without_key_are_ignored():
+    async def scenario():
+        writer = RecordingWriter()
+        queue = WriteBehindQueue(writer, flush_interval=60, max_pending=100)
+        await queue.put_many([{"status": "TIMED"}, {"fd_id": 3}])
+        await queue.flush()
+        return writer
+
+    assert asyncio.run(scenario()).batches == [[{"fd_id": 3}]]
+
+
+def test_full_queue_flushes_before_accepting_new_key():
+    async def scenario():
+        writer = RecordingWriter()
+        queue = WriteBehindQueue(writer, flush_interval=60, max_pending=2)
+        await queue.put_many([{"fd_id": i} for i in range(5)])
+        return writer, queue
+
+    writer, queue = asyncio.run(scenario())
+    assert [len(batch) for batch in writer.batches] == [2, 2]
+    assert queue.stats()["pending"] == 1
+
+
+def test_failed_flush_requeues_rows_and_raises():
+    async def scenario():
+        writer = RecordingWriter()
+        queue = WriteBehindQueue(writer, flush_interval=60, max_pending=100)
+        await queue.put_many([{"fd_id": 1, "v": 1}, {"fd_id": 2, "v": 1}])
+        writer.fail = True
+        with pytest.raises(ConnectionError):
+            await queue.flush()
+        failed_stats = queue.stats()
+
+        writer.fail = False
+        result = await queue.flush()
+        return writer, failed_stats, result
+
+    writer, failed_stats, result = asyncio.run(scenario())
+    assert failed_stats["pending"] == 2
+    assert failed_stats["requeued"] == 2
+    assert result.written == 2
+    assert writer.batches == [[{"fd_id": 1, "v": 1}, {"fd_id": 2, "v": 1}]]
+
+
+def test_requeue_keeps_value_enqueued_during_failed_flush():
+    async def scenario():
+        queue = None
+        attempts = []
+
+        async def writer(rows):
+            attempts.append(rows)
+            if len(attempts) == 1:
+                # 刷新进行中又收到同一主键的新值，然后这次写入失败
+                await queue.put_many([{"fd_id": 1, "v": "new"}])
+                raise ConnectionError("backend unavailable")
+            return BulkWriteResult(written=len(rows))
+
+        queue = WriteBehindQueue(writer, flush_interval=60, max_pending=100)
+        await queue.put_many([{"fd_id": 1, "v": "old"}, {"fd_id": 2, "v": "old"}])
+        with pytest.raises(ConnectionError):
+            await queue.flush()
+        await queue.flush()
+        return attempts
+
+    attempts = asyncio.run(scenario())
+    assert sorted(attempts[1], key=lambda r: r["fd_id"]) == [{"fd_id": 1, "v": "new"}, {"fd_id": 2, "v": "old"}]
+
+
+def test_requeue_beyond_capacity_counts_as_failed():
+    async def scenario():
+        queue = None
+
+        async def writer(rows):
+            await queue.put_many([{"fd_id": 10}, {"fd_id": 11}])
+            raise ConnectionError("backend unavailable")
+
+        queue = WriteBehindQueue(writer, flush_interval=60, max_pending=2)
+        await queue.put_many([{"fd_id": 1}, {"fd_id": 2}])
+        with pytest.raises(ConnectionError):
+            await queue.flush()
+        return queue.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["pending"] == 2
+    assert stats["failed"] == 2
+    assert stats["requeued"] == 0
+
+
+def test_stop_writes_remaining_rows():
+    async def scenario():
+        writer = RecordingWriter()
+        queue = WriteBehindQueue(writer, flush_interval=60, max_pending=100)
+        queue.start()
+        await queue.put_many([{"fd_id": 7}])
+        await queue.stop()
+        return writer
+
+    assert asyncio.run(scenario()).batches == [[{"fd_id": 7}]]